@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Array Codec
+Compact encodings for doa_spectrum_360 and spectrum power arrays in NDJSON records
+"""
+
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from kraken_log_writer import day_stamp
+
+# "json" keeps the plain float list (default Filebeat/Elasticsearch format)
+ENCODINGS = ("json", "f16", "i8", "delta-db", "peaks")
+
+
+def _b64(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def _unb64(text, dtype):
+    return np.frombuffer(base64.b64decode(text), dtype=dtype)
+
+
+class SidecarStore:
+    """Append-only float32 files holding full arrays for "peaks" records
+
+    Arrays go to kraken-<event>-arrays-YYYYMMDD.f32 next to the NDJSON logs
+    and are referenced from the record by file name, byte offset and count,
+    so readers can memory-map them with np.memmap.
+    """
+
+    def __init__(self, log_dir, prefix="kraken"):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self._handles = {}
+        self._lock = threading.Lock()
+        self._day, self._rollover_at = day_stamp()
+
+    def append(self, event_type, array):
+        """Store an array; returns the reference dict for the record"""
+        data = np.ascontiguousarray(array, dtype='<f4')
+        with self._lock:
+            if time.time() >= self._rollover_at:
+                self.close()
+                self._day, self._rollover_at = day_stamp()
+            f = self._handles.get(event_type)
+            if f is None:
+                name = f"{self.prefix}-{event_type}-arrays-{self._day}.f32"
+                f = open(os.path.join(self.log_dir, name), 'ab')
+                self._handles[event_type] = f
+            offset = f.tell()
+            f.write(data.tobytes())
+        return {
+            "file": os.path.basename(f.name),
+            "offset": offset,
+            "count": int(data.size),
+            "dtype": "float32"
+        }
+
+    def flush(self):
+        for f in list(self._handles.values()):
+            f.flush()
+
+    def close(self):
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+
+
+def encode_array(array, encoding="json", sidecar=None, event_type="doa", peaks=8):
+    """Encode a 1-D float array for an NDJSON record
+
+    f16      - float16 little-endian, base64
+    i8       - uint8 quantized between min and max, base64
+    delta-db - first value plus 0.01 dB int16 deltas, base64
+    peaks    - top-N (index, value) pairs; full array in a sidecar file when given
+
+    NaN/inf bins (e.g. never-seen sweep bins) decode as NaN: f16 and the
+    sidecar keep them natively, i8 marks them with the reserved code
+    "missing", delta-db falls back to f16, and peaks/min/mean skip them.
+    """
+    array = np.asarray(array, dtype=float)
+    if encoding == "json":
+        return array.tolist()
+    if encoding == "f16":
+        return {"encoding": "f16", "count": array.size, "data": _b64(array.astype('<f2'))}
+    finite = np.isfinite(array)
+    all_finite = bool(finite.all())
+    if encoding == "i8":
+        if all_finite:
+            lo, hi = float(array.min()), float(array.max())
+            scale = (hi - lo) / 255.0 or 1.0
+            q = np.rint((array - lo) / scale).astype(np.uint8)
+            return {"encoding": "i8", "count": array.size, "offset": lo, "scale": scale, "data": _b64(q)}
+        # Code 255 is reserved for missing bins, the finite ones share 0..254
+        lo, hi = (float(array[finite].min()), float(array[finite].max())) if finite.any() else (0.0, 0.0)
+        scale = (hi - lo) / 254.0 or 1.0
+        q = np.full(array.size, 255, dtype=np.uint8)
+        q[finite] = np.rint((array[finite] - lo) / scale)
+        return {"encoding": "i8", "count": array.size, "offset": lo, "scale": scale, "missing": 255,
+                "data": _b64(q)}
+    if encoding == "delta-db":
+        if not all_finite:
+            return {"encoding": "f16", "count": array.size, "data": _b64(array.astype('<f2'))}
+        centi = np.rint(array * 100.0).astype(np.int64)
+        deltas = np.diff(centi)
+        if deltas.size and (deltas.min() < -32768 or deltas.max() > 32767):
+            return {"encoding": "f16", "count": array.size, "data": _b64(array.astype('<f2'))}
+        return {"encoding": "delta-db", "count": array.size, "first": float(centi[0]) / 100.0,
+                "data": _b64(deltas.astype('<i2'))}
+    if encoding == "peaks":
+        values = array if all_finite else array[finite]
+        index = np.arange(array.size) if all_finite else np.flatnonzero(finite)
+        top = index[np.argsort(values)[::-1][:peaks]]
+        encoded = {"encoding": "peaks", "count": array.size,
+                   "peaks": [[int(i), float(array[i])] for i in top],
+                   "min": float(values.min()) if values.size else None,
+                   "mean": float(values.mean()) if values.size else None}
+        if sidecar is not None:
+            encoded["sidecar"] = sidecar.append(event_type, array)
+        return encoded
+    raise ValueError(f"Unknown array encoding: {encoding}")
+
+
+def decode_array(encoded, log_dir=None):
+    """Decode any encode_array() output back to a float64 NumPy array
+
+    "peaks" values decode from their sidecar when log_dir is given; without
+    a sidecar only the peak bins are filled (the rest set to the minimum).
+    """
+    if isinstance(encoded, list):
+        return np.asarray(encoded, dtype=float)
+    encoding = encoded["encoding"]
+    if encoding == "f16":
+        return _unb64(encoded["data"], '<f2').astype(float)
+    if encoding == "i8":
+        q = _unb64(encoded["data"], np.uint8)
+        array = encoded["offset"] + q.astype(float) * encoded["scale"]
+        if "missing" in encoded:
+            array[q == encoded["missing"]] = np.nan
+        return array
+    if encoding == "delta-db":
+        deltas = _unb64(encoded["data"], '<i2').astype(np.int64)
+        first = int(round(encoded["first"] * 100))
+        return np.concatenate(([first], first + np.cumsum(deltas))) / 100.0
+    if encoding == "peaks":
+        ref = encoded.get("sidecar")
+        if ref is not None and log_dir is not None:
+            mm = np.memmap(os.path.join(log_dir, ref["file"]), dtype='<f4', mode='r',
+                           offset=ref["offset"], shape=(ref["count"],))
+            return np.array(mm, dtype=float)
+        array = np.full(encoded["count"], np.nan if encoded["min"] is None else encoded["min"])
+        for i, value in encoded["peaks"]:
+            array[i] = value
+        return array
+    raise ValueError(f"Unknown array encoding: {encoding}")
+
+
+def decode_record(record, log_dir=None):
+    """Replace every "<name>_encoded" field of a parsed record with a decoded "<name>" array"""
+    for key in [k for k in record if k.endswith("_encoded")]:
+        record[key[:-len("_encoded")]] = decode_array(record.pop(key), log_dir)
+    return record
+
+
+def benchmark(records=2000, points=(360, 1024)):
+    """Report bytes per array and json.dumps throughput for every encoding"""
+    results = {}
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        sidecar = SidecarStore(tmp)
+        for n in points:
+            arrays = -70 + 20 * rng.random((records, n))
+            for encoding in ENCODINGS:
+                start = time.perf_counter()
+                size = 0
+                for array in arrays:
+                    size += len(json.dumps({"spectrum": encode_array(array, encoding, sidecar)}))
+                rate = records / (time.perf_counter() - start)
+                results[f"{encoding}_{n}"] = {"bytes_per_record": size / records, "records_per_sec": rate}
+                print(f"{encoding:>8} x{n:5d}: {size / records:9,.0f} bytes/record {rate:10,.0f} records/sec")
+        sidecar.close()
+    return results
+
+
+def main():
+    """Run the array encoding benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR array encoding benchmark')
+    parser.add_argument('--records', type=int, default=2000,
+                       help='Arrays to encode per encoding and size (default: 2000)')
+    args = parser.parse_args()
+    benchmark(args.records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Logger Benchmark Harness
+Drives every log_* path with seeded inputs and saves comparable JSON results
+"""
+
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from kraken_array_codec import ENCODINGS
+
+SCENARIOS = ("doa", "spectrum", "radar", "beamforming", "tdoa", "status",
+             "doa_batch", "spectrum_batch", "generate_samples")
+
+# Result fields where a larger value is worse
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "bytes_per_record")
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def make_inputs(name, count, rng, spectrum_bins=1000, tdoa_pairs=10, batch_size=100):
+    """Pre-generate the arguments for count calls so input synthesis is not timed"""
+    if name == "doa":
+        return [dict(bearing=b, confidence=c, frequency=f, use_real_data=False)
+                for b, c, f in zip(rng.uniform(0, 360, count).tolist(),
+                                   rng.uniform(0.7, 15.0, count).tolist(),
+                                   rng.uniform(88e6, 108e6, count).tolist())]
+    if name == "spectrum":
+        frequencies = np.linspace(88e6, 108e6, spectrum_bins)
+        return [dict(frequencies=frequencies, power_levels=-80 + 20 * rng.random(spectrum_bins),
+                     use_real_data=False) for _ in range(count)]
+    if name == "radar":
+        return [dict(target_range=r, target_bearing=b, target_velocity=v)
+                for r, b, v in zip(rng.uniform(1000, 50000, count).tolist(),
+                                   rng.uniform(0, 360, count).tolist(),
+                                   rng.uniform(-100, 100, count).tolist())]
+    if name == "beamforming":
+        return [dict(beam_direction=d, beam_gain=g)
+                for d, g in zip(rng.uniform(0, 360, count).tolist(), rng.uniform(8, 15, count).tolist())]
+    if name == "tdoa":
+        return [dict(source_position=[40.7128 + lat, -74.0060 + lon],
+                     tdoa_measurements=rng.uniform(-1e-6, 1e-6, tdoa_pairs).tolist())
+                for lat, lon in rng.uniform(-0.1, 0.1, (count, 2)).tolist()]
+    if name == "doa_batch":
+        return [dict(bearings=rng.uniform(0, 360, batch_size),
+                     confidences=rng.uniform(0.7, 15.0, batch_size)) for _ in range(count)]
+    if name == "spectrum_batch":
+        return [dict(frequencies=np.linspace(88e6, 108e6, spectrum_bins),
+                     power_matrix=-80 + 20 * rng.random((batch_size, spectrum_bins)))
+                for _ in range(count)]
+    return [{} for _ in range(count)]
+
+
+def _method(logger, name):
+    return {
+        "doa": logger.log_doa_data,
+        "spectrum": logger.log_spectrum_data,
+        "radar": logger.log_passive_radar,
+        "beamforming": logger.log_beamforming_data,
+        "tdoa": logger.log_tdoa_data,
+        "status": logger.log_system_status,
+        "doa_batch": logger.log_doa_batch,
+        "spectrum_batch": logger.log_spectrum_batch,
+        "generate_samples": logger.generate_sample_data
+    }[name]
+
+
+def run_scenario(name, count=200, rate=0.0, seed=0, spectrum_bins=1000, tdoa_pairs=10,
+                 batch_size=100, array_encoding="json", log_dir=None):
+    """Call one logging path count times at rate calls/sec (0 = as fast as possible)"""
+    from kraken_data_logger import KrakenDataLogger
+    from kraken_discovery import HardwareDiscoveryCache
+
+    rng = np.random.default_rng(seed)
+    np.random.seed(seed)  # log_* methods draw their defaults from the global RNG
+    inputs = make_inputs(name, count, rng, spectrum_bins, tdoa_pairs, batch_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HardwareDiscoveryCache(os.path.join(tmp, "hardware.json"))
+        with KrakenDataLogger(log_dir or os.path.join(tmp, "logs"), seed=seed, quiet=True,
+                              array_encoding=array_encoding, discovery_cache=cache) as logger:
+            logger.rtl_sdr_count = 0
+            method = _method(logger, name)
+            latencies = np.empty(count)
+            start = time.perf_counter()
+            for i, kwargs in enumerate(inputs):
+                if rate > 0:
+                    delay = start + i / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                t0 = time.perf_counter()
+                method(**kwargs)
+                latencies[i] = time.perf_counter() - t0
+            logger.flush()
+            elapsed = time.perf_counter() - start
+            records = sum(logger.metrics.records.values())
+            nbytes = sum(logger.metrics.bytes.values())
+            if logger.sidecar is not None:
+                logger.sidecar.flush()
+                nbytes += sum(os.path.getsize(os.path.join(logger.log_dir, f))
+                              for f in os.listdir(logger.log_dir) if f.endswith(".f32"))
+    return {
+        "calls": count,
+        "records": records,
+        "records_per_sec": records / elapsed if elapsed > 0 else None,
+        "calls_per_sec": count / elapsed if elapsed > 0 else None,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000.0),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000.0),
+        "bytes_per_record": nbytes / records if records else None,
+        "peak_rss_kb": peak_rss_kb()
+    }
+
+
+def _fixed(value, width, precision=0):
+    """Right-aligned fixed-point number, or "-" for a metric with no value (e.g. no records written)"""
+    return "-".rjust(width) if value is None else f"{value:{width}.{precision}f}"
+
+
+def compare(results, baseline, threshold=0.10):
+    """Relative change per metric against a saved run; flags changes worse than threshold"""
+    comparison = {}
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        entry = {}
+        for metric in ("records_per_sec", "p50_ms", "p99_ms", "bytes_per_record"):
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change if metric in LOWER_IS_BETTER else -change
+            entry[metric] = {"baseline": old, "current": new, "change": change,
+                             "regression": worse > threshold}
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}")
+        comparison[name] = entry
+    return comparison, regressions
+
+
+def bench(scenarios=SCENARIOS, count=200, rate=0.0, seed=0, spectrum_bins=1000, tdoa_pairs=10,
+          batch_size=100, array_encoding="json"):
+    """Run the selected scenarios and return the full result document"""
+    from kraken_serializer import BACKEND
+
+    results = {}
+    for name in scenarios:
+        results[name] = result = run_scenario(name, count, rate, seed, spectrum_bins, tdoa_pairs,
+                                              batch_size, array_encoding)
+        print(f"{name:>16}: {_fixed(result['records_per_sec'], 10)} rec/s  p50 {result['p50_ms']:8.3f} ms  "
+              f"p99 {result['p99_ms']:8.3f} ms  {_fixed(result['bytes_per_record'], 8)} B/rec  "
+              f"peak RSS {result['peak_rss_kb'] / 1024:6.1f} MiB")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "serializer": BACKEND,
+            "seed": seed,
+            "calls": count,
+            "rate": rate,
+            "spectrum_bins": spectrum_bins,
+            "tdoa_pairs": tdoa_pairs,
+            "batch_size": batch_size,
+            "array_encoding": array_encoding
+        },
+        "results": results
+    }
+
+
+def main(argv=None):
+    """Benchmark every logging path; exits 1 when --compare finds a regression"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='kraken_data_logger.py bench',
+                                     description='KrakenSDR logger benchmark harness')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                       help=f'Comma-separated scenarios (default: all of {",".join(SCENARIOS)})')
+    parser.add_argument('--count', type=int, default=200,
+                       help='Calls per scenario (default: 200)')
+    parser.add_argument('--rate', type=float, default=0.0,
+                       help='Calls per second, 0 for as fast as possible (default: 0)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='RNG seed for inputs and simulated fields (default: 0)')
+    parser.add_argument('--spectrum-bins', type=int, default=1000,
+                       help='Bins per spectrum record (default: 1000)')
+    parser.add_argument('--tdoa-pairs', type=int, default=10,
+                       help='Time differences per TDOA record (default: 10)')
+    parser.add_argument('--batch-size', type=int, default=100,
+                       help='Records per *_batch call (default: 100)')
+    parser.add_argument('--array-encoding', default='json', choices=ENCODINGS,
+                       help='Array encoding passed to the logger (default: json)')
+    parser.add_argument('--output', default=None,
+                       help='Write results (and any comparison) to this JSON file')
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                       help='Compare against a previous --output file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                       help='Relative change counted as a regression (default: 0.10)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    document = bench(scenarios, args.count, args.rate, args.seed, args.spectrum_bins,
+                     args.tdoa_pairs, args.batch_size, args.array_encoding)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        document["comparison"], regressions = compare(document["results"], baseline, args.threshold)
+        document["baseline"] = {"path": args.compare, "meta": baseline.get("meta")}
+        for name in regressions:
+            print(f"⚠️  Regression: {name}")
+        if not regressions:
+            print(f"✅ No regressions beyond {args.threshold:.0%} against {args.compare}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
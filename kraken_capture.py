@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Capture
+Long-lived rtl_power sessions streamed into in-memory ring buffers
+"""
+
+import collections
+import concurrent.futures
+import shlex
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Widest range one streamed rtl_power session is widened to before it is simply retuned
+MAX_STREAM_SPAN = 32e6
+
+
+def parse_rtl_power_line(line):
+    """Parse one rtl_power CSV row
+
+    Row format: date, time, Hz low, Hz high, Hz step, samples, dB, dB, ...
+    Returns (stamp, hz_low, hz_high, hz_step, powers) or None for junk lines.
+    """
+    parts = line.split(',')
+    if len(parts) <= 6:
+        return None
+    try:
+        hz_low = float(parts[2])
+        hz_high = float(parts[3])
+        hz_step = float(parts[4])
+        powers = [float(x) for x in parts[6:] if x.strip()]
+    except ValueError:
+        return None
+    if not powers:
+        return None
+    stamp = f"{parts[0].strip()} {parts[1].strip()}"
+    return stamp, hz_low, hz_high, hz_step, powers
+
+
+class SweepAssembler:
+    """Incrementally join rtl_power rows into complete sweeps
+
+    rtl_power splits ranges wider than the tuner bandwidth into several rows
+    sharing a timestamp. A sweep is complete when the next row starts a new
+    timestamp or wraps back to a lower frequency.
+    """
+
+    def __init__(self):
+        self._rows = []
+        self._stamp = None
+        self._last_low = None
+
+    def feed(self, line):
+        """Feed one text line; returns a finished sweep dict or None"""
+        row = parse_rtl_power_line(line)
+        if row is None:
+            return None
+        stamp, hz_low = row[0], row[1]
+        done = None
+        if self._rows and (stamp != self._stamp or hz_low <= self._last_low):
+            done = self._finish()
+        self._rows.append(row)
+        self._stamp = stamp
+        self._last_low = hz_low
+        return done
+
+    def flush(self):
+        """Return the partially assembled sweep, if any"""
+        return self._finish() if self._rows else None
+
+    def _finish(self):
+        rows, self._rows = self._rows, []
+        powers = np.fromiter((p for row in rows for p in row[4]), dtype=float)
+        return {
+            'stamp': rows[0][0],
+            'freq_start': rows[0][1],
+            'freq_end': rows[-1][2],
+            'freq_step': rows[0][3],
+            'power_spectrum': powers,
+            'received_monotonic': time.monotonic()
+        }
+
+
+class RtlPowerStream:
+    """One persistent rtl_power process per device feeding a ring buffer
+
+    A reader thread parses sweep lines as they arrive. latest() never blocks
+    and returns the newest complete sweep (or None before the first one).
+    """
+
+    def __init__(self, device_index=0, frequency=146.52e6, span=2e6, bin_size='10k',
+                 interval=1, command='rtl_power', ring_size=64, restart_delay=5.0):
+        self.device_index = device_index
+        self.frequency = frequency
+        self.span = span
+        self.bin_size = bin_size
+        self.interval = interval
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        self.ring = collections.deque(maxlen=ring_size)
+        self.restart_delay = restart_delay
+        self.sweep_count = 0
+        self._proc = None
+        self._thread = None
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def freq_start(self):
+        return self.frequency - self.span / 2
+
+    @property
+    def freq_end(self):
+        return self.frequency + self.span / 2
+
+    def covers(self, frequency, span=0.0):
+        """True if the streamed range contains frequency +/- span / 2"""
+        return self.freq_start <= frequency - span / 2 and frequency + span / 2 <= self.freq_end
+
+    def covering(self, frequency, span, max_span=MAX_STREAM_SPAN):
+        """(centre, span) of a range covering this stream's and frequency +/- span / 2
+
+        Returns None when that would be wider than max_span. The range at
+        least doubles each time (up to max_span), so requests spread over
+        a band (e.g. FM 88-108 MHz) settle on one session after a few
+        restarts instead of restarting rtl_power for every new frequency.
+        """
+        low = min(self.freq_start, frequency - span / 2)
+        high = max(self.freq_end, frequency + span / 2)
+        if high - low > max_span:
+            return None
+        pad = max(min(2 * self.span, max_span) - (high - low), 0.0) / 2
+        # Whole Hz (as rtl_power is told anyway), so covers() holds exactly afterwards
+        low, high = float(np.floor(max(low - pad, 0.0))), float(np.ceil(high + pad))
+        return (low + high) / 2, high - low
+
+    @property
+    def running(self):
+        return self._proc is not None and self._proc.poll() is None
+
+    def build_command(self):
+        return self.command + [
+            '-d', str(self.device_index),
+            '-f', f'{int(self.freq_start)}:{int(self.freq_end)}:{self.bin_size}',
+            '-i', str(self.interval),
+            '-'
+        ]
+
+    def start(self):
+        """Start (or restart after restart_delay) the rtl_power process"""
+        with self._lock:
+            if self.running:
+                return True
+            now = time.monotonic()
+            if self._started_at is not None and now - self._started_at < self.restart_delay:
+                return False
+            self._started_at = now
+            try:
+                self._proc = subprocess.Popen(self.build_command(), stdout=subprocess.PIPE,
+                                              stderr=subprocess.DEVNULL, text=True, bufsize=1)
+            except OSError as e:
+                print(f"⚠️  Could not start rtl_power stream on device {self.device_index}: {e}")
+                self._proc = None
+                return False
+            self._thread = threading.Thread(target=self._reader, args=(self._proc,),
+                                            name=f"rtl_power-{self.device_index}", daemon=True)
+            self._thread.start()
+            return True
+
+    def _reader(self, proc):
+        assembler = SweepAssembler()
+        for line in proc.stdout:
+            sweep = assembler.feed(line)
+            if sweep is not None:
+                self._push(sweep)
+        sweep = assembler.flush()
+        if sweep is not None:
+            self._push(sweep)
+
+    def _push(self, sweep):
+        sweep['device_index'] = self.device_index
+        self.ring.append(sweep)
+        self.sweep_count += 1
+
+    def latest(self):
+        """Newest complete sweep, restarting a dead process when allowed"""
+        if not self.running:
+            self.start()
+        try:
+            return self.ring[-1]
+        except IndexError:
+            return None
+
+    def stop(self):
+        """Terminate the rtl_power process and wait for the reader thread"""
+        with self._lock:
+            proc, self._proc = self._proc, None
+            if proc is not None and proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            if self._thread is not None:
+                self._thread.join(timeout=2)
+                self._thread = None
+            if proc is not None:
+                proc.stdout.close()
+            self._started_at = None
+
+
+def sweep_to_capture(sweep, frequency=None, span=None):
+    """Convert a streamed sweep into the collect_real_rtl_sdr_data result format
+
+    With frequency and span only the bins within frequency +/- span / 2 are
+    returned, so a widened stream still answers for the requested window.
+    """
+    power_values = sweep['power_spectrum']
+    freq_start, freq_end = sweep['freq_start'], sweep['freq_end']
+    if frequency is not None and span is not None and sweep['freq_step'] > 0:
+        step = sweep['freq_step']
+        lo = max(int(np.ceil((frequency - span / 2 - freq_start) / step)), 0)
+        hi = min(int(np.floor((frequency + span / 2 - freq_start) / step)) + 1, len(power_values))
+        if lo < hi:
+            power_values = power_values[lo:hi]
+            freq_start, freq_end = freq_start + lo * step, freq_start + (hi - 1) * step
+    return {
+        'avg_power_db': float(np.mean(power_values)),
+        'max_power_db': float(np.max(power_values)),
+        'power_spectrum': power_values,
+        'freq_start': freq_start,
+        'freq_end': freq_end,
+        'source': 'REAL_RTL_SDR',
+        'device_index': sweep['device_index']
+    }
+
+
+class MultiChannelCapture:
+    """Capture from several devices at once and align the results per sweep
+
+    capture_fn(device_index, frequency, duration) returns a capture dict
+    (see sweep_to_capture) or None. Each device runs on its own pool thread,
+    so a sweep takes about as long as the slowest single device; a device
+    that fails, raises or times out is reported without affecting the rest.
+
+    A timed-out capture is cancelled if it has not started, otherwise
+    on_timeout(device_index) is called to abort it (e.g. kill its rtl_power).
+    Until it actually returns the device is reported 'busy' rather than
+    given another pool thread, so one hung tuner cannot starve the pool.
+    """
+
+    def __init__(self, capture_fn, device_indices, timeout=None, on_timeout=None):
+        self.capture_fn = capture_fn
+        self.device_indices = list(device_indices)
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.failure_counts = {idx: 0 for idx in self.device_indices}
+        self._inflight = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, len(self.device_indices)), thread_name_prefix="kraken-capture")
+
+    def _timed(self, device_index, frequency, duration):
+        start = time.perf_counter()
+        result = self.capture_fn(device_index, frequency, duration)
+        return result, (time.perf_counter() - start) * 1000.0
+
+    def capture(self, frequency=146.52e6, duration=1):
+        """Run one sweep on every device; returns an aligned multi-channel record"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        futures = {}
+        failures = {}
+        for idx in self.device_indices:
+            previous = self._inflight.get(idx)
+            if previous is not None and not previous.done():
+                failures[idx] = "busy"
+                continue
+            futures[idx] = self._inflight[idx] = self._pool.submit(self._timed, idx, frequency, duration)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        channels = []
+        timing_ms = {}
+        for idx in self.device_indices:
+            future = futures.get(idx)
+            result = None
+            if future is not None:
+                try:
+                    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    result, elapsed = future.result(timeout=remaining)
+                    timing_ms[idx] = elapsed
+                    if result is None:
+                        failures[idx] = "no data"
+                except concurrent.futures.TimeoutError:
+                    failures[idx] = "timeout"
+                    if not future.cancel() and self.on_timeout is not None:
+                        self.on_timeout(idx)
+                except Exception as e:
+                    failures[idx] = str(e)
+            if result is None:
+                self.failure_counts[idx] += 1
+            channels.append(result)
+
+        ok = [c for c in channels if c is not None]
+        record = {
+            'timestamp': timestamp,
+            'device_indices': self.device_indices,
+            'channels': channels,
+            'channels_ok': len(ok),
+            'device_timing_ms': timing_ms,
+            'failures': failures,
+            'sweep_ms': (time.perf_counter() - start) * 1000.0,
+            'power_matrix': None
+        }
+        if ok:
+            record['max_power_db'] = max(c['max_power_db'] for c in ok)
+            record['avg_power_db'] = float(np.mean([c['avg_power_db'] for c in ok]))
+            lengths = {len(c['power_spectrum']) for c in ok}
+            if len(ok) == len(channels) and len(lengths) == 1:
+                # All tuners delivered the same bins - stack into (channels, bins)
+                record['power_matrix'] = np.vstack([np.asarray(c['power_spectrum'], dtype=float)
+                                                    for c in ok])
+        return record
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
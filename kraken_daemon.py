@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Logger Daemon
+Per-event-type monotonic scheduler with a Unix control socket
+"""
+
+import heapq
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+
+DEFAULT_SOCKET = "/tmp/kraken-logger.sock"
+
+# Records per second for each event type
+DEFAULT_RATES = {
+    "doa": 1.0,
+    "spectrum": 0.2,
+    "radar": 0.5,
+    "beamforming": 0.5,
+    "tdoa": 0.2,
+    "status": 0.1
+}
+
+OVERRUN_POLICIES = ("skip", "catch-up")
+
+
+def parse_rates(text):
+    """Parse 'doa=2,spectrum=0.5' into a rates dict on top of DEFAULT_RATES"""
+    rates = dict(DEFAULT_RATES)
+    for item in filter(None, (text or "").split(',')):
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_RATES:
+            raise ValueError(f"Unknown event type: {name}")
+        rates[name] = float(value)
+    return rates
+
+
+class TaskStats:
+    def __init__(self, rate):
+        self.rate = rate
+        self.runs = 0
+        self.triggered = 0
+        self.skipped = 0
+        self.caught_up = 0
+        self.errors = 0
+        self.last_run_ms = None
+        self.max_lateness_ms = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class RateScheduler:
+    """Run one callable per event type at its own fixed rate
+
+    Deadlines advance by exactly one period from the previous deadline (not
+    from when the task finished), so there is no cumulative drift. When a
+    task falls a whole period or more behind, "skip" drops the missed ticks
+    and realigns to the grid, while "catch-up" runs up to max_catchup missed
+    ticks back to back. Control commands are executed on the scheduler
+    thread between ticks, and idle() (if given) every idle_interval seconds.
+    """
+
+    def __init__(self, tasks, rates, overrun="skip", max_catchup=5, clock=time.monotonic,
+                 idle=None, idle_interval=1.0):
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        self.tasks = tasks
+        self.overrun = overrun
+        self.max_catchup = max_catchup
+        self.clock = clock
+        self.idle = idle
+        self.idle_interval = idle_interval
+        self.stats = {name: TaskStats(rates.get(name, 0.0)) for name in tasks}
+        self.started = None
+        self._heap = []
+        self._commands = queue.Queue()
+        self._stop = threading.Event()
+
+    def _period(self, name):
+        rate = self.stats[name].rate
+        return 1.0 / rate if rate > 0 else None
+
+    def _schedule(self, name, deadline):
+        if self._period(name) is not None:
+            heapq.heappush(self._heap, (deadline, name))
+
+    def _run_task(self, name):
+        stats = self.stats[name]
+        start = self.clock()
+        try:
+            self.tasks[name]()
+        except Exception as e:
+            stats.errors += 1
+            print(f"⚠️  Scheduled {name} task failed: {e}")
+        stats.last_run_ms = (self.clock() - start) * 1000.0
+        stats.runs += 1
+
+    def _tick(self, deadline, name):
+        period = self._period(name)
+        if period is None:
+            return
+        stats = self.stats[name]
+        lateness = self.clock() - deadline
+        stats.max_lateness_ms = max(stats.max_lateness_ms, lateness * 1000.0)
+        self._run_task(name)
+        next_deadline = deadline + period
+        behind = self.clock() - next_deadline
+        if behind >= period:
+            missed = int(behind // period)
+            if self.overrun == "catch-up":
+                extra = min(missed, self.max_catchup)
+                for _ in range(extra):
+                    self._run_task(name)
+                stats.caught_up += extra
+                stats.skipped += missed - extra
+            else:
+                stats.skipped += missed
+            next_deadline += missed * period
+        self._schedule(name, next_deadline)
+
+    def call(self, fn, timeout=30.0):
+        """Run fn on the scheduler thread and return its result"""
+        done = threading.Event()
+        box = {}
+
+        def wrapped():
+            try:
+                box['result'] = fn()
+            except Exception as e:
+                box['error'] = str(e)
+            done.set()
+
+        self._commands.put(wrapped)
+        if not done.wait(timeout):
+            raise TimeoutError("scheduler did not respond")
+        if 'error' in box:
+            raise RuntimeError(box['error'])
+        return box.get('result')
+
+    def trigger(self, name):
+        """Run one event type (or "all") immediately, outside its schedule"""
+        names = list(self.tasks) if name == "all" else [name]
+        for n in names:
+            if n not in self.tasks:
+                raise ValueError(f"Unknown event type: {n}")
+            self._run_task(n)
+            self.stats[n].triggered += 1
+        return names
+
+    def set_rate(self, name, rate):
+        """Change one event type's rate; the new period starts now"""
+        if name not in self.tasks:
+            raise ValueError(f"Unknown event type: {name}")
+        self.stats[name].rate = float(rate)
+        self._heap = [(d, n) for d, n in self._heap if n != name]
+        heapq.heapify(self._heap)
+        self._schedule(name, self.clock() + (self._period(name) or 0))
+
+    def status(self):
+        return {
+            "uptime_s": self.clock() - self.started if self.started is not None else 0.0,
+            "overrun_policy": self.overrun,
+            "tasks": {name: stats.as_dict() for name, stats in self.stats.items()}
+        }
+
+    def _run_idle(self):
+        try:
+            self.idle()
+        except Exception as e:
+            print(f"⚠️  Scheduler idle task failed: {e}")
+
+    def run(self):
+        """Run until stop() or request_stop() is called"""
+        self.started = self.clock()
+        next_idle = self.started + self.idle_interval
+        for name in self.tasks:
+            self._schedule(name, self.started)
+        while not self._stop.is_set():
+            wake = min(self._heap[0][0] if self._heap else self.clock() + 1.0, next_idle)
+            try:
+                command = self._commands.get(timeout=max(0.0, wake - self.clock()))
+            except queue.Empty:
+                command = None
+            if command is not None:
+                command()
+                continue
+            if self.clock() >= next_idle:
+                # request_stop() is only noticed when the loop wakes, so wake at least this often
+                if self.idle is not None:
+                    self._run_idle()
+                next_idle = self.clock() + self.idle_interval
+            if self._heap and self._heap[0][0] <= self.clock():
+                deadline, name = heapq.heappop(self._heap)
+                self._tick(deadline, name)
+
+    def stop(self):
+        self._stop.set()
+        self._commands.put(lambda: None)
+
+    def request_stop(self):
+        """Stop from a signal handler: only sets a flag (no queue locks), seen within idle_interval"""
+        self._stop.set()
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode().strip()
+            if not line:
+                continue
+            try:
+                reply = {"ok": True, "result": self.server.kraken_daemon.handle_command(line)}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class _ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class LoggerDaemon:
+    """Long-running logger: RateScheduler plus a line-oriented control socket
+
+    Commands (one per line, JSON reply per line):
+      status | stats                - scheduler, pipeline and logger metrics
+      trigger <event|all>           - log one record of a type now
+      generate-samples              - run the full generate_sample_data round
+      rate <event> <records/sec>    - change a rate (0 pauses the type)
+      flush | stop
+
+    Buffered records are flushed every flush_interval seconds, and SIGTERM
+    (e.g. from pkill) stops the loop and closes the logger like "stop".
+    """
+
+    def __init__(self, logger, rates=None, overrun="skip", socket_path=DEFAULT_SOCKET, flush_interval=1.0):
+        self.logger = logger
+        self.socket_path = socket_path
+        tasks = {name: (lambda n=name: logger.log_sample_event(n)) for name in DEFAULT_RATES}
+        self.scheduler = RateScheduler(tasks, rates or DEFAULT_RATES, overrun=overrun,
+                                       idle=self._flush, idle_interval=flush_interval)
+        self.server = None
+
+    def _flush(self):
+        # With a pipeline the worker flushes after each batch; draining it here would stall ticks
+        if getattr(self.logger, "pipeline", None) is None:
+            self.logger.flush_writer()
+
+    def _on_sigterm(self, signum, frame):
+        print("\n🛑 Logger daemon received SIGTERM")
+        self.scheduler.request_stop()
+
+    def handle_command(self, line):
+        parts = line.split()
+        command, args = parts[0].lower(), parts[1:]
+        sched = self.scheduler
+        if command in ("status", "stats"):
+            result = sched.call(sched.status)
+            if getattr(self.logger, "pipeline", None) is not None:
+                result["pipeline"] = self.logger.pipeline.stats()
+            if getattr(self.logger, "metrics", None) is not None:
+                result["metrics"] = self.logger.metrics.snapshot()
+            return result
+        if command == "trigger":
+            names = sched.call(lambda: sched.trigger(args[0] if args else "all"))
+            sched.call(self.logger.flush)
+            return names
+        if command == "generate-samples":
+            sched.call(self.logger.generate_sample_data)
+            return "generated"
+        if command == "rate" and len(args) == 2:
+            return sched.call(lambda: sched.set_rate(args[0], float(args[1])))
+        if command == "flush":
+            return sched.call(self.logger.flush)
+        if command == "stop":
+            sched.stop()
+            return "stopping"
+        raise ValueError(f"Unknown command: {line}")
+
+    def _start_server(self):
+        if os.path.exists(self.socket_path):
+            # Refuse to take over a live daemon's socket, remove a stale one
+            if send_command("status", self.socket_path, timeout=1.0) is not None:
+                raise RuntimeError(f"Logger daemon already running on {self.socket_path}")
+            os.remove(self.socket_path)
+        self.server = _ControlServer(self.socket_path, _ControlHandler)
+        self.server.kraken_daemon = self
+        threading.Thread(target=self.server.serve_forever, name="kraken-control", daemon=True).start()
+
+    def run(self):
+        self._start_server()
+        previous = None
+        if threading.current_thread() is threading.main_thread():
+            previous = signal.signal(signal.SIGTERM, self._on_sigterm)
+        print(f"🚀 Logger daemon running - control socket {self.socket_path}")
+        for name, stats in self.scheduler.stats.items():
+            print(f"   {name}: {stats.rate:g} records/sec")
+        try:
+            self.scheduler.run()
+        except KeyboardInterrupt:
+            print("\n🛑 Logger daemon stopped")
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            try:
+                os.remove(self.socket_path)
+            except FileNotFoundError:
+                pass
+            # Write out everything still buffered before the process goes away
+            self.logger.close()
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+
+
+def send_command(command, socket_path=DEFAULT_SOCKET, timeout=30.0):
+    """Send one control command; returns the decoded reply or None if no daemon answers"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall((command + "\n").encode())
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:
+        return None
+    return json.loads(data) if data else None
+
+
+def main():
+    """Lightweight control client - talks to a running daemon without loading the logger"""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='KrakenSDR logger daemon control client')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                       help=f'Control socket path (default: {DEFAULT_SOCKET})')
+    parser.add_argument('--send', nargs='+', required=True, metavar='COMMAND',
+                       help='Command to send, e.g. "status" or "trigger all"')
+    args = parser.parse_args()
+
+    reply = send_command(' '.join(args.send), args.socket)
+    if reply is None:
+        print(f"No logger daemon listening on {args.socket}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    main()
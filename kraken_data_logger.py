@@ -6,16 +6,117 @@ Converts KrakenSDR data streams to JSON format for Filebeat ingestion
 REFACTORED TO USE REAL RTL-SDR HARDWARE
 """
 
-import json
 import time
 import os
 import sys
+import shlex
 import subprocess
 import numpy as np
 from datetime import datetime, timezone
 
+from kraken_array_codec import ENCODINGS, SidecarStore, encode_array
+from kraken_capture import MultiChannelCapture, RtlPowerStream, parse_rtl_power_line, sweep_to_capture
+from kraken_detect import SignalDetector
+from kraken_daemon import DEFAULT_SOCKET, OVERRUN_POLICIES, LoggerDaemon, parse_rates
+from kraken_discovery import HardwareDiscoveryCache
+from kraken_doa import ARRAY_TYPES, DoaEstimator
+from kraken_doa_spectrum import DoaSpectrumGenerator
+from kraken_es_shipper import ElasticsearchShipper
+from kraken_log_writer import KrakenLogWriter
+from kraken_metrics import LoggerMetrics, MetricsServer
+from kraken_pipeline import POLICIES, LoggingPipeline
+from kraken_radar import IQ_FORMATS, PassiveRadarProcessor, iq_blocks
+from kraken_replay import TIMESTAMP_MODES, ReplayClock, parse_speed, parse_start_time, replay_iq_blocks, replay_rows
+from kraken_serializer import RecordSerializer
+from kraken_status import ProcStatusCollector
+from kraken_tdoa import TdoaSolver
+from kraken_sweep import SweepAggregator, parse_frequency, rtl_power_lines, rtl_power_rows, sweep_segments
+
+# Fields that never change per event type - pre-encoded once by RecordSerializer
+RECORD_CONSTANTS = {
+    "doa": {
+        "event_type": "direction_finding",
+        "sensor_type": "kraken_sdr",
+        "processing_mode": "coherent_doa",
+        "vfo_bandwidth_hz": 25000,  # VFO bandwidth
+        "sample_rate_hz": 2400000  # REAL field name from actual data
+    },
+    "spectrum": {
+        "event_type": "spectrum_analysis",
+        "window_function": "hann",
+        "averaging_factor": 0.8,
+        "sensor_type": "kraken_sdr",
+        "sample_rate_hz": 2400000,  # REAL field name from actual data
+        "coherent_processing": True,
+        "calibration_applied": True
+    },
+    "radar": {
+        "event_type": "passive_radar_detection",
+        "sensor_type": "kraken_sdr",
+        "radar_mode": "passive",
+        "channels": 5,
+        "coherent_processing": True
+    },
+    "beamforming": {
+        "event_type": "beamforming",
+        "sensor_type": "kraken_sdr",
+        "channels": 5,
+        "coherent_processing": True
+    },
+    "tdoa": {
+        "event_type": "tdoa_triangulation",
+        "sensor_type": "kraken_sdr",
+        "channels": 5,
+        "coherent_processing": True,
+        "synchronization": {
+            "clock_accuracy_ppm": 0.1,
+            "phase_locked": True,
+            "timing_source": "GPS_disciplined_oscillator"
+        }
+    },
+    "status": {
+        "event_type": "system_status",
+        "sensor_type": "kraken_sdr"
+    },
+    "sweep": {
+        "event_type": "spectrum_sweep_segment",
+        "sensor_type": "kraken_sdr",
+        "capture_tool": "rtl_power"
+    }
+}
+
+# Range-Doppler engine settings advertised in every radar record's processing block;
+# integration_time_ms is the default block length, records carry the one actually used
+RADAR_PROCESSING = {
+    "correlation_type": "cross_correlation",
+    "integration_time_ms": 1000,
+    "range_gates": 512,
+    "doppler_bins": 256,
+    "cfar_threshold": 12.0,  # Constant False Alarm Rate
+    "clutter_suppression": True,
+    "moving_target_indication": True
+}
+
+# Common illuminator frequencies for passive radar
+ILLUMINATOR_SOURCES = [
+    {"type": "FM_Radio", "frequency": 98.5e6, "power_dbm": 60},
+    {"type": "DVB-T", "frequency": 578e6, "power_dbm": 55},
+    {"type": "GSM", "frequency": 945e6, "power_dbm": 45},
+    {"type": "WiFi", "frequency": 2.4e9, "power_dbm": 20}
+]
+
+# Public logging entry points that pipeline mode moves onto the writer thread
+LOG_METHODS = ("log_doa_data", "log_spectrum_data", "log_passive_radar",
+               "log_beamforming_data", "log_tdoa_data", "log_system_status", "log_sweep_segment",
+               "log_doa_batch", "log_spectrum_batch", "log_radar_batch",
+               "log_beamforming_batch", "log_tdoa_batch")
+
 class KrakenDataLogger:
-    def __init__(self, log_dir=None):
+    def __init__(self, log_dir=None, flush_bytes=64 * 1024, flush_interval=1.0,
+                 streaming=False, rtl_power_cmd='rtl_power', seed=None, array_encoding="json",
+                 pipeline=None, queue_size=10000, es_url=None, es_username=None, es_password=None,
+                 es_verify_ssl=False, discovery_cache=None, quiet=False, metrics_interval=None,
+                 metrics_port=None, tdoa_stations=None):
         # Auto-detect correct log directory - USE UNIFIED DATA STRUCTURE
         if log_dir is None:
             # Get rf-kit base directory (parent of kraken-sdr)
@@ -24,17 +125,176 @@ class KrakenDataLogger:
             self.log_dir = os.path.join(base_dir, "data", "kraken")
         else:
             self.log_dir = log_dir
+        # Quiet mode drops the per-record progress prints
+        self.quiet = quiet
         self.ensure_log_directory()
-        self.rtl_sdr_count = 0
-        self.check_rtl_sdr_hardware()
+        # Stage timings and counters; optionally served on /metrics and/or logged as kraken-metrics records
+        self.metrics = LoggerMetrics()
+        self.metrics_interval = metrics_interval
+        self._next_metrics = time.monotonic() + metrics_interval if metrics_interval else None
+        self.metrics_server = MetricsServer(self.metrics, port=metrics_port) if metrics_port is not None else None
+        self._closed = False
+        # One persistent buffered handle per event type and day
+        self.writer = KrakenLogWriter(self.log_dir, flush_bytes=flush_bytes, flush_interval=flush_interval)
+        if es_url:
+            # Ship straight to Elasticsearch _bulk; log files only receive spilled records
+            self.writer = ElasticsearchShipper(es_url, username=es_username, password=es_password,
+                                               verify_ssl=es_verify_ssl, fallback=self.writer,
+                                               flush_interval=flush_interval)
+        self.serializer = RecordSerializer(RECORD_CONSTANTS)
+        # Array encoding for spectra ("json" keeps plain float lists for Filebeat)
+        self.array_encoding = array_encoding
+        self.sidecar = SidecarStore(self.log_dir) if array_encoding == "peaks" else None
+        # Long-lived rtl_power sessions, one per device, when streaming is enabled
+        self.streaming = streaming
+        self.rtl_power_cmd = rtl_power_cmd
+        self.streams = {}
+        self.capture_scheduler = None
+        # One-shot rtl_power processes by device, so a timed-out capture can be killed
+        self.capture_procs = {}
+        # Shared generator for simulated DoA spectra (arrays without a known geometry)
+        self.doa_generator = DoaSpectrumGenerator(seed=seed)
+        # Generator for simulated IQ snapshots and TDOA noise, seeded alongside the spectra
+        self.rng = np.random.default_rng(seed)
+        # Bartlett/MVDR/MUSIC over IQ snapshots for the UCA/ULA arrays, with cached steering vectors
+        self.doa_estimator = DoaEstimator()
+        # CFAR carrier detector that places the VFO channels
+        self.detector = SignalDetector()
+        # Range-Doppler engine, created on first use (see process_radar_block)
+        self.radar = None
+        # Multilateration over the TDOA receiver sites (latitude, longitude per antenna)
+        self.tdoa_solver = TdoaSolver(tdoa_stations)
+        # Device count comes from the discovery cache; rtl_test only runs on first use if it is stale
+        self.discovery = discovery_cache or HardwareDiscoveryCache()
+        self.status_collector = ProcStatusCollector()
+        self._rtl_sdr_count = self.discovery.load()
+        # Optional background pipeline: log_* calls only enqueue (policy: block/drop/sample)
+        self.pipeline = None
+        if pipeline:
+            self.pipeline = LoggingPipeline(self.flush_writer, maxsize=queue_size, policy=pipeline)
+            for name in LOG_METHODS:
+                setattr(self, name, self.pipeline.wrap(getattr(self, name)))
 
     def ensure_log_directory(self):
         """Create log directory if it doesn't exist"""
         os.makedirs(self.log_dir, exist_ok=True)
         print(f"KrakenSDR logs will be written to: {self.log_dir}")
 
+    def _say(self, message):
+        """Per-record progress output, silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+
+    def _encode(self, event_type, record):
+        """Serialize one record (constant fields spliced in), timing the serialization stage"""
+        start = time.perf_counter()
+        line = self.serializer.encode(event_type, record)
+        self.metrics.observe("serialization", time.perf_counter() - start)
+        return line
+
+    def _write_lines(self, event_type, lines):
+        """Hand serialized records to the writer pool and count them"""
+        start = time.perf_counter()
+        if len(lines) == 1:
+            self.writer.write(event_type, lines[0])
+        else:
+            self.writer.write_many(event_type, lines)
+        self.metrics.observe("write", time.perf_counter() - start)
+        self.metrics.count_records(event_type, len(lines), sum(map(len, lines)) + len(lines))
+        if self._next_metrics is not None and time.monotonic() >= self._next_metrics:
+            self.log_metrics()
+
+    def _write_record(self, event_type, record):
+        """Serialize one record and hand it to the writer pool"""
+        self._write_lines(event_type, [self._encode(event_type, record)])
+
+    def log_metrics(self, timestamp=None):
+        """Log a kraken-metrics record with the current counters and stage timings"""
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
+        if self.metrics_interval:
+            self._next_metrics = time.monotonic() + self.metrics_interval
+        metrics_data = {
+            "@timestamp": timestamp,
+            "unix_epoch_time": int(time.time() * 1000),
+            "event_type": "logger_metrics",
+            **self.metrics.snapshot()
+        }
+        if self.pipeline is not None:
+            metrics_data["pipeline"] = self.pipeline.stats()
+        self.writer.write("metrics", self.serializer.encode("metrics", metrics_data))
+
+    def _encode_array(self, record, field, array, event_type):
+        """Store an array field, encoded into "<field>_encoded" unless the encoding is plain JSON"""
+        if self.array_encoding == "json":
+            record[field] = np.ascontiguousarray(array, dtype=float)
+        else:
+            record[f"{field}_encoded"] = encode_array(array, self.array_encoding, self.sidecar, event_type)
+
+    def flush_writer(self):
+        """Write buffered records and sidecar arrays to disk"""
+        start = time.perf_counter()
+        if self.sidecar is not None:
+            self.sidecar.flush()
+        self.writer.flush()
+        self.metrics.observe("flush", time.perf_counter() - start)
+
+    def flush(self):
+        """Write all queued and buffered records to disk"""
+        if self.pipeline is not None:
+            self.pipeline.drain()
+        self.flush_writer()
+
+    def close(self):
+        """Drain the pipeline, stop capture streams, flush buffered records and close all log files"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.pipeline is not None:
+            self.pipeline.close()
+        if self.metrics_interval:
+            self.log_metrics()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+            self.metrics_server = None
+        if self.radar is not None:
+            self.radar.close()
+        if self.capture_scheduler is not None:
+            for device_index in list(self.capture_procs):
+                self.kill_rtl_sdr_capture(device_index)
+            self.capture_scheduler.close()
+            self.capture_scheduler = None
+        for stream in self.streams.values():
+            stream.stop()
+        self.streams.clear()
+        if self.sidecar is not None:
+            self.sidecar.close()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def rtl_sdr_count(self):
+        """Number of RTL-SDR devices, probing the hardware on first access if not cached"""
+        if self._rtl_sdr_count is None and self.check_rtl_sdr_hardware():
+            self.discovery.store(self._rtl_sdr_count)
+        return self._rtl_sdr_count
+
+    @rtl_sdr_count.setter
+    def rtl_sdr_count(self, count):
+        self._rtl_sdr_count = count
+
+    @property
+    def known_rtl_sdr_count(self):
+        """Device count for record metadata: the cached or probed count, else 0 (never probes)"""
+        return self._rtl_sdr_count or 0
+
     def check_rtl_sdr_hardware(self):
-        """Check for real RTL-SDR hardware"""
+        """Check for real RTL-SDR hardware; returns False if rtl_test itself failed"""
         try:
             result = subprocess.run(['rtl_test', '-t'], capture_output=True, text=True, timeout=5)
             # Count how many RTL-SDR devices are found
@@ -47,24 +307,29 @@ class KrakenDataLogger:
                             try:
                                 self.rtl_sdr_count = int(parts[i+1])
                                 print(f"✅ Found {self.rtl_sdr_count} RTL-SDR device(s) for KrakenSDR")
-                                return
+                                return True
                             except:
                                 pass
             print("⚠️  No RTL-SDR devices found - will generate sample data")
             self.rtl_sdr_count = 0
+            return True
         except Exception as e:
+            # Missing rtl_test or a hung probe says nothing about the hardware: not cached
             print(f"⚠️  Could not detect RTL-SDR hardware: {e}")
             self.rtl_sdr_count = 0
+            return False
     
     def collect_real_rtl_sdr_data(self, device_index=0, frequency=146.52e6, duration=1):
         """Collect REAL data from RTL-SDR device"""
         if self.rtl_sdr_count == 0:
             return None
 
+        if self.streaming:
+            return self.read_rtl_sdr_stream(device_index, frequency)
+
         try:
             # Use rtl_power to get real spectrum data
-            cmd = [
-                'rtl_power',
+            cmd = shlex.split(self.rtl_power_cmd) + [
                 '-d', str(device_index),
                 '-f', f'{int(frequency-1e6)}:{int(frequency+1e6)}:10k',
                 '-i', '1',
@@ -72,56 +337,131 @@ class KrakenDataLogger:
                 '-'
             ]
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=duration+2)
-
-            if result.returncode == 0 and result.stdout:
-                # Parse rtl_power output
-                lines = result.stdout.strip().split('\n')
-                if lines:
-                    # Last line has the data
-                    data_line = lines[-1]
-                    parts = data_line.split(',')
-                    if len(parts) > 6:
-                        # Extract power values (skip date, time, freq range, etc)
-                        power_values = [float(x) for x in parts[6:] if x.strip()]
-                        if power_values:
-                            avg_power = np.mean(power_values)
-                            max_power = np.max(power_values)
-                            return {
-                                'avg_power_db': avg_power,
-                                'max_power_db': max_power,
-                                'power_spectrum': power_values,
-                                'source': 'REAL_RTL_SDR',
-                                'device_index': device_index
-                            }
+            # Popen rather than run() so a multi-channel timeout can kill it (kill_rtl_sdr_capture)
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            self.capture_procs[device_index] = proc
+            try:
+                stdout, _ = proc.communicate(timeout=duration+2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            finally:
+                self.capture_procs.pop(device_index, None)
+
+            if proc.returncode == 0 and stdout:
+                # Parse rtl_power output - last line has the data
+                row = parse_rtl_power_line(stdout.strip().split('\n')[-1])
+                if row:
+                    power_values = row[4]
+                    return {
+                        'avg_power_db': np.mean(power_values),
+                        'max_power_db': np.max(power_values),
+                        'power_spectrum': power_values,
+                        'source': 'REAL_RTL_SDR',
+                        'device_index': device_index
+                    }
             return None
         except Exception as e:
             print(f"⚠️  RTL-SDR data collection failed: {e}")
             return None
 
+    def kill_rtl_sdr_capture(self, device_index):
+        """Kill a device's one-shot rtl_power capture if one is running"""
+        proc = self.capture_procs.get(device_index)
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def collect_multichannel_data(self, frequency=146.52e6, duration=1):
+        """Capture from every detected device in parallel as one aligned record"""
+        if self.rtl_sdr_count == 0:
+            return None
+        if self.capture_scheduler is None:
+            self.capture_scheduler = MultiChannelCapture(
+                lambda idx, freq, dur: self.collect_real_rtl_sdr_data(device_index=idx, frequency=freq, duration=dur),
+                range(self.rtl_sdr_count), timeout=duration + 3, on_timeout=self.kill_rtl_sdr_capture)
+        record = self.capture_scheduler.capture(frequency, duration)
+        for device_index, reason in record['failures'].items():
+            self.metrics.count_capture_failure(device_index, reason)
+        if record['channels_ok'] == 0:
+            return None
+        return record
+
+    def _timed_capture(self, capture_fn, **kwargs):
+        """Run a hardware capture, timing the capture stage"""
+        start = time.perf_counter()
+        result = capture_fn(**kwargs)
+        self.metrics.observe("capture", time.perf_counter() - start)
+        return result
+
+    def get_rtl_sdr_stream(self, device_index=0, frequency=146.52e6, span=2e6):
+        """Return the running stream for a device covering frequency +/- span / 2
+
+        A device can only run one rtl_power session, so an out-of-range
+        request widens the session to cover both ranges (up to
+        MAX_STREAM_SPAN) and only retunes outright beyond that.
+        """
+        centre = frequency
+        stream = self.streams.get(device_index)
+        if stream is not None and not stream.covers(frequency, span):
+            covering = stream.covering(frequency, span)
+            if covering is not None:
+                centre, span = covering
+            stream.stop()
+            stream = None
+        if stream is None:
+            stream = RtlPowerStream(device_index=device_index, frequency=centre, span=span,
+                                    command=self.rtl_power_cmd)
+            self.streams[device_index] = stream
+            stream.start()
+        return stream
+
+    def read_rtl_sdr_stream(self, device_index=0, frequency=146.52e6, span=2e6):
+        """Non-blocking read of the newest streamed sweep around frequency (None until the first arrives)"""
+        sweep = self.get_rtl_sdr_stream(device_index, frequency, span).latest()
+        if sweep is None:
+            return None
+        return sweep_to_capture(sweep, frequency, span)
+
     def log_doa_data(self, bearing=None, confidence=None, frequency=146.52e6, rssi_db=None, latency_ms=None,
                      station_id="KrakenSDR-001", latitude=None, longitude=None,
                      gps_heading=None, compass_heading=None, array_type="UCA",
-                     doa_spectrum=None, timestamp=None, use_real_data=True):
-        """Log Direction of Arrival data - Full KrakenSDR format with REAL RTL-SDR data"""
+                     doa_spectrum=None, timestamp=None, use_real_data=True, iq_snapshots=None,
+                     doa_method="MUSIC"):
+        """Log Direction of Arrival data - Full KrakenSDR format with REAL RTL-SDR data
+
+        With iq_snapshots, shaped (5, samples), from a UCA/ULA array the
+        360° spectrum comes from the DoA engine (doa_method); otherwise it
+        is simulated around the bearing by the vectorized spectrum generator.
+        """
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
 
         # Try to collect REAL data from RTL-SDR if available
         real_data = None
         if use_real_data and self.rtl_sdr_count >= 5:
-            print("📡 Collecting REAL data from RTL-SDR devices...")
-            real_data = self.collect_real_rtl_sdr_data(device_index=0, frequency=frequency)
+            self._say("📡 Collecting REAL data from RTL-SDR devices...")
+            real_data = self._timed_capture(self.collect_multichannel_data, frequency=frequency)
 
         # Use real data if available, otherwise generate sample data
         if real_data:
             rssi_db = real_data['max_power_db']
             data_source = "REAL_RTL_SDR_HARDWARE"
-            print(f"✅ Using REAL RTL-SDR data: {rssi_db:.2f} dB")
+            self._say(f"✅ Using REAL RTL-SDR data: {rssi_db:.2f} dB "
+                  f"({real_data['channels_ok']}/{len(real_data['channels'])} channels)")
         else:
             rssi_db = rssi_db or np.random.uniform(-80, -20)
             data_source = "SIMULATED_SAMPLE_DATA"
-            print(f"⚠️  Using simulated data (no RTL-SDR hardware)")
+            self._say("⚠️  Using simulated data (no RTL-SDR hardware)")
+
+        estimate = None
+        if doa_spectrum is None and iq_snapshots is not None and array_type in ARRAY_TYPES:
+            estimate = self._estimate_doa(iq_snapshots, frequency, array_type, doa_method)
+            doa_spectrum = estimate["spectra"][0]
+            if bearing is None:
+                bearing = float(estimate["bearings"][0])
+            if confidence is None:
+                confidence = float(estimate["confidence"][0])
 
         # Generate bearing if not provided
         if bearing is None:
@@ -131,19 +471,12 @@ class KrakenDataLogger:
 
         # Generate realistic DOA spectrum (360 degrees) if not provided
         if doa_spectrum is None:
-            doa_spectrum = np.zeros(360)
-            # Add main lobe at bearing
-            main_idx = int(bearing) % 360
-            doa_spectrum[main_idx] = 1.0
-            # Add some noise and side lobes
-            for i in range(360):
-                doa_spectrum[i] += np.random.normal(0, 0.1)
-                if abs(i - main_idx) < 10:  # Side lobes
-                    doa_spectrum[i] += 0.3 * np.exp(-((i - main_idx)**2) / 20)
+            start = time.perf_counter()
+            doa_spectrum = self.doa_generator.generate_one(bearing)
+            self.metrics.observe("synthesis", time.perf_counter() - start)
 
         doa_data = {
             "@timestamp": timestamp,
-            "event_type": "direction_finding",
             "unix_epoch_time": int(time.time() * 1000),  # 13 digit UNIX epoch
             "bearing_degrees": bearing,  # Compass convention (90° = East)
             "confidence": confidence,  # 0-99 float
@@ -157,63 +490,94 @@ class KrakenDataLogger:
             "gps_heading": gps_heading,
             "compass_heading": compass_heading,
             "main_heading_sensor": "GPS" if gps_heading else "Compass",
-            "doa_spectrum_360": doa_spectrum.tolist(),  # Full 360° DOA output
-            "sensor_type": "kraken_sdr",
-            "channels": self.rtl_sdr_count if self.rtl_sdr_count > 0 else 5,
-            "processing_mode": "coherent_doa",
-            "vfo_bandwidth_hz": 25000,  # VFO bandwidth
-            "sample_rate_hz": 2400000,  # REAL field name from actual data
+            "channels": self.known_rtl_sdr_count or 5,
             "data_source": data_source,
-            "rtl_sdr_devices_available": self.rtl_sdr_count
+            "rtl_sdr_devices_available": self.known_rtl_sdr_count
         }
+        if real_data:
+            # Per-tuner results from the parallel capture, aligned to this record
+            doa_data["channel_rssi_db"] = [c['max_power_db'] if c else None for c in real_data['channels']]
+            doa_data["channels_captured"] = real_data['channels_ok']
+            doa_data["capture_sweep_ms"] = real_data['sweep_ms']
+        if estimate is not None:
+            doa_data["doa_method"] = doa_method
+        self._encode_array(doa_data, "doa_spectrum_360", doa_spectrum, "doa")  # Full 360° DOA output
 
-        log_file = os.path.join(self.log_dir, f"kraken-doa-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(doa_data) + '\n')
+        self._write_record("doa", doa_data)
     
-    def log_spectrum_data(self, frequencies=None, power_levels=None, vfo_channels=None, timestamp=None, use_real_data=True):
-        """Log spectrum analysis data with VFO channel information - REAL RTL-SDR data"""
+    def _estimate_doa(self, iq_snapshots, frequency, array_type, method):
+        """Run the DoA engine over (N, 5, samples) snapshots, timed as the "doa" stage"""
+        start = time.perf_counter()
+        estimate = self.doa_estimator.estimate(iq_snapshots, frequency, array_type, method)
+        self.metrics.observe("doa", time.perf_counter() - start)
+        return estimate
+
+    def _estimate_doa_batch(self, iq_snapshots, frequencies, array_type, method):
+        """_estimate_doa over snapshots at per-row frequencies, one pass per steering-cache step
+
+        Rows are grouped by the estimator's quantised frequency so each group
+        is scanned with its own (cached) steering matrix.
+        """
+        iq_snapshots = np.asarray(iq_snapshots)
+        if iq_snapshots.ndim == 2:
+            iq_snapshots = iq_snapshots[None]
+        n = len(iq_snapshots)
+        frequencies = np.broadcast_to(np.asarray(frequencies, dtype=float), (n,))
+        steps = np.rint(frequencies / self.doa_estimator.frequency_step_hz)
+        groups, inverse = np.unique(steps, return_inverse=True)
+        if len(groups) == 1:
+            return self._estimate_doa(iq_snapshots, float(frequencies[0]), array_type, method)
+        estimate = {"bearings": np.empty(n), "confidence": np.empty(n),
+                    "spectra": np.empty((n, len(self.doa_estimator.angles)))}
+        for group in range(len(groups)):
+            rows = np.flatnonzero(inverse == group)
+            part = self._estimate_doa(iq_snapshots[rows], float(frequencies[rows[0]]), array_type, method)
+            for key, values in estimate.items():
+                values[rows] = part[key]
+        return estimate
+
+    def log_spectrum_data(self, frequencies=None, power_levels=None, vfo_channels=None, timestamp=None, use_real_data=True,
+                          source_label=None):
+        """Log spectrum analysis data with VFO channel information - REAL RTL-SDR data
+
+        source_label overrides data_source for supplied spectra (e.g. replayed captures).
+        """
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
 
         # Try to collect REAL spectrum data from RTL-SDR
         data_source = "SIMULATED_SAMPLE_DATA"
         if use_real_data and self.rtl_sdr_count > 0:
-            print("📡 Collecting REAL spectrum data from RTL-SDR...")
-            real_data = self.collect_real_rtl_sdr_data(device_index=0, frequency=146.52e6, duration=2)
+            self._say("📡 Collecting REAL spectrum data from RTL-SDR...")
+            real_data = self._timed_capture(self.collect_real_rtl_sdr_data, device_index=0,
+                                            frequency=146.52e6, duration=2)
+            if real_data is None:
+                self.metrics.count_capture_failure(0)
             if real_data and 'power_spectrum' in real_data:
                 power_levels = real_data['power_spectrum']
                 # Generate frequency array based on collected data
-                freq_start = 145.52e6
-                freq_end = 147.52e6
+                freq_start = real_data.get('freq_start', 145.52e6)
+                freq_end = real_data.get('freq_end', 147.52e6)
                 frequencies = np.linspace(freq_start, freq_end, len(power_levels))
                 data_source = "REAL_RTL_SDR_HARDWARE"
-                print(f"✅ Using REAL RTL-SDR spectrum data: {len(power_levels)} points")
+                self._say(f"✅ Using REAL RTL-SDR spectrum data: {len(power_levels)} points")
 
         # Fallback to sample data if no real data available
         if frequencies is None or power_levels is None:
-            print("⚠️  Using simulated spectrum data (no RTL-SDR hardware)")
+            self._say("⚠️  Using simulated spectrum data (no RTL-SDR hardware)")
             frequencies = np.linspace(145e6, 148e6, 100)
             power_levels = -70 + 20 * np.random.randn(100)
 
-        # Generate VFO channel data if not provided
+        # Place VFO channels on the carriers detected in this spectrum if not provided
+        signals = None
         if vfo_channels is None:
-            vfo_channels = []
-            # Create 3 VFO channels covering different parts of spectrum
-            for i in range(3):
-                center_freq = frequencies[len(frequencies)//4 * (i+1)]
-                vfo_channels.append({
-                    "vfo_id": i,
-                    "center_frequency_hz": float(center_freq),
-                    "bandwidth_hz": 25000,
-                    "squelch_db": -60,
-                    "active": True,
-                    "signal_detected": bool(np.random.choice([True, False], p=[0.3, 0.7]))
-                })
+            start = time.perf_counter()
+            signals, noise_floor_db = self.detector.detect(frequencies, power_levels)
+            vfo_channels = self.detector.vfo_channels(signals, noise_floor_db)
+            self.metrics.observe("detection", time.perf_counter() - start)
 
         spectrum_data = {
             "@timestamp": timestamp,
-            "event_type": "spectrum_analysis",
             "unix_epoch_time": int(time.time() * 1000),
             "frequency_range_hz": {
                 "start": float(frequencies[0]),
@@ -229,248 +593,803 @@ class KrakenDataLogger:
             },
             "vfo_channels": vfo_channels,
             "fft_size": len(frequencies),
-            "window_function": "hann",
-            "averaging_factor": 0.8,
-            "sensor_type": "kraken_sdr",
-            "sample_rate_hz": 2400000,  # REAL field name from actual data
-            "channels": self.rtl_sdr_count if self.rtl_sdr_count > 0 else 5,
-            "coherent_processing": True,
-            "calibration_applied": True,
-            "data_source": data_source,
-            "rtl_sdr_devices_available": self.rtl_sdr_count
+            "channels": self.known_rtl_sdr_count or 5,
+            "data_source": source_label or data_source,
+            "rtl_sdr_devices_available": self.known_rtl_sdr_count
         }
+        if signals is not None:
+            spectrum_data["power_stats"]["noise_floor_dbm"] = noise_floor_db
+            spectrum_data["signals_detected"] = len(signals)
+        # Full power array only travels in compact encodings
+        if self.array_encoding != "json":
+            self._encode_array(spectrum_data, "power_spectrum_db", power_levels, "spectrum")
 
-        log_file = os.path.join(self.log_dir, f"kraken-spectrum-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(spectrum_data) + '\n')
+        self._write_record("spectrum", spectrum_data)
     
     def log_passive_radar(self, target_range, target_bearing, target_velocity,
                          illuminator_freq=None, target_snr=None, doppler_hz=None,
-                         range_resolution=None, velocity_resolution=None, timestamp=None):
-        """Log passive radar detection data with full capabilities"""
+                         range_resolution=None, velocity_resolution=None, timestamp=None,
+                         bistatic_geometry=None, data_source="SIMULATED_SAMPLE_DATA", integration_time_ms=None):
+        """Log passive radar detection data with full capabilities
+
+        Missing values are only made up for simulated records; for measured
+        ones (data_source from the range-Doppler engine) they stay null.
+        integration_time_ms defaults to the advertised block length.
+        """
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
+        simulated = data_source == "SIMULATED_SAMPLE_DATA"
 
         # Common illuminator frequencies for passive radar
         if illuminator_freq is None:
-            illuminator_sources = [
-                {"type": "FM_Radio", "frequency": 98.5e6, "power_dbm": 60},
-                {"type": "DVB-T", "frequency": 578e6, "power_dbm": 55},
-                {"type": "GSM", "frequency": 945e6, "power_dbm": 45},
-                {"type": "WiFi", "frequency": 2.4e9, "power_dbm": 20}
-            ]
-            illuminator = np.random.choice(illuminator_sources)
+            illuminator = np.random.choice(ILLUMINATOR_SOURCES)
         else:
             illuminator = {"type": "Custom", "frequency": illuminator_freq, "power_dbm": 50}
+        if target_snr is None and simulated:
+            target_snr = np.random.uniform(10, 30)
+        if doppler_hz is None:
+            doppler_hz = target_velocity * illuminator["frequency"] / 3e8
+        if range_resolution is None:
+            range_resolution = 150  # ~150m resolution
+        if velocity_resolution is None:
+            velocity_resolution = 2  # ~2 m/s resolution
+        if bistatic_geometry is None and simulated:
+            bistatic_geometry = {
+                "baseline_meters": np.random.uniform(1000, 10000),
+                "bistatic_angle_degrees": np.random.uniform(30, 150)
+            }
 
         radar_data = {
             "@timestamp": timestamp,
-            "event_type": "passive_radar_detection",
             "unix_epoch_time": int(time.time() * 1000),
             "target": {
                 "range_meters": target_range,
                 "bearing_degrees": target_bearing,
                 "velocity_ms": target_velocity,
-                "snr_db": target_snr or np.random.uniform(10, 30),
-                "doppler_shift_hz": doppler_hz or (target_velocity * illuminator["frequency"] / 3e8),
-                "range_bin": int(target_range / (range_resolution or 150)),  # ~150m resolution
-                "velocity_bin": int(target_velocity / (velocity_resolution or 2))  # ~2 m/s resolution
+                "snr_db": target_snr,
+                "doppler_shift_hz": doppler_hz,
+                "range_bin": int(target_range / range_resolution),
+                "velocity_bin": int(target_velocity / velocity_resolution)
             },
             "illuminator": illuminator,
+            "bistatic_geometry": bistatic_geometry,
+            "processing": self._radar_processing(integration_time_ms),
+            "data_source": data_source
+        }
+
+        self._write_record("radar", radar_data)
+
+    @staticmethod
+    def _radar_processing(integration_time_ms=None):
+        """processing block of a radar record"""
+        if integration_time_ms is None:
+            return RADAR_PROCESSING
+        return {**RADAR_PROCESSING, "integration_time_ms": integration_time_ms}
+
+    def _radar_processor(self, sample_rate):
+        """Range-Doppler engine configured from the processing block that radar records advertise"""
+        return PassiveRadarProcessor(sample_rate=sample_rate, range_gates=RADAR_PROCESSING["range_gates"],
+                                     doppler_bins=RADAR_PROCESSING["doppler_bins"],
+                                     cfar_threshold_db=RADAR_PROCESSING["cfar_threshold"])
+
+    def process_radar_block(self, reference, surveillance, illuminator_freq=98.5e6, sample_rate=2.4e6,
+                            target_bearing=None, timestamp=None, data_source="PASSIVE_RADAR_ENGINE"):
+        """Run one reference/surveillance IQ block through the range-Doppler engine and log each detection"""
+        if self.radar is None or self.radar.sample_rate != sample_rate:
+            if self.radar is not None:
+                self.radar.close()
+            self.radar = self._radar_processor(sample_rate)
+        self.radar.carrier_hz = illuminator_freq
+        start = time.perf_counter()
+        result = self.radar.process(reference, surveillance)
+        self.metrics.observe("radar", time.perf_counter() - start)
+        for detection in result["detections"]:
+            self.log_passive_radar(detection["bistatic_range_m"], target_bearing, detection["bistatic_velocity_ms"],
+                                   illuminator_freq=illuminator_freq, target_snr=detection["snr_db"],
+                                   doppler_hz=detection["doppler_hz"],
+                                   range_resolution=result["range_resolution_m"],
+                                   velocity_resolution=result["velocity_resolution_ms"], timestamp=timestamp,
+                                   data_source=data_source, integration_time_ms=result["integration_s"] * 1000.0)
+        return result
+
+    def process_radar_files(self, reference_path, surveillance_path, iq_format="cu8", sample_rate=2.4e6,
+                            illuminator_freq=98.5e6, block_seconds=None):
+        """Process recorded reference/surveillance IQ files block by block (memory-mapped)
+
+        Blocks default to the advertised integration_time_ms.
+        """
+        if block_seconds is None:
+            block_seconds = RADAR_PROCESSING["integration_time_ms"] / 1000.0
+        block = int(sample_rate * block_seconds)
+        blocks = 0
+        for reference, surveillance in zip(iq_blocks(reference_path, iq_format, block),
+                                           iq_blocks(surveillance_path, iq_format, block)):
+            result = self.process_radar_block(reference, surveillance, illuminator_freq, sample_rate,
+                                              data_source="RAW_IQ_FILE")
+            blocks += 1
+            self._say(f"📡 Radar block {blocks}: {len(result['detections'])} detection(s), "
+                      f"{result['processing_ms']:.0f} ms")
+        self.flush()
+        return blocks
+
+    def _beam_patterns(self, directions, iq_snapshots, frequency, array_type, algorithm):
+        """Steer the DoA engine's beamformer; returns (directions, pattern dict, algorithm used)
+
+        Without snapshots there is no covariance to adapt to, so the beam is
+        plain delay-and-sum (Bartlett). Missing directions are estimated
+        from the snapshots with MUSIC, so one of the two is required.
+        """
+        if directions is None and iq_snapshots is None:
+            raise ValueError("beamforming needs beam directions or iq_snapshots to estimate them from")
+        start = time.perf_counter()
+        cov = None
+        if iq_snapshots is not None:
+            cov = self.doa_estimator.covariance(iq_snapshots)
+            if directions is None:
+                directions = self.doa_estimator.estimate(iq_snapshots, frequency, array_type)["bearings"]
+        else:
+            algorithm = "Bartlett"
+        directions = np.asarray(directions, dtype=float).reshape(-1) % 360.0
+        weights = self.doa_estimator.weights(cov, frequency, array_type, directions, algorithm)
+        patterns = self.doa_estimator.beam_patterns(weights, frequency, array_type, directions)
+        self.metrics.observe("doa", time.perf_counter() - start)
+        return directions, patterns, algorithm
+
+    def _beamforming_record(self, frequency, array_type, algorithm, gain_db):
+        """Geometry and processing blocks shared by beamforming records"""
+        return {
+            "frequency_hz": frequency,
+            "array_config": self.doa_estimator.array_config(array_type, frequency),
             "processing": {
-                "correlation_type": "cross_correlation",
-                "integration_time_ms": 1000,
-                "range_gates": 512,
-                "doppler_bins": 256,
-                "cfar_threshold": 12.0,  # Constant False Alarm Rate
-                "clutter_suppression": True,
-                "moving_target_indication": True
-            },
-            "sensor_type": "kraken_sdr",
-            "radar_mode": "passive",
-            "channels": 5,
-            "coherent_processing": True,
-            "bistatic_geometry": {
-                "baseline_meters": np.random.uniform(1000, 10000),
-                "bistatic_angle_degrees": np.random.uniform(30, 150)
+                "algorithm": algorithm,  # MVDR = Minimum Variance Distortionless Response
+                "adaptive": algorithm != "Bartlett",
+                "interference_suppression": algorithm != "Bartlett",
+                "noise_reduction_db": gain_db  # White-noise array gain of the weights
             }
         }
 
-        log_file = os.path.join(self.log_dir, f"kraken-radar-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(radar_data) + '\n')
+    def log_beamforming_data(self, beam_direction=None, beam_gain=None, null_directions=None, timestamp=None,
+                             iq_snapshots=None, frequency=146.52e6, array_type="UCA", algorithm="MVDR"):
+        """Log beamforming data for signal enhancement
 
-    def log_beamforming_data(self, beam_direction, beam_gain, null_directions=None, timestamp=None):
-        """Log beamforming data for signal enhancement"""
+        The pattern (gain, 3 dB beamwidth, side lobes, nulls) is computed
+        for algorithm ("MVDR" or "Bartlett") weights from iq_snapshots,
+        shaped (5, samples); beam_gain and null_directions override the
+        computed values when given.
+        """
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
 
+        directions, patterns, algorithm = self._beam_patterns(
+            None if beam_direction is None else [beam_direction], iq_snapshots, frequency, array_type, algorithm)
+        gain = float(patterns["gain_db"][0])
         if null_directions is None:
-            null_directions = [beam_direction + 180 % 360]  # Simple null opposite to beam
+            null_directions = patterns["null_directions"][0]
 
         beamforming_data = {
             "@timestamp": timestamp,
-            "event_type": "beamforming",
             "unix_epoch_time": int(time.time() * 1000),
             "beam_pattern": {
-                "main_lobe_direction": beam_direction,
-                "main_lobe_gain_db": beam_gain,
+                "main_lobe_direction": beam_direction if beam_direction is not None else float(directions[0]),
+                "main_lobe_gain_db": beam_gain if beam_gain is not None else gain,
                 "null_directions": null_directions,
-                "beamwidth_3db": 30.0,  # 3dB beamwidth
-                "side_lobe_level_db": -20.0
-            },
-            "array_config": {
-                "elements": 5,
-                "geometry": "UCA",
-                "element_spacing_wavelengths": 0.5,
-                "array_diameter_meters": 1.0
-            },
-            "processing": {
-                "algorithm": "MVDR",  # Minimum Variance Distortionless Response
-                "adaptive": True,
-                "interference_suppression": True,
-                "noise_reduction_db": 10.0
+                "beamwidth_3db": float(patterns["beamwidth_3db"][0]),  # 3dB beamwidth
+                "side_lobe_level_db": self._finite(patterns["side_lobe_level_db"][0])
             },
-            "sensor_type": "kraken_sdr",
-            "channels": 5,
-            "coherent_processing": True
+            **self._beamforming_record(frequency, array_type, algorithm, gain)
         }
 
-        log_file = os.path.join(self.log_dir, f"kraken-beamforming-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(beamforming_data) + '\n')
+        self._write_record("beamforming", beamforming_data)
+
+    def _tdoa_fixes(self, positions, measurements):
+        """Solve (positions None) or assess (N, pairs) TDOA sets
+
+        Returns per-record lists (latitude, longitude, accuracy, gdop,
+        residual, ambiguous) and the solver name, None unless a position
+        was actually solved; ambiguous is only known for solved fixes.
+        """
+        n = len(measurements)
+        if measurements.shape[1] != len(self.tdoa_solver.pairs):
+            # Not the configured receiver geometry - nothing to solve against
+            lat, lon = (positions[:, 0].tolist(), positions[:, 1].tolist()) if positions is not None else ([None] * n,) * 2
+            return lat, lon, [None] * n, [None] * n, [None] * n, [None] * n, None
+        start = time.perf_counter()
+        if positions is None:
+            fix = self.tdoa_solver.solve(measurements)
+            ambiguous, solver = fix["ambiguous"].tolist(), "closed_form_gauss_newton"
+        else:
+            fix = self.tdoa_solver.evaluate(positions[:, :2], measurements)
+            fix["latitude"], fix["longitude"] = positions[:, 0], positions[:, 1]
+            ambiguous, solver = [None] * n, None
+        self.metrics.observe("tdoa", time.perf_counter() - start)
+        return (fix["latitude"].tolist(), fix["longitude"].tolist(), fix["estimated_accuracy_meters"].tolist(),
+                fix["gdop"].tolist(), fix["residual_rms_m"].tolist(), ambiguous, solver)
 
     def log_tdoa_data(self, source_position, tdoa_measurements, timestamp=None):
-        """Log Time Difference of Arrival data for triangulation"""
+        """Log Time Difference of Arrival data for triangulation
+
+        With source_position None the emitter position is solved from the
+        measurements (see kraken_tdoa.TdoaSolver); otherwise the given
+        position is logged with its GDOP and residuals.
+        """
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
 
+        measurements = np.atleast_2d(np.asarray(tdoa_measurements, dtype=float))
+        if source_position is not None and len(source_position) < 2:
+            # A partial position can be neither solved for nor assessed: log what was given
+            lat = [source_position[0] if len(source_position) > 0 else None]
+            lon = [None]
+            accuracy = gdop = residual = ambiguous = [None]
+            solver = None
+        else:
+            positions = None if source_position is None else np.array([source_position[:2]], dtype=float)
+            lat, lon, accuracy, gdop, residual, ambiguous, solver = self._tdoa_fixes(positions, measurements)
+
         tdoa_data = {
             "@timestamp": timestamp,
-            "event_type": "tdoa_triangulation",
             "unix_epoch_time": int(time.time() * 1000),
             "source_location": {
-                "latitude": source_position[0] if len(source_position) > 0 else None,
-                "longitude": source_position[1] if len(source_position) > 1 else None,
-                "estimated_accuracy_meters": np.random.uniform(10, 100)
+                "latitude": lat[0],
+                "longitude": lon[0],
+                "estimated_accuracy_meters": accuracy[0],
+                "ambiguous": ambiguous[0]  # Mirror fix across a collinear receiver layout fits as well
             },
             "tdoa_measurements": tdoa_measurements,  # List of time differences between antenna pairs
             "processing": {
                 "algorithm": "hyperbolic_triangulation",
-                "antenna_pairs": 10,  # C(5,2) = 10 pairs from 5 antennas
+                "solver": solver,
+                "antenna_pairs": measurements.shape[1],  # C(5,2) = 10 pairs from 5 antennas
                 "time_resolution_ns": 1.0,  # Nanosecond timing resolution
-                "geometric_dilution": np.random.uniform(1.0, 3.0)
-            },
-            "sensor_type": "kraken_sdr",
-            "channels": 5,
-            "coherent_processing": True,
-            "synchronization": {
-                "clock_accuracy_ppm": 0.1,
-                "phase_locked": True,
-                "timing_source": "GPS_disciplined_oscillator"
+                "geometric_dilution": gdop[0],
+                "residual_rms_m": residual[0]
             }
         }
 
-        log_file = os.path.join(self.log_dir, f"kraken-tdoa-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(tdoa_data) + '\n')
+        self._write_record("tdoa", tdoa_data)
     
-    def log_system_status(self, timestamp=None):
-        """Log KrakenSDR system status"""
+    def log_sweep_segment(self, segment, timestamp=None, data_source="REAL_RTL_SDR_HARDWARE"):
+        """Log one wide-band sweep segment (see kraken_sweep.SweepAggregator)"""
         if timestamp is None:
             timestamp = datetime.now(timezone.utc).isoformat()
-        
-        # Get process information
+
+        freq_start, freq_end = segment["freq_start"], segment["freq_end"]
+        sweep_data = {
+            "@timestamp": timestamp,
+            "unix_epoch_time": int(time.time() * 1000),
+            "segment_index": segment["segment_index"],
+            "sweep_index": segment["sweep_index"],
+            "rtl_power_stamp": segment["rtl_power_stamp"],
+            "frequency_range_hz": {
+                "start": freq_start,
+                "end": freq_end,
+                "center": (freq_start + freq_end) / 2,
+                "span_hz": freq_end - freq_start
+            },
+            "bin_size_hz": segment["bin_size_hz"],
+            "bins": segment["bins"],
+            "power_stats": segment["power_stats"],  # This pass only
+            "running_stats": segment["running_stats"],  # Every pass so far (Welford)
+            "peak": segment["peak"],
+            "data_source": data_source
+        }
+        self._encode_array(sweep_data, "max_hold_db", segment["max_hold_db"], "sweep")
+        self._encode_array(sweep_data, "average_db", segment["average_db"], "sweep")
+
+        self._write_record("sweep", sweep_data)
+
+    def run_sweep(self, freq_start, freq_end, bin_size=10e3, segment_hz=10e6, display_bins=64,
+                  interval=1, sweeps=None, device_index=0, source=None):
+        """Scan freq_start..freq_end with rtl_power (or replay a CSV file) and log per-segment records
+
+        Rows are aggregated as they arrive, so memory stays bounded however
+        wide the range is. Runs until sweeps complete passes (None = forever).
+        """
+        if source is None:
+            lines = rtl_power_lines(freq_start, freq_end, bin_size, interval, device_index,
+                                    command=self.rtl_power_cmd, single=sweeps == 1)
+            data_source = "REAL_RTL_SDR_HARDWARE"
+        else:
+            lines = sys.stdin if source == '-' else open(source)
+            data_source = "RTL_POWER_CSV_FILE"
+        aggregator = SweepAggregator(freq_start, freq_end, segment_hz, display_bins)
+        completed = 0
         try:
-            synthetic_pid = subprocess.check_output(['pgrep', '-f', 'test_data_synthesizer']).decode().strip()
-            delay_sync_pid = subprocess.check_output(['pgrep', '-f', 'delay_sync.py']).decode().strip()
-            rebuffer_pid = subprocess.check_output(['pgrep', '-f', 'rebuffer.out']).decode().strip()
-            
-            # Get CPU usage
-            cpu_usage = subprocess.check_output(['ps', '-p', delay_sync_pid, '-o', '%cpu', '--no-headers']).decode().strip()
-            
-            # Get memory usage
-            mem_usage = subprocess.check_output(['ps', '-p', delay_sync_pid, '-o', 'rss', '--no-headers']).decode().strip()
-            
-            status_data = {
-                "@timestamp": timestamp,
-                "event_type": "system_status",
-                "processes": {
-                    "synthetic_generator": {"pid": int(synthetic_pid), "status": "running"},
-                    "delay_sync": {"pid": int(delay_sync_pid), "status": "running", "cpu_percent": float(cpu_usage)},
-                    "rebuffer": {"pid": int(rebuffer_pid), "status": "running"}
+            for segment in sweep_segments(rtl_power_rows(lines), aggregator, max_sweeps=sweeps):
+                self.log_sweep_segment(segment, data_source=data_source)
+                if aggregator.sweep_index > completed:
+                    completed = aggregator.sweep_index
+                    self._say(f"✅ Sweep {completed} complete ({len(aggregator.segments)} segments)")
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+            self.flush()
+        return aggregator.sweep_index
+
+    def replay_rtl_power(self, path, speed=1.0, timestamps="wall", freq_range=None, segment_hz=10e6,
+                         display_bins=64):
+        """Replay a recorded rtl_power CSV (memory-mapped) through the spectrum path
+
+        Each row is logged with log_spectrum_data; with freq_range
+        (start, stop) rows are aggregated into sweep segments instead.
+        speed is the replay rate (1 = as recorded, 0 = as fast as possible)
+        and timestamps a kraken_replay.TIMESTAMP_MODES rewrite mode.
+        """
+        clock = ReplayClock(speed, timestamps)
+        aggregator = SweepAggregator(*freq_range, segment_hz, display_bins) if freq_range else None
+        records_before = sum(self.metrics.records.values())
+        start = time.perf_counter()
+        rows = 0
+        stamp = None
+        for stamp, row in replay_rows(path, clock):
+            rows += 1
+            if aggregator is None:
+                _, low, _, step, powers = row
+                self.log_spectrum_data(low + step * np.arange(len(powers)), powers,
+                                       timestamp=clock.isoformat(stamp), use_real_data=False,
+                                       source_label="REPLAY_RTL_POWER_CSV")
+                continue
+            for segment in aggregator.feed(row):
+                self.log_sweep_segment(segment, clock.isoformat(stamp), data_source="REPLAY_RTL_POWER_CSV")
+        if aggregator is not None and stamp is not None:
+            for segment in aggregator.flush():
+                self.log_sweep_segment(segment, clock.isoformat(stamp), data_source="REPLAY_RTL_POWER_CSV")
+        self.flush()
+        return self._replay_stats(rows, records_before, start, clock)
+
+    def replay_iq(self, paths, iq_format="cu8", sample_rate=2.4e6, speed=1.0, timestamps="wall",
+                  block_seconds=1.0, frequency=146.52e6, array_type="UCA", doa_method="MUSIC",
+                  cpi_samples=16384, illuminator_freq=98.5e6, start_time=None):
+        """Replay recorded raw IQ files (memory-mapped) through the radar or DoA path
+
+        Two files are reference/surveillance channels for passive radar;
+        five are the array channels, cut into cpi_samples snapshots and
+        logged with log_doa_batch one block at a time. Raw IQ has no
+        recorded time, so "original" timestamps need start_time (epoch
+        seconds of the first sample).
+        """
+        if len(paths) not in (2, 5):
+            raise ValueError(f"IQ replay needs 2 (radar) or 5 (DoA) channel files, got {len(paths)}")
+        if timestamps == "original" and start_time is None:
+            raise ValueError("Raw IQ has no recorded time: 'original' timestamps need a capture start_time")
+        clock = ReplayClock(speed, timestamps)
+        block = int(sample_rate * block_seconds)
+        records_before = sum(self.metrics.records.values())
+        start = time.perf_counter()
+        blocks = 0
+        for stamp, iq in replay_iq_blocks(paths, clock, iq_format, sample_rate, block, start_time or 0.0):
+            blocks += 1
+            if len(paths) == 2:
+                self.process_radar_block(iq[0], iq[1], illuminator_freq, sample_rate,
+                                         timestamp=clock.isoformat(stamp), data_source="REPLAY_RAW_IQ")
+                continue
+            cpis = block // cpi_samples
+            snapshots = iq[:, :cpis * cpi_samples].reshape(len(paths), cpis, cpi_samples).transpose(1, 0, 2)
+            self.log_doa_batch(None, frequencies=frequency, array_type=array_type, iq_snapshots=snapshots,
+                               doa_method=doa_method, source_label="REPLAY_RAW_IQ",
+                               timestamps=clock.spread(stamp, np.arange(cpis) * cpi_samples / sample_rate))
+        self.flush()
+        return self._replay_stats(blocks, records_before, start, clock)
+
+    def _replay_stats(self, inputs, records_before, start, clock):
+        """Summary of one replay run"""
+        return {
+            "inputs": inputs,
+            "records": sum(self.metrics.records.values()) - records_before,
+            "elapsed_s": time.perf_counter() - start,
+            "max_lag_s": clock.max_lag_s
+        }
+
+    def _batch_times(self, n, timestamps=None):
+        """ISO timestamps and 13-digit epoch times for a batch
+
+        timestamps may be None (whole batch stamped now), epoch seconds
+        (array-like of numbers) or ISO strings.
+        """
+        if timestamps is None:
+            now = time.time()
+            iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+            return [iso] * n, [int(now * 1000)] * n
+        timestamps = np.broadcast_to(np.asarray(timestamps), (n,))
+        if timestamps.dtype.kind in "iuf":
+            epoch_us = np.rint(timestamps * 1e6).astype('int64')
+            iso = np.datetime_as_string(epoch_us.astype('datetime64[us]'), unit='us')
+            return [t + "+00:00" for t in iso.tolist()], (epoch_us // 1000).tolist()
+        return timestamps.astype(str).tolist(), [int(time.time() * 1000)] * n
+
+    @staticmethod
+    def _finite(value):
+        """None for NaN/inf so the field indexes as a missing number"""
+        return float(value) if np.isfinite(value) else None
+
+    @staticmethod
+    def _batch_column(values, n, default):
+        """Broadcast a scalar/array column to n values, drawing defaults where None"""
+        if values is None:
+            if default is None:
+                raise ValueError("batch column is required")
+            return default()
+        return np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+    def log_doa_batch(self, bearings, confidences=None, frequencies=146.52e6, rssi_db=None,
+                      latency_ms=None, timestamps=None, doa_spectra=None, station_id="KrakenSDR-001",
+                      array_type="UCA", latitude=None, longitude=None, use_real_data=False,
+                      iq_snapshots=None, doa_method="MUSIC", source_label=None):
+        """Log many DoA estimates from column arrays with one write
+
+        iq_snapshots (N, 5, samples) are estimated in batched passes, one
+        per frequency step; with bearings None the estimated bearings are
+        logged. Without snapshots spectra are simulated by the vectorized
+        spectrum generator. source_label overrides data_source (e.g.
+        replayed captures).
+        """
+        estimate = None
+        if doa_spectra is None and iq_snapshots is not None and array_type in ARRAY_TYPES:
+            estimate = self._estimate_doa_batch(iq_snapshots, frequencies, array_type, doa_method)
+            doa_spectra = estimate["spectra"]
+            if bearings is None:
+                bearings = estimate["bearings"]
+            if confidences is None:
+                confidences = estimate["confidence"]
+        if bearings is None:
+            raise ValueError("DoA batch needs bearings or iq_snapshots to estimate them from")
+        bearings = np.asarray(bearings, dtype=float).reshape(-1)
+        n = len(bearings)
+        if n == 0:
+            return
+
+        # One capture for the whole batch when real hardware is requested
+        real_data = None
+        if use_real_data and rssi_db is None and self.rtl_sdr_count >= 5:
+            real_data = self._timed_capture(self.collect_multichannel_data, frequency=float(np.mean(frequencies)))
+        if real_data:
+            rssi_db = real_data['max_power_db']
+            data_source = "REAL_RTL_SDR_HARDWARE"
+        else:
+            data_source = "SIMULATED_SAMPLE_DATA"
+
+        confidences = self._batch_column(confidences, n, lambda: np.random.uniform(50, 80, n))
+        frequencies = self._batch_column(frequencies, n, None)
+        rssi_db = self._batch_column(rssi_db, n, lambda: np.random.uniform(-80, -20, n))
+        latency_ms = self._batch_column(latency_ms, n, lambda: np.random.uniform(50, 200, n))
+        if doa_spectra is None:
+            start = time.perf_counter()
+            doa_spectra = self.doa_generator.generate(bearings)
+            self.metrics.observe("synthesis", time.perf_counter() - start)
+        iso, epoch_ms = self._batch_times(n, timestamps)
+        channels = self.known_rtl_sdr_count or 5
+
+        lines = []
+        for i, (bearing, confidence, rssi, freq, latency) in enumerate(zip(
+                bearings.tolist(), confidences.tolist(), rssi_db.tolist(),
+                frequencies.tolist(), latency_ms.tolist())):
+            doa_data = {
+                "@timestamp": iso[i],
+                "unix_epoch_time": epoch_ms[i],
+                "bearing_degrees": bearing,
+                "confidence": confidence,
+                "rssi_db": rssi,
+                "frequency_hz": freq,
+                "array_arrangement": array_type,
+                "latency_ms": latency,
+                "station_id": station_id,
+                "latitude": latitude,
+                "longitude": longitude,
+                "gps_heading": None,
+                "compass_heading": None,
+                "main_heading_sensor": "Compass",
+                "channels": channels,
+                "data_source": source_label or data_source,
+                "rtl_sdr_devices_available": self.known_rtl_sdr_count
+            }
+            if estimate is not None:
+                doa_data["doa_method"] = doa_method
+            self._encode_array(doa_data, "doa_spectrum_360", doa_spectra[i], "doa")
+            lines.append(self._encode("doa", doa_data))
+        self._write_lines("doa", lines)
+
+    def log_spectrum_batch(self, frequencies, power_matrix, timestamps=None, vfo_channels=None):
+        """Log many spectra (rows of power_matrix) with one write
+
+        frequencies is a shared (bins,) axis or an (N, bins) matrix.
+        """
+        power_matrix = np.atleast_2d(np.asarray(power_matrix, dtype=float))
+        n, bins = power_matrix.shape
+        if n == 0:
+            return
+        frequencies = np.broadcast_to(np.asarray(frequencies, dtype=float), (n, bins))
+
+        # Column statistics for every spectrum in one pass
+        f_start = frequencies[:, 0].tolist()
+        f_end = frequencies[:, -1].tolist()
+        f_center = frequencies.mean(axis=1).tolist()
+        p_max = power_matrix.max(axis=1).tolist()
+        p_min = power_matrix.min(axis=1).tolist()
+        p_mean = power_matrix.mean(axis=1).tolist()
+        p_std = power_matrix.std(axis=1).tolist()
+        iso, epoch_ms = self._batch_times(n, timestamps)
+        channels = self.known_rtl_sdr_count or 5
+
+        # One vectorized detector pass over the whole matrix
+        if vfo_channels is None:
+            start = time.perf_counter()
+            signals, noise_floor = self.detector.detect(frequencies, power_matrix)
+            self.metrics.observe("detection", time.perf_counter() - start)
+
+        lines = []
+        for i in range(n):
+            if vfo_channels is None:
+                vfos = self.detector.vfo_channels(signals[i], noise_floor[i])
+            else:
+                vfos = vfo_channels
+            spectrum_data = {
+                "@timestamp": iso[i],
+                "unix_epoch_time": epoch_ms[i],
+                "frequency_range_hz": {
+                    "start": f_start[i],
+                    "end": f_end[i],
+                    "center": f_center[i],
+                    "span_hz": f_end[i] - f_start[i]
+                },
+                "power_stats": {
+                    "max_dbm": p_max[i],
+                    "min_dbm": p_min[i],
+                    "mean_dbm": p_mean[i],
+                    "std_dbm": p_std[i]
+                },
+                "vfo_channels": vfos,
+                "fft_size": bins,
+                "channels": channels,
+                "data_source": "SIMULATED_SAMPLE_DATA",
+                "rtl_sdr_devices_available": self.known_rtl_sdr_count
+            }
+            if vfo_channels is None:
+                spectrum_data["power_stats"]["noise_floor_dbm"] = noise_floor[i]
+                spectrum_data["signals_detected"] = len(signals[i])
+            if self.array_encoding != "json":
+                self._encode_array(spectrum_data, "power_spectrum_db", power_matrix[i], "spectrum")
+            lines.append(self._encode("spectrum", spectrum_data))
+        self._write_lines("spectrum", lines)
+
+    def log_radar_batch(self, target_ranges, target_bearings, target_velocities, illuminator_freq=None,
+                        target_snrs=None, doppler_hz=None, range_resolution=150, velocity_resolution=2,
+                        timestamps=None, integration_time_ms=None):
+        """Log many passive radar detections from column arrays with one write
+
+        target_bearings may be None (unknown bearings log as null, as in
+        log_passive_radar).
+        """
+        ranges = np.asarray(target_ranges, dtype=float).reshape(-1)
+        n = len(ranges)
+        if n == 0:
+            return
+        bearings = [None] * n if target_bearings is None else self._batch_column(target_bearings, n, None).tolist()
+        velocities = self._batch_column(target_velocities, n, None)
+        snrs = self._batch_column(target_snrs, n, lambda: np.random.uniform(10, 30, n))
+
+        if illuminator_freq is None:
+            illuminators = [ILLUMINATOR_SOURCES[k] for k in np.random.randint(0, len(ILLUMINATOR_SOURCES), n)]
+        else:
+            illuminators = [{"type": "Custom", "frequency": illuminator_freq, "power_dbm": 50}] * n
+        illum_freq = np.array([ill["frequency"] for ill in illuminators])
+        doppler = self._batch_column(doppler_hz, n, lambda: velocities * illum_freq / 3e8)
+        range_bins = (ranges / range_resolution).astype(int).tolist()
+        velocity_bins = (velocities / velocity_resolution).astype(int).tolist()
+        baselines = np.random.uniform(1000, 10000, n).tolist()
+        angles = np.random.uniform(30, 150, n).tolist()
+        processing = self._radar_processing(integration_time_ms)
+        iso, epoch_ms = self._batch_times(n, timestamps)
+
+        lines = []
+        for i, (rng_m, bearing, velocity, snr, dop) in enumerate(zip(
+                ranges.tolist(), bearings, velocities.tolist(), snrs.tolist(), doppler.tolist())):
+            radar_data = {
+                "@timestamp": iso[i],
+                "unix_epoch_time": epoch_ms[i],
+                "target": {
+                    "range_meters": rng_m,
+                    "bearing_degrees": bearing,
+                    "velocity_ms": velocity,
+                    "snr_db": snr,
+                    "doppler_shift_hz": dop,
+                    "range_bin": range_bins[i],
+                    "velocity_bin": velocity_bins[i]
+                },
+                "illuminator": illuminators[i],
+                "bistatic_geometry": {
+                    "baseline_meters": baselines[i],
+                    "bistatic_angle_degrees": angles[i]
+                },
+                "processing": processing,
+                "data_source": "SIMULATED_SAMPLE_DATA"
+            }
+            lines.append(self._encode("radar", radar_data))
+        self._write_lines("radar", lines)
+
+    def log_beamforming_batch(self, beam_directions, beam_gains=None, null_directions=None, timestamps=None,
+                              iq_snapshots=None, frequency=146.52e6, array_type="UCA", algorithm="MVDR"):
+        """Log many beamforming results with one write
+
+        iq_snapshots is (N, 5, samples); beam patterns for every record are
+        computed in one batched pass (see log_beamforming_data).
+        null_directions may be a list of per-record lists.
+        """
+        if beam_directions is not None and len(np.atleast_1d(beam_directions)) == 0:
+            return
+        directions, patterns, algorithm = self._beam_patterns(
+            beam_directions, iq_snapshots, frequency, array_type, algorithm)
+        n = len(directions)
+        computed = patterns["gain_db"]
+        gains = computed if beam_gains is None else self._batch_column(beam_gains, n, None)
+        if null_directions is None:
+            null_directions = patterns["null_directions"]
+        beamwidths = patterns["beamwidth_3db"].tolist()
+        side_lobes = patterns["side_lobe_level_db"].tolist()
+        iso, epoch_ms = self._batch_times(n, timestamps)
+
+        lines = []
+        for i, (direction, gain) in enumerate(zip(directions.tolist(), gains.tolist())):
+            beamforming_data = {
+                "@timestamp": iso[i],
+                "unix_epoch_time": epoch_ms[i],
+                "beam_pattern": {
+                    "main_lobe_direction": direction,
+                    "main_lobe_gain_db": gain,
+                    "null_directions": null_directions[i],
+                    "beamwidth_3db": beamwidths[i],
+                    "side_lobe_level_db": self._finite(side_lobes[i])
                 },
-                "memory_usage_kb": int(mem_usage),
-                "sensor_type": "kraken_sdr",
-                "data_rate_mbps": 48.0,
-                "channels_active": 5
+                **self._beamforming_record(frequency, array_type, algorithm, float(computed[i]))
             }
-            
-        except subprocess.CalledProcessError:
-            status_data = {
-                "@timestamp": timestamp,
-                "event_type": "system_status",
-                "processes": {"status": "error", "message": "KrakenSDR processes not running"},
-                "sensor_type": "kraken_sdr"
+            lines.append(self._encode("beamforming", beamforming_data))
+        self._write_lines("beamforming", lines)
+
+    def log_tdoa_batch(self, source_positions, tdoa_measurements, timestamps=None):
+        """Log many TDOA fixes with one write
+
+        source_positions is (N, 2) latitude/longitude, or None to solve every
+        position from the measurements in one vectorized call;
+        tdoa_measurements is (N, pairs) time differences in seconds.
+        """
+        measurements = np.ascontiguousarray(np.atleast_2d(np.asarray(tdoa_measurements, dtype=float)))
+        n = len(measurements)
+        if n == 0:
+            return
+        positions = None
+        if source_positions is not None:
+            positions = np.atleast_2d(np.asarray(source_positions, dtype=float))[:, :2]
+        lat, lon, accuracy, gdop, residual, ambiguous, solver = self._tdoa_fixes(positions, measurements)
+        iso, epoch_ms = self._batch_times(n, timestamps)
+
+        lines = []
+        for i in range(n):
+            tdoa_data = {
+                "@timestamp": iso[i],
+                "unix_epoch_time": epoch_ms[i],
+                "source_location": {
+                    "latitude": lat[i],
+                    "longitude": lon[i],
+                    "estimated_accuracy_meters": accuracy[i],
+                    "ambiguous": ambiguous[i]
+                },
+                "tdoa_measurements": measurements[i],
+                "processing": {
+                    "algorithm": "hyperbolic_triangulation",
+                    "solver": solver,
+                    "antenna_pairs": measurements.shape[1],
+                    "time_resolution_ns": 1.0,
+                    "geometric_dilution": gdop[i],
+                    "residual_rms_m": residual[i]
+                }
             }
+            lines.append(self._encode("tdoa", tdoa_data))
+        self._write_lines("tdoa", lines)
+
+    def log_system_status(self, timestamp=None):
+        """Log KrakenSDR system status"""
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
         
-        log_file = os.path.join(self.log_dir, f"kraken-status-{datetime.now().strftime('%Y%m%d')}.json")
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(status_data) + '\n')
+        # Per-process status straight from /proc (PIDs cached between samples)
+        processes = self.status_collector.sample()
+        running = [p for p in processes.values() if p["status"] == "running"]
+        status_data = {
+            "@timestamp": timestamp,
+            "unix_epoch_time": int(time.time() * 1000),
+            "processes": processes,
+            "processes_running": len(running),
+            "status": "ok" if len(running) == len(processes) else "degraded" if running else "down",
+            "memory_usage_kb": sum(p["rss_kb"] for p in running)
+        }
+        if running:
+            status_data["data_rate_mbps"] = 48.0
+            status_data["channels_active"] = 5
+
+        self._write_record("status", status_data)
     
+    def log_sample_event(self, event_type):
+        """Log one sample record of a single event type (used by the daemon scheduler)"""
+        if event_type == "doa":
+            self.log_doa_data(
+                bearing=np.random.uniform(0, 360),
+                confidence=np.random.uniform(0.7, 15.0),  # Realistic confidence range
+                frequency=np.random.uniform(88e6, 108e6),  # FM band
+                array_type=np.random.choice(["UCA", "ULA", "Custom"])
+            )
+        elif event_type == "spectrum":
+            frequencies = np.linspace(88e6, 108e6, 1000)  # 88-108 MHz (FM band)
+            power_levels = -95 + 2 * np.random.randn(1000)
+            stations = np.random.choice(1000, 3, replace=False)
+            power_levels[stations] += np.random.uniform(15, 35, 3)  # A few FM stations above the floor
+            self.log_spectrum_data(frequencies, power_levels)
+        elif event_type == "radar":
+            target_range = np.random.uniform(1000, 50000)
+            target_bearing = np.random.uniform(0, 360)
+            target_velocity = np.random.uniform(-100, 100)
+            self.log_passive_radar(target_range, target_bearing, target_velocity)
+        elif event_type == "beamforming":
+            beam_direction = np.random.uniform(0, 360)
+            interferer = (beam_direction + np.random.uniform(60, 300)) % 360
+            # Wanted signal plus a stronger interferer; MVDR steers at one and nulls the other
+            iq_snapshots = self.doa_estimator.synthetic_snapshots(
+                [[beam_direction, interferer]], 146.52e6, "UCA", snr_db=[10.0, 20.0], samples=64, rng=self.rng)[0]
+            self.log_beamforming_data(beam_direction, iq_snapshots=iq_snapshots)
+        elif event_type == "tdoa":
+            source_lat = 40.7128 + np.random.uniform(-0.1, 0.1)  # Near NYC
+            source_lon = -74.0060 + np.random.uniform(-0.1, 0.1)
+            # 10 antenna pairs consistent with the receiver sites, 10 ns timing noise; position is solved
+            tdoa_measurements = self.tdoa_solver.simulate([source_lat, source_lon], 10e-9, rng=self.rng)[0]
+            self.log_tdoa_data(None, tdoa_measurements.tolist())
+        elif event_type == "status":
+            self.log_system_status()
+        else:
+            raise ValueError(f"Unknown event type: {event_type}")
+
     def generate_sample_data(self):
         """Generate comprehensive sample data for all KrakenSDR capabilities"""
-        print("Generating comprehensive KrakenSDR data for all capabilities...")
+        self._say("Generating comprehensive KrakenSDR data for all capabilities...")
 
-        # Sample DoA data with full parameters
+        # Sample DoA data with full parameters - spectra (and confidence) from the DoA engine
         for i in range(5):
-            bearing = np.random.uniform(0, 360)
-            confidence = np.random.uniform(0.7, 15.0)  # Realistic confidence range
-            frequency = np.random.uniform(88e6, 108e6)  # FM band
             self.log_doa_data(
-                bearing=bearing,
-                confidence=confidence,
-                frequency=frequency,
+                bearing=np.random.uniform(0, 360),
+                frequency=np.random.uniform(88e6, 108e6),  # FM band
                 station_id=f"KrakenSDR-{i+1:03d}",
                 array_type=np.random.choice(["UCA", "ULA", "Custom"])
             )
 
-        # Sample spectrum data with VFO channels
-        # EDIT THESE VALUES TO CHANGE SCAN RANGE:
-        frequencies = np.linspace(88e6, 108e6, 1000)  # 88-108 MHz (FM band) - Change for different range
-        power_levels = -80 + 20 * np.random.random(1000)
-        self.log_spectrum_data(frequencies, power_levels)
+        # Sample spectrum data with VFO channels (fixed FM band; use --sweep for real wide-band scans)
+        self.log_sample_event("spectrum")
 
         # Sample passive radar data with illuminators
         for i in range(3):
-            target_range = np.random.uniform(1000, 50000)
-            target_bearing = np.random.uniform(0, 360)
-            target_velocity = np.random.uniform(-100, 100)
-            self.log_passive_radar(target_range, target_bearing, target_velocity)
+            self.log_sample_event("radar")
 
         # Sample beamforming data
         for i in range(2):
-            beam_direction = np.random.uniform(0, 360)
-            beam_gain = np.random.uniform(8, 15)  # dB gain
-            self.log_beamforming_data(beam_direction, beam_gain)
+            self.log_sample_event("beamforming")
 
         # Sample TDOA triangulation data
         for i in range(2):
-            source_lat = 40.7128 + np.random.uniform(-0.1, 0.1)  # Near NYC
-            source_lon = -74.0060 + np.random.uniform(-0.1, 0.1)
-            tdoa_measurements = [np.random.uniform(-1e-6, 1e-6) for _ in range(10)]  # 10 antenna pairs
-            self.log_tdoa_data([source_lat, source_lon], tdoa_measurements)
+            self.log_sample_event("tdoa")
 
         # System status
-        self.log_system_status()
+        self.log_sample_event("status")
+        self.flush()
 
-        print(f"Comprehensive sample data generated in {self.log_dir}")
-        print("Data includes: DoA, Spectrum, Passive Radar, Beamforming, TDOA, System Status")
+        self._say(f"Comprehensive sample data generated in {self.log_dir}")
+        self._say("Data includes: DoA, Spectrum, Passive Radar, Beamforming, TDOA, System Status")
 
 def main():
     """Main function for testing"""
     import argparse
 
+    if sys.argv[1:2] == ['bench']:
+        # kraken_data_logger.py bench [options] - see kraken_bench.py
+        from kraken_bench import main as bench_main
+        bench_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='KrakenSDR Data Logger')
     parser.add_argument('--generate-samples', action='store_true',
                        help='Generate sample data once')
@@ -478,12 +1397,132 @@ def main():
                        help='Generate sample data continuously (for background mode)')
     parser.add_argument('--interval', type=int, default=60,
                        help='Interval in seconds for continuous mode (default: 60)')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Run each event type on its own schedule with a control socket')
+    parser.add_argument('--rates', default='',
+                       help='Daemon rates in records/sec, e.g. doa=2,spectrum=0.5 (others keep defaults)')
+    parser.add_argument('--overrun', choices=OVERRUN_POLICIES, default='skip',
+                       help='Daemon behaviour when a tick overruns its period (default: skip)')
+    parser.add_argument('--control-socket', default=DEFAULT_SOCKET,
+                       help=f'Daemon control socket path (default: {DEFAULT_SOCKET})')
+    parser.add_argument('--stream', action='store_true',
+                       help='Keep one rtl_power session open per device instead of one per sample')
+    parser.add_argument('--array-encoding', default='json', choices=ENCODINGS,
+                       help='Encoding for spectrum arrays (default: json, as Filebeat expects)')
+    parser.add_argument('--pipeline', choices=POLICIES, default=None,
+                       help='Log through a background writer thread with this full-queue policy')
+    parser.add_argument('--queue-size', type=int, default=10000,
+                       help='Pipeline queue capacity in records (default: 10000)')
+    parser.add_argument('--es-url', default=None,
+                       help='Send records to this Elasticsearch _bulk endpoint instead of log files '
+                            '(files are only used to spill failed batches)')
+    parser.add_argument('--es-user', default=os.environ.get('KRAKEN_ES_USER'),
+                       help='Elasticsearch username (default: $KRAKEN_ES_USER)')
+    parser.add_argument('--es-password', default=os.environ.get('KRAKEN_ES_PASSWORD'),
+                       help='Elasticsearch password (default: $KRAKEN_ES_PASSWORD)')
+    parser.add_argument('--es-verify-ssl', action='store_true',
+                       help='Verify the Elasticsearch TLS certificate')
+    parser.add_argument('--rescan-hardware', action='store_true',
+                       help='Ignore the cached RTL-SDR device count and probe with rtl_test')
+    parser.add_argument('--rtl-power-cmd', default='rtl_power',
+                       help='rtl_power command used for capture (default: rtl_power)')
+    parser.add_argument('--sweep', default=None, metavar='START:STOP',
+                       help='Wide-band rtl_power scan, e.g. 24M:1.7G, logged as per-segment records')
+    parser.add_argument('--bin-size', default='10k',
+                       help='Sweep bin size (default: 10k)')
+    parser.add_argument('--segment-size', default='10M',
+                       help='Sweep record segment width (default: 10M)')
+    parser.add_argument('--sweeps', type=int, default=0,
+                       help='Stop after this many complete sweeps (default: 0 = run until stopped)')
+    parser.add_argument('--sweep-input', default=None, metavar='CSV',
+                       help='Aggregate an rtl_power CSV file (- for stdin) instead of running rtl_power')
+    parser.add_argument('--device', type=int, default=0,
+                       help='RTL-SDR device index for --sweep (default: 0)')
+    parser.add_argument('--radar', nargs=2, default=None, metavar=('REFERENCE', 'SURVEILLANCE'),
+                       help='Run passive radar processing on recorded reference/surveillance IQ files')
+    parser.add_argument('--iq-format', choices=IQ_FORMATS, default='cu8',
+                       help='Raw IQ sample format for --radar (default: cu8, as rtl_sdr writes)')
+    parser.add_argument('--sample-rate', type=float, default=2.4e6,
+                       help='IQ sample rate for --radar (default: 2.4e6)')
+    parser.add_argument('--illuminator-freq', type=float, default=98.5e6,
+                       help='Illuminator carrier frequency for --radar (default: 98.5e6)')
+    parser.add_argument('--replay', nargs='+', default=None, metavar='FILE',
+                       help='Replay a recorded rtl_power CSV (.csv; aggregated if --sweep is given), '
+                            '2 raw IQ files (radar) or 5 raw IQ files (DoA) through the logger')
+    parser.add_argument('--replay-speed', default='1x',
+                       help='Replay speed: 1x, 10x, ... or max (default: 1x)')
+    parser.add_argument('--replay-timestamps', choices=TIMESTAMP_MODES, default='wall',
+                       help='Record timestamps: replay time, shifted recorded spacing or original (default: wall)')
+    parser.add_argument('--replay-start', type=parse_start_time, default=None, metavar='TIME',
+                       help='Capture start of replayed raw IQ as epoch seconds or ISO 8601 local time '
+                            '(required for --replay-timestamps original)')
+    parser.add_argument('--frequency', type=float, default=146.52e6,
+                       help='Tuned frequency of replayed DoA IQ (default: 146.52e6)')
+    parser.add_argument('--array-type', choices=ARRAY_TYPES, default='UCA',
+                       help='Antenna array of replayed DoA IQ (default: UCA)')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Suppress per-record progress output')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus-style metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-interval', type=float, default=None,
+                       help='Log a kraken-metrics record every N seconds')
     args = parser.parse_args()
+    if (args.replay and not args.replay[0].endswith('.csv') and args.replay_timestamps == 'original'
+            and args.replay_start is None):
+        parser.error("raw IQ has no recorded time: --replay-timestamps original needs --replay-start")
 
     # Use unified data structure - let __init__ handle it
-    logger = KrakenDataLogger()
+    with KrakenDataLogger(streaming=args.stream, rtl_power_cmd=args.rtl_power_cmd,
+                          array_encoding=args.array_encoding, pipeline=args.pipeline,
+                          queue_size=args.queue_size, es_url=args.es_url, es_username=args.es_user,
+                          es_password=args.es_password, es_verify_ssl=args.es_verify_ssl, quiet=args.quiet,
+                          metrics_interval=args.metrics_interval, metrics_port=args.metrics_port) as logger:
+        if args.rescan_hardware and logger.check_rtl_sdr_hardware():
+            logger.discovery.store(logger.rtl_sdr_count)
+        run(logger, args)
 
-    if args.generate_samples:
+def run(logger, args):
+    """Dispatch the selected command-line mode"""
+    if args.daemon:
+        LoggerDaemon(logger, rates=parse_rates(args.rates), overrun=args.overrun,
+                     socket_path=args.control_socket).run()
+    elif args.replay:
+        speed = parse_speed(args.replay_speed)
+        print(f"🚀 Replaying {', '.join(args.replay)} at {args.replay_speed}")
+        try:
+            if args.replay[0].endswith('.csv'):
+                freq_range = None
+                if args.sweep:
+                    start, _, stop = args.sweep.partition(':')
+                    freq_range = (parse_frequency(start), parse_frequency(stop))
+                stats = logger.replay_rtl_power(args.replay[0], speed=speed, timestamps=args.replay_timestamps,
+                                                freq_range=freq_range,
+                                                segment_hz=parse_frequency(args.segment_size))
+            else:
+                stats = logger.replay_iq(args.replay, iq_format=args.iq_format, sample_rate=args.sample_rate,
+                                         speed=speed, timestamps=args.replay_timestamps,
+                                         frequency=args.frequency, array_type=args.array_type,
+                                         illuminator_freq=args.illuminator_freq, start_time=args.replay_start)
+        except KeyboardInterrupt:
+            print("\n🛑 Replay stopped")
+            return
+        print(f"✅ Replayed {stats['inputs']} input(s) -> {stats['records']} record(s) in {stats['elapsed_s']:.2f} s "
+              f"({stats['records'] / max(stats['elapsed_s'], 1e-9):.0f} rec/s, max lag {stats['max_lag_s']:.2f} s)")
+    elif args.radar:
+        blocks = logger.process_radar_files(*args.radar, iq_format=args.iq_format, sample_rate=args.sample_rate,
+                                            illuminator_freq=args.illuminator_freq)
+        print(f"✅ Processed {blocks} radar block(s)")
+    elif args.sweep:
+        start, _, stop = args.sweep.partition(':')
+        print(f"🚀 Sweeping {start}-{stop} in {args.segment_size} segments")
+        try:
+            logger.run_sweep(parse_frequency(start), parse_frequency(stop),
+                             bin_size=parse_frequency(args.bin_size),
+                             segment_hz=parse_frequency(args.segment_size),
+                             sweeps=args.sweeps or None, device_index=args.device, source=args.sweep_input)
+        except KeyboardInterrupt:
+            print("\n🛑 Sweep stopped")
+    elif args.generate_samples:
         logger.generate_sample_data()
     elif args.continuous:
         print(f"🚀 Starting continuous data generation (every {args.interval}s)")
@@ -491,7 +1530,10 @@ def main():
         try:
             while True:
                 logger.generate_sample_data()
+                logger.flush()
                 print(f"✅ Sample batch generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                if logger.pipeline is not None:
+                    print(f"📊 Pipeline: {logger.pipeline.stats()}")
                 time.sleep(args.interval)
         except KeyboardInterrupt:
             print("\n🛑 Continuous generation stopped")
@@ -500,6 +1542,10 @@ def main():
         print(f"Log directory: {logger.log_dir}")
         print("Use --generate-samples to create test data")
         print("Use --continuous for background data generation")
+        print("Use --daemon for per-event-type scheduling with a control socket")
+        print("Use --sweep START:STOP for wide-band rtl_power scans")
+        print("Use --replay FILE... to replay recorded rtl_power CSV or raw IQ captures")
+        print("Use 'bench' to benchmark the logging hot paths")
 
 if __name__ == "__main__":
     main()
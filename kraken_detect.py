@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Signal Detector
+Vectorized noise-floor estimation, CA-CFAR thresholding and peak grouping for VFO assignment
+"""
+
+import time
+
+import numpy as np
+
+
+def cfar_scale(train_cells, pfa):
+    """CA-CFAR threshold multiplier for train_cells reference cells and a false-alarm rate"""
+    return train_cells * (pfa ** (-1.0 / train_cells) - 1.0)
+
+
+class SignalDetector:
+    """Find carriers in power spectra (dB) and turn them into VFO channels
+
+    Each bin is compared against the mean linear power of its training
+    cells (train bins on each side, skipping guard bins), computed for the
+    whole spectrum at once from a cumulative sum. Detections must also
+    clear the row's noise floor (median power) by min_snr_db. Adjacent
+    detections closer than merge_bins are grouped into one signal whose
+    centre is the power-weighted centroid.
+
+    VFO squelch opens squelch_margin_db above the floor, never below the
+    detection level, so signal_detected separates carriers strong enough
+    to demodulate from marginal detections.
+    """
+
+    def __init__(self, guard=4, train=16, pfa=1e-3, min_snr_db=6.0, merge_bins=2,
+                 max_channels=16, squelch_margin_db=10.0, min_bandwidth_hz=None):
+        self.guard = guard
+        self.train = train
+        self.pfa = pfa
+        self.min_snr_db = min_snr_db
+        self.merge_bins = merge_bins
+        self.max_channels = max_channels
+        self.squelch_margin_db = squelch_margin_db
+        self.min_bandwidth_hz = min_bandwidth_hz
+        self.scale = cfar_scale(2 * train, pfa)
+        self._windows = {}
+
+    def _window(self, bins):
+        """Training-cell index bounds for a spectrum length (cached)"""
+        cached = self._windows.get(bins)
+        if cached is None:
+            i = np.arange(bins)
+            left_lo = np.clip(i - self.guard - self.train, 0, bins)
+            left_hi = np.clip(i - self.guard, 0, bins)
+            right_lo = np.clip(i + self.guard + 1, 0, bins)
+            right_hi = np.clip(i + self.guard + self.train + 1, 0, bins)
+            cells = (left_hi - left_lo) + (right_hi - right_lo)
+            cached = self._windows[bins] = (left_lo, left_hi, right_lo, right_hi, np.maximum(cells, 1))
+        return cached
+
+    def threshold(self, power_db):
+        """Per-bin detection mask and noise floor for (bins,) or (N, bins) spectra"""
+        power_db = np.asarray(power_db, dtype=float)
+        linear = np.power(10.0, power_db / 10.0)
+        left_lo, left_hi, right_lo, right_hi, cells = self._window(power_db.shape[-1])
+        csum = np.concatenate((np.zeros(power_db.shape[:-1] + (1,)), np.cumsum(linear, axis=-1)), axis=-1)
+        reference = (csum[..., left_hi] - csum[..., left_lo] + csum[..., right_hi] - csum[..., right_lo]) / cells
+        floor_db = np.median(power_db, axis=-1)
+        mask = (linear > self.scale * reference) & (power_db > floor_db[..., None] + self.min_snr_db)
+        return mask, floor_db
+
+    def _group(self, freqs, power_db, mask, floor_db):
+        """Group one row's detections into signal dicts"""
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return []
+        keep = np.concatenate(([True], starts[1:] - ends[:-1] > self.merge_bins))
+        starts, ends = starts[keep], np.concatenate((ends[:-1][keep[1:]], ends[-1:]))
+        step = float(freqs[1] - freqs[0]) if len(freqs) > 1 else 0.0
+        weights = np.where(mask, np.power(10.0, power_db / 10.0), 0.0)
+        totals = np.add.reduceat(weights, starts)
+        centroids = np.add.reduceat(weights * freqs, starts) / totals
+        peaks = np.maximum.reduceat(np.where(mask, power_db, -np.inf), starts)
+        signals = []
+        for start, end, centre, peak in zip(starts.tolist(), ends.tolist(), centroids.tolist(), peaks.tolist()):
+            signals.append({
+                "center_frequency_hz": centre,
+                "bandwidth_hz": (end - start) * step,
+                "peak_power_db": peak,
+                "snr_db": peak - float(floor_db),
+                "bins": end - start
+            })
+        return signals
+
+    def detect(self, freqs, power_db):
+        """Signals per spectrum: a list for (bins,) input, a list of lists for (N, bins)"""
+        power_db = np.asarray(power_db, dtype=float)
+        freqs = np.broadcast_to(np.asarray(freqs, dtype=float), power_db.shape)
+        mask, floor_db = self.threshold(power_db)
+        if power_db.ndim == 1:
+            return self._group(freqs, power_db, mask, floor_db), float(floor_db)
+        return ([self._group(f, p, m, fl) for f, p, m, fl in zip(freqs, power_db, mask, floor_db)],
+                floor_db.tolist())
+
+    def vfo_channels(self, signals, floor_db):
+        """VFO entries for the strongest signals with real centre, bandwidth and squelch"""
+        squelch = round(floor_db + max(self.squelch_margin_db, self.min_snr_db), 1)
+        strongest = sorted(signals, key=lambda s: s["snr_db"], reverse=True)[:self.max_channels]
+        channels = []
+        for vfo_id, signal in enumerate(sorted(strongest, key=lambda s: s["center_frequency_hz"])):
+            bandwidth = signal["bandwidth_hz"]
+            if self.min_bandwidth_hz:
+                bandwidth = max(bandwidth, self.min_bandwidth_hz)
+            channels.append({
+                "vfo_id": vfo_id,
+                "center_frequency_hz": signal["center_frequency_hz"],
+                "bandwidth_hz": bandwidth,
+                "squelch_db": squelch,
+                "active": True,
+                "signal_detected": signal["peak_power_db"] > squelch,
+                "peak_power_db": signal["peak_power_db"],
+                "snr_db": signal["snr_db"]
+            })
+        return channels
+
+
+def synthetic_spectrum(bins=16384, freq_start=88e6, freq_end=108e6, carriers=8, noise_db=-95.0,
+                       noise_std=2.0, rng=None):
+    """Noise-floor spectrum with carriers of known centre, width and SNR injected"""
+    rng = rng if rng is not None else np.random.default_rng()
+    freqs = np.linspace(freq_start, freq_end, bins)
+    power = noise_db + noise_std * rng.standard_normal(bins)
+    truth = []
+    for _ in range(carriers):
+        width = int(rng.integers(1, 12))
+        start = int(rng.integers(0, bins - width))
+        snr = float(rng.uniform(12, 35))
+        power[start:start + width] = np.maximum(power[start:start + width],
+                                                noise_db + snr + rng.standard_normal(width))
+        truth.append(float(freqs[start:start + width].mean()))
+    return freqs, power, sorted(truth)
+
+
+def benchmark(spectra=200, bins=16384, carriers=8, seed=0):
+    """Detection throughput and accuracy on synthetic spectra with injected carriers"""
+    rng = np.random.default_rng(seed)
+    cases = [synthetic_spectrum(bins, carriers=carriers, rng=rng) for _ in range(spectra)]
+    detector = SignalDetector()
+
+    start = time.perf_counter()
+    results = [detector.detect(freqs, power) for freqs, power, _ in cases]
+    single = time.perf_counter() - start
+
+    matrix = np.stack([power for _, power, _ in cases])
+    start = time.perf_counter()
+    detector.detect(cases[0][0], matrix)
+    batched = time.perf_counter() - start
+
+    tolerance = 3 * (cases[0][0][1] - cases[0][0][0])
+    found = false_alarms = 0
+    for (_, _, truth), (signals, _) in zip(cases, results):
+        centres = np.array([s["center_frequency_hz"] for s in signals])
+        hits = [np.any(np.abs(centres - t) <= tolerance) for t in truth] if len(centres) else [False] * len(truth)
+        found += sum(hits)
+        false_alarms += sum(1 for c in centres if np.min(np.abs(np.array(truth) - c)) > tolerance)
+    recall = found / (spectra * carriers)
+    print(f"{spectra} spectra x {bins} bins, {carriers} carriers each")
+    print(f"per spectrum: {spectra * bins / single / 1e6:8.2f} M bins/s ({spectra / single:8.1f} spectra/s)")
+    print(f"batched:      {spectra * bins / batched / 1e6:8.2f} M bins/s")
+    print(f"recall {recall:.3f}, false alarms {false_alarms / spectra:.2f} per spectrum")
+    return {"bins_per_sec": spectra * bins / single, "batched_bins_per_sec": spectra * bins / batched,
+            "recall": recall, "false_alarms_per_spectrum": false_alarms / spectra}
+
+
+def main():
+    """Run the detector benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR signal detector benchmark')
+    parser.add_argument('--spectra', type=int, default=200,
+                       help='Synthetic spectra to process (default: 200)')
+    parser.add_argument('--bins', type=int, default=16384,
+                       help='Bins per spectrum (default: 16384)')
+    parser.add_argument('--carriers', type=int, default=8,
+                       help='Injected carriers per spectrum (default: 8)')
+    args = parser.parse_args()
+    benchmark(args.spectra, args.bins, args.carriers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Hardware Discovery Cache
+Remembers the rtl_test device count, keyed on USB topology, so startup skips USB probing
+"""
+
+import json
+import os
+import tempfile
+import time
+
+SYSFS_USB = "/sys/bus/usb/devices"
+
+# Realtek RTL2832U/RTL2838 vendor:product pairs used by RTL-SDR tuners
+RTL_SDR_IDS = {("0bda", "2832"), ("0bda", "2838")}
+
+
+def default_cache_path():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "kraken-sdr", "hardware.json")
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def usb_topology_key(sysfs=SYSFS_USB):
+    """Describe the attached RTL-SDR dongles from sysfs (bus/port/devnum per device)
+
+    Returns None when sysfs is unavailable, in which case the cache is
+    trusted for its TTL only. Re-plugging a dongle changes its devnum and
+    therefore the key.
+    """
+    try:
+        entries = os.listdir(sysfs)
+    except OSError:
+        return None
+    devices = []
+    for name in entries:
+        base = os.path.join(sysfs, name)
+        vendor = _read(os.path.join(base, "idVendor"))
+        if vendor is None:
+            continue
+        if (vendor, _read(os.path.join(base, "idProduct"))) in RTL_SDR_IDS:
+            devices.append(f"{name}:{_read(os.path.join(base, 'devnum'))}")
+    return ",".join(sorted(devices))
+
+
+class HardwareDiscoveryCache:
+    """Persist the RTL-SDR device count between logger runs
+
+    An entry is valid while the USB topology key matches and it is younger
+    than ttl seconds (negative_ttl for a count of 0, so a dongle that was
+    still enumerating is picked up again soon).
+    """
+
+    def __init__(self, path=None, ttl=3600.0, sysfs=SYSFS_USB, negative_ttl=60.0):
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.sysfs = sysfs
+
+    def load(self):
+        """Return the cached device count, or None if missing, stale or the topology changed"""
+        try:
+            with open(self.path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        ttl = self.ttl if entry.get("rtl_sdr_count") else self.negative_ttl
+        if time.time() - entry.get("probed_at", 0) > ttl:
+            return None
+        if entry.get("usb_key") != usb_topology_key(self.sysfs):
+            return None
+        return entry.get("rtl_sdr_count")
+
+    def store(self, count):
+        """Record a fresh probe result"""
+        entry = {"rtl_sdr_count": count, "usb_key": usb_topology_key(self.sysfs), "probed_at": time.time()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not write hardware cache {self.path}: {e}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def benchmark(runs=5):
+    """Measure logger startup plus first device-count access, cold and warm"""
+    from kraken_data_logger import KrakenDataLogger
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HardwareDiscoveryCache(os.path.join(tmp, "hardware.json"))
+        timings = {"cold_ms": [], "warm_ms": []}
+        for label in ("cold_ms", "warm_ms"):
+            for _ in range(runs):
+                if label == "cold_ms":
+                    cache.clear()
+                start = time.perf_counter()
+                with KrakenDataLogger(os.path.join(tmp, "logs"), discovery_cache=cache) as logger:
+                    logger.rtl_sdr_count
+                timings[label].append((time.perf_counter() - start) * 1000.0)
+    for label, values in timings.items():
+        print(f"{label[:-3]:>5} startup: {min(values):8.2f} ms min {sum(values) / len(values):8.2f} ms mean")
+    return timings
+
+
+def main():
+    """Run the discovery cache benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR hardware discovery cache benchmark')
+    parser.add_argument('--runs', type=int, default=5,
+                       help='Startups to time per variant (default: 5)')
+    args = parser.parse_args()
+    benchmark(args.runs)
+
+
+if __name__ == "__main__":
+    main()
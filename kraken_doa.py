@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR DoA / Beamforming Engine
+Cached steering vectors and batched Bartlett, MVDR and MUSIC over 5-channel IQ snapshots
+"""
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+C = 299792458.0
+
+ARRAY_TYPES = ("UCA", "ULA")
+METHODS = ("Bartlett", "MVDR", "MUSIC")
+
+
+def element_positions(array_type, elements=5, radius_m=0.5, spacing_m=0.5):
+    """Element (x east, y north) positions in metres for a UCA or a ULA along the x axis"""
+    if array_type == "UCA":
+        angles = 2 * np.pi * np.arange(elements) / elements
+        return radius_m * np.column_stack((np.sin(angles), np.cos(angles)))
+    if array_type == "ULA":
+        x = spacing_m * (np.arange(elements) - (elements - 1) / 2.0)
+        return np.column_stack((x, np.zeros(elements)))
+    raise ValueError(f"Unsupported array type: {array_type} (expected one of {', '.join(ARRAY_TYPES)})")
+
+
+class SteeringCache:
+    """LRU cache of steering matrices keyed by (array type, quantised frequency)"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, build):
+        matrix = self._entries.get(key)
+        if matrix is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return matrix
+        self.misses += 1
+        matrix = self._entries[key] = build()
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return matrix
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DoaEstimator:
+    """Direction finding and beam patterns for the KrakenSDR's 5-element arrays
+
+    Snapshots are complex IQ shaped (channels, samples) or (N, channels,
+    samples). Each batch forms its sample covariance matrices in one
+    matmul, then scans a 360° grid of steering vectors:
+
+    - Bartlett: a^H R a
+    - MVDR:     1 / a^H R^-1 a (diagonally loaded inverse)
+    - MUSIC:    1 / |En^H a|^2 over the noise eigenvectors of R
+
+    The (elements, bins) steering matrix for an array type and frequency is
+    built once and kept in an LRU cache; frequencies are quantised to
+    frequency_step_hz so nearby VFO tunings share an entry. Bearings use the
+    compass convention (0° = north, 90° = east). A ULA lies along the
+    east-west axis and cannot tell front from back: its spectra are mirrored
+    about that axis and its bearings are reported in the northern half-plane.
+    """
+
+    def __init__(self, elements=5, radius_m=0.5, spacing_m=0.5, resolution_deg=1.0,
+                 cache_size=32, frequency_step_hz=1e3, diagonal_loading=1e-3, sources=1,
+                 null_depth_db=-15.0, max_nulls=4):
+        self.elements = elements
+        self.radius_m = radius_m
+        self.spacing_m = spacing_m
+        self.resolution_deg = resolution_deg
+        self.frequency_step_hz = frequency_step_hz
+        self.diagonal_loading = diagonal_loading
+        self.sources = sources
+        self.null_depth_db = null_depth_db
+        self.max_nulls = max_nulls
+        self.angles = np.arange(0.0, 360.0, resolution_deg)
+        self.positions = {t: element_positions(t, elements, radius_m, spacing_m) for t in ARRAY_TYPES}
+        self.cache = SteeringCache(cache_size)
+
+    def _positions(self, array_type):
+        positions = self.positions.get(array_type)
+        if positions is None:
+            raise ValueError(f"Unsupported array type: {array_type} (expected one of {', '.join(ARRAY_TYPES)})")
+        return positions
+
+    def vectors(self, array_type, frequency, bearings_deg):
+        """Steering vectors (elements, K) for arbitrary bearings (uncached)"""
+        theta = np.radians(np.asarray(bearings_deg, dtype=float))
+        direction = np.stack((np.sin(theta), np.cos(theta)))
+        return np.exp(2j * np.pi * frequency / C * (self._positions(array_type) @ direction))
+
+    def steering(self, array_type, frequency):
+        """Cached (elements, bins) steering matrix over the 360° grid"""
+        step = round(frequency / self.frequency_step_hz)
+        return self.cache.get((array_type, step), lambda: self.vectors(
+            array_type, step * self.frequency_step_hz, self.angles))
+
+    def array_config(self, array_type, frequency):
+        """array_config record block for the geometry at this frequency"""
+        positions = self._positions(array_type)
+        spacing = float(np.linalg.norm(positions[1] - positions[0]))
+        return {
+            "elements": self.elements,
+            "geometry": array_type,
+            "element_spacing_wavelengths": spacing * frequency / C,
+            "array_diameter_meters": float(np.ptp(positions[:, 0]) if array_type == "ULA" else 2 * self.radius_m)
+        }
+
+    @staticmethod
+    def covariance(snapshots):
+        """Sample covariance (N, M, M) from (N, M, samples) or (M, samples) IQ"""
+        x = np.asarray(snapshots)
+        if x.ndim == 2:
+            x = x[None]
+        return x @ np.conj(x.swapaxes(-1, -2)) / x.shape[-1]
+
+    def _loaded_inverse(self, cov):
+        power = np.trace(cov, axis1=-2, axis2=-1).real / cov.shape[-1]
+        eye = np.eye(cov.shape[-1])
+        return np.linalg.inv(cov + (self.diagonal_loading * power)[:, None, None] * eye)
+
+    def spectra(self, cov, frequency, array_type, method="MUSIC"):
+        """Pseudo-spectra (N, bins), each normalised to a peak of 1"""
+        a = self.steering(array_type, frequency)
+        if method == "Bartlett":
+            power = np.einsum("mb,nmb->nb", np.conj(a), cov @ a).real
+        elif method == "MVDR":
+            power = 1.0 / np.maximum(np.einsum("mb,nmb->nb", np.conj(a), self._loaded_inverse(cov) @ a).real, 1e-12)
+        elif method == "MUSIC":
+            _, vecs = np.linalg.eigh(cov)
+            noise = vecs[..., :cov.shape[-1] - self.sources]
+            projection = np.conj(noise.swapaxes(-1, -2)) @ a
+            power = 1.0 / np.maximum((np.abs(projection) ** 2).sum(axis=-2), 1e-12)
+        else:
+            raise ValueError(f"Unknown DoA method: {method} (expected one of {', '.join(METHODS)})")
+        return power / power.max(axis=1, keepdims=True)
+
+    def _peaks(self, spectra):
+        """Grid peak refined by a three-point parabola, in degrees"""
+        bins = spectra.shape[1]
+        peak = spectra.argmax(axis=1)
+        rows = np.arange(len(spectra))
+        left = spectra[rows, (peak - 1) % bins]
+        right = spectra[rows, (peak + 1) % bins]
+        centre = spectra[rows, peak]
+        denom = left - 2 * centre + right
+        offset = np.where(denom < 0, 0.5 * (left - right) / np.where(denom < 0, denom, 1.0), 0.0)
+        return ((peak + offset) * self.resolution_deg) % 360.0
+
+    def estimate(self, snapshots, frequency, array_type="UCA", method="MUSIC"):
+        """Bearings, confidence (peak-to-average dB) and spectra for a batch of snapshots"""
+        spectra = self.spectra(self.covariance(snapshots), frequency, array_type, method)
+        bearings = self._peaks(spectra)
+        if array_type == "ULA":
+            bearings = np.where((bearings > 90.0) & (bearings < 270.0), (180.0 - bearings) % 360.0, bearings)
+        return {
+            "bearings": bearings,
+            "confidence": 10 * np.log10(1.0 / spectra.mean(axis=1)),
+            "spectra": spectra
+        }
+
+    def weights(self, cov, frequency, array_type, directions, algorithm="MVDR"):
+        """Beamformer weights (N, M) steered at directions (N,); cov None means white noise"""
+        a = self.vectors(array_type, frequency, directions).T
+        if algorithm == "Bartlett" or cov is None:
+            return a / a.shape[1]
+        if algorithm != "MVDR":
+            raise ValueError(f"Unknown beamforming algorithm: {algorithm} (expected Bartlett or MVDR)")
+        steered = (self._loaded_inverse(cov) @ a[..., None])[..., 0]
+        return steered / np.einsum("nm,nm->n", np.conj(a), steered)[:, None]
+
+    def beam_patterns(self, weights, frequency, array_type, directions):
+        """Gain, 3 dB beamwidth, side-lobe level and nulls of (N, M) weight vectors
+
+        The pattern is measured relative to the response at the steered
+        direction; nulls are local minima deeper than null_depth_db, the
+        deepest max_nulls kept per beam.
+        """
+        a = self.steering(array_type, frequency)
+        bins = a.shape[1]
+        directions = np.asarray(directions, dtype=float)
+        response = np.abs(np.conj(weights) @ a) ** 2
+        steer_bin = np.rint(directions / self.resolution_deg).astype(int) % bins
+        rows = np.arange(len(weights))
+        pattern = 10 * np.log10(np.maximum(response, 1e-30) / response[rows, steer_bin][:, None])
+
+        # Rotate each row so the steered bin sits at index half
+        half = bins // 2
+        shifted = np.take_along_axis(pattern, (steer_bin[:, None] + np.arange(-half, bins - half)) % bins, axis=1)
+        right, left = shifted[:, half:], shifted[:, half::-1]
+
+        def first(mask):
+            return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+        beamwidth = np.minimum((first(right < -3.0) + first(left < -3.0)) * self.resolution_deg, 360.0)
+        # An adaptive beam's maximum is often a few bins off the steered direction, so each side
+        # first climbs to its nearest local maximum and then runs down to the first minimum
+        def lobe_edge(side):
+            rising = np.diff(side, axis=1) > 0
+            peak = first(~rising)
+            return first(rising & (np.arange(rising.shape[1]) >= peak[:, None]))
+
+        right_min, left_min = lobe_edge(right), lobe_edge(left)
+        offsets = np.arange(bins) - half
+        outside = (offsets > right_min[:, None]) | (offsets < -left_min[:, None])
+        side_lobe = np.where(outside, shifted, -np.inf).max(axis=1)
+
+        minima = ((pattern < np.roll(pattern, 1, axis=1)) & (pattern <= np.roll(pattern, -1, axis=1))
+                  & (pattern < self.null_depth_db))
+        nulls = []
+        for row, mask in zip(pattern, minima):
+            idx = np.flatnonzero(mask)
+            idx = np.sort(idx[np.argsort(row[idx])[:self.max_nulls]])
+            nulls.append((idx * self.resolution_deg).tolist())
+
+        a0 = self.vectors(array_type, frequency, directions).T
+        gain = 10 * np.log10(np.abs(np.einsum("nm,nm->n", np.conj(weights), a0)) ** 2
+                             / (np.abs(weights) ** 2).sum(axis=1))
+        return {
+            "gain_db": gain,
+            "beamwidth_3db": beamwidth,
+            "side_lobe_level_db": np.where(np.isfinite(side_lobe), side_lobe, np.nan),
+            "null_directions": nulls,
+            "pattern_db": pattern
+        }
+
+    def synthetic_snapshots(self, bearings, frequency, array_type="UCA", snr_db=10.0, samples=256, rng=None):
+        """IQ snapshots (N, M, samples) of emitters at bearings (N,) or (N, K) in white noise"""
+        rng = rng if rng is not None else np.random.default_rng()
+        bearings = np.asarray(bearings, dtype=float)
+        bearings = bearings.reshape(-1, 1) if bearings.ndim < 2 else bearings
+        n, emitters = bearings.shape
+        amplitude = np.broadcast_to(10 ** (np.asarray(snr_db, dtype=float) / 20.0), (emitters,))
+        a = self.vectors(array_type, frequency, bearings.reshape(-1)).T.reshape(n, emitters, self.elements)
+        signal = (rng.standard_normal((n, emitters, samples)) + 1j * rng.standard_normal((n, emitters, samples)))
+        signal *= amplitude[None, :, None] / np.sqrt(2)
+        noise = rng.standard_normal((n, self.elements, samples)) + 1j * rng.standard_normal((n, self.elements, samples))
+        return np.einsum("nkm,nks->nms", a, signal) + noise / np.sqrt(2)
+
+
+def benchmark(estimates=2000, samples=1024, frequency=146.52e6, snr_db=10.0, seed=0):
+    """Estimates/sec per method and array type, with bearing error on synthetic emitters"""
+    rng = np.random.default_rng(seed)
+    estimator = DoaEstimator()
+    results = {}
+    for array_type in ARRAY_TYPES:
+        # The ULA only sees one half-plane, so keep its emitters in front of it
+        truth = rng.uniform(0, 360, estimates) if array_type == "UCA" else rng.uniform(-80, 80, estimates) % 360
+        snapshots = estimator.synthetic_snapshots(truth, frequency, array_type, snr_db, samples, rng)
+        for method in METHODS:
+            estimator.estimate(snapshots[:2], frequency, array_type, method)
+            start = time.perf_counter()
+            result = estimator.estimate(snapshots, frequency, array_type, method)
+            elapsed = time.perf_counter() - start
+            error = np.abs((result["bearings"] - truth + 180.0) % 360.0 - 180.0)
+            results[f"{array_type}_{method}"] = {"estimates_per_sec": estimates / elapsed,
+                                                 "median_error_deg": float(np.median(error))}
+            print(f"{array_type} {method:>8}: {estimates / elapsed:10,.0f} estimates/s  "
+                  f"median error {np.median(error):5.2f}°  p95 {np.percentile(error, 95):6.2f}°")
+
+    # Per-call cost of building the steering matrix versus taking it from the cache
+    start = time.perf_counter()
+    for f in frequency + 1e4 * np.arange(200):
+        estimator.vectors("UCA", f, estimator.angles)
+    uncached = (time.perf_counter() - start) / 200
+    start = time.perf_counter()
+    for _ in range(200):
+        estimator.steering("UCA", frequency)
+    cached = (time.perf_counter() - start) / 200
+    print(f"steering matrix: build {uncached * 1e6:7.1f} µs, cached {cached * 1e6:5.2f} µs "
+          f"(hits {estimator.cache.hits}, misses {estimator.cache.misses})")
+    results["steering_build_us"] = uncached * 1e6
+    results["steering_cached_us"] = cached * 1e6
+    return results
+
+
+def main():
+    """Run the DoA engine benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR DoA / beamforming engine benchmark')
+    parser.add_argument('--estimates', type=int, default=2000,
+                       help='Snapshot sets per batch (default: 2000)')
+    parser.add_argument('--samples', type=int, default=1024,
+                       help='IQ samples per channel in each snapshot (default: 1024)')
+    parser.add_argument('--snr-db', type=float, default=10.0,
+                       help='Per-element SNR of the synthetic emitter (default: 10)')
+    args = parser.parse_args()
+    benchmark(args.estimates, args.samples, snr_db=args.snr_db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR DoA Spectrum Generator
+Vectorized synthesis of simulated 360° DoA spectra in batches
+"""
+
+import time
+
+import numpy as np
+
+
+def circular_distance(angles, bearings):
+    """Absolute angular distance in degrees, wrapping at 0/360°
+
+    Broadcasts: angles (..., bins) against bearings (..., 1).
+    """
+    return np.abs((angles - bearings + 180.0) % 360.0 - 180.0)
+
+
+class DoaSpectrumGenerator:
+    """Builds batches of simulated DoA spectra in single NumPy passes
+
+    Every spectrum is a unit spike at each emitter bearing, a Gaussian main
+    lobe around it (measured by circular distance) and white noise. Bearings
+    may be shaped (N,) for one emitter per spectrum or (N, K) for K emitters.
+    """
+
+    def __init__(self, resolution_deg=1.0, noise_std=0.1, lobe_gain=0.3,
+                 lobe_variance=20.0, lobe_width_deg=10.0, rng=None, seed=None):
+        self.resolution_deg = resolution_deg
+        self.noise_std = noise_std
+        self.lobe_gain = lobe_gain
+        self.lobe_variance = lobe_variance
+        self.lobe_width_deg = lobe_width_deg
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.angles = np.arange(0.0, 360.0, resolution_deg)
+
+    @property
+    def bins(self):
+        return len(self.angles)
+
+    def generate(self, bearings, amplitudes=None):
+        """Return an (N, bins) array of spectra for the given bearings"""
+        bearings = np.asarray(bearings, dtype=float)
+        if bearings.ndim == 1:
+            bearings = bearings[:, None]
+        n, emitters = bearings.shape
+        if amplitudes is None:
+            amplitudes = np.ones_like(bearings)
+        else:
+            amplitudes = np.asarray(amplitudes, dtype=float).reshape(n, emitters)
+
+        spectra = self.rng.normal(0.0, self.noise_std, size=(n, self.bins))
+
+        # Main lobes: (N, K, bins) distances reduced over emitters
+        dist = circular_distance(self.angles, bearings[:, :, None])
+        lobes = np.exp(-dist ** 2 / self.lobe_variance)
+        lobes[dist >= self.lobe_width_deg] = 0.0
+        spectra += self.lobe_gain * np.einsum('nk,nkb->nb', amplitudes, lobes)
+
+        # Peak spike at the bin containing each bearing
+        peak_idx = (np.floor(bearings % 360.0 / self.resolution_deg).astype(int)) % self.bins
+        rows = np.arange(n)
+        for k in range(emitters):
+            spectra[rows, peak_idx[:, k]] += amplitudes[:, k]
+        return spectra
+
+    def generate_one(self, bearing, amplitude=1.0):
+        """Single spectrum convenience wrapper"""
+        return self.generate([bearing], [amplitude])[0]
+
+    def random_batch(self, n, emitters=1):
+        """Generate n spectra at uniformly random bearings; returns (bearings, spectra)"""
+        bearings = self.rng.uniform(0, 360, size=(n, emitters))
+        return bearings, self.generate(bearings)
+
+
+def _legacy_spectrum(bearing):
+    """Per-bin loop formerly used in log_doa_data (kept for benchmarking)"""
+    doa_spectrum = np.zeros(360)
+    main_idx = int(bearing) % 360
+    doa_spectrum[main_idx] = 1.0
+    for i in range(360):
+        doa_spectrum[i] += np.random.normal(0, 0.1)
+        if abs(i - main_idx) < 10:
+            doa_spectrum[i] += 0.3 * np.exp(-((i - main_idx)**2) / 20)
+    return doa_spectrum
+
+
+def benchmark(spectra=5000, batch=1000):
+    """Compare spectra/sec of the per-bin loop against batched generation"""
+    bearings = np.random.uniform(0, 360, spectra)
+
+    loop_count = min(spectra, 500)
+    start = time.perf_counter()
+    for b in bearings[:loop_count]:
+        _legacy_spectrum(b)
+    legacy = loop_count / (time.perf_counter() - start)
+
+    generator = DoaSpectrumGenerator(seed=0)
+    start = time.perf_counter()
+    for i in range(0, spectra, batch):
+        generator.generate(bearings[i:i + batch])
+    batched = spectra / (time.perf_counter() - start)
+
+    print(f"per-bin Python loop: {legacy:12,.0f} spectra/sec")
+    print(f"batched generator:   {batched:12,.0f} spectra/sec ({batched / legacy:.0f}x)")
+    return {"legacy_spectra_per_sec": legacy, "batched_spectra_per_sec": batched}
+
+
+def main():
+    """Run the DoA spectrum benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR DoA spectrum generator benchmark')
+    parser.add_argument('--spectra', type=int, default=5000,
+                       help='Number of spectra to generate (default: 5000)')
+    parser.add_argument('--batch', type=int, default=1000,
+                       help='Spectra per generate() call (default: 1000)')
+    args = parser.parse_args()
+    benchmark(args.spectra, args.batch)
+
+
+if __name__ == "__main__":
+    main()
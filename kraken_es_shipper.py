@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Elasticsearch Shipper
+Batched _bulk output over pooled keep-alive connections, as an alternative to Filebeat tailing
+"""
+
+import atexit
+import base64
+import http.client
+import json
+import queue
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class ElasticsearchShipper:
+    """Send NDJSON records straight to the Elasticsearch _bulk endpoint
+
+    Drop-in for KrakenLogWriter (write/write_many/flush/close). Records are
+    routed per event type to the kraken-sdr-<event>-default data streams
+    that filebeat_kraken_simple.yml feeds, with the same data_stream fields
+    Filebeat adds. Failed batches and retryable item errors (429/5xx) are
+    retried with exponential backoff; whatever still fails is spilled to the
+    fallback writer (normally the regular log files, which Filebeat ingests).
+
+    write()/write_many()/flush() only buffer or wake a background thread
+    that ships every flush_interval or full batch, so logging never waits
+    on the network; drain() and close() ship synchronously.
+    The buffer is bounded by max_buffer (overflow is spilled at once). When
+    a batch exhausts its retries the circuit opens for cooldown seconds and
+    batches are spilled without contacting Elasticsearch; afterwards one
+    attempt without retries decides whether it closes again.
+    """
+
+    RETRYABLE = (429, 500, 502, 503, 504)
+
+    def __init__(self, url, username=None, password=None, verify_ssl=False, fallback=None,
+                 index_template="kraken-sdr-{event}-default", namespace="default",
+                 batch_size=500, flush_interval=1.0, max_retries=3, backoff=0.5,
+                 pool_size=2, timeout=10, max_buffer=20000, cooldown=30.0):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == "https" else 9200)
+        self.bulk_path = (parts.path.rstrip('/') or '') + "/_bulk"
+        self.headers = {"Content-Type": "application/x-ndjson", "Connection": "keep-alive"}
+        if username is not None:
+            token = base64.b64encode(f"{username}:{password or ''}".encode()).decode()
+            self.headers["Authorization"] = f"Basic {token}"
+        self.ssl_context = None
+        if self.scheme == "https":
+            self.ssl_context = ssl.create_default_context()
+            if not verify_ssl:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.fallback = fallback
+        self.index_template = index_template
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_buffer = max(max_buffer, batch_size)
+        self.cooldown = cooldown
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._buffer = []          # (event_type, line)
+        self._lock = threading.Lock()          # guards _buffer
+        self._ship_lock = threading.Lock()     # one shipper at a time (thread or explicit drain)
+        self._actions = {}         # event_type -> (action line, data_stream suffix)
+        self._open_until = None    # monotonic end of the circuit-breaker cooldown
+        self.sent = 0
+        self.retried = 0
+        self.spilled = 0
+        self.bulk_requests = 0
+        self.circuit_trips = 0
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kraken-es-shipper", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _action(self, event_type):
+        cached = self._actions.get(event_type)
+        if cached is None:
+            index = self.index_template.format(event=event_type)
+            action = json.dumps({"create": {"_index": index}})
+            data_stream = json.dumps({"type": "logs", "dataset": f"kraken-sdr-{event_type}",
+                                      "namespace": self.namespace})
+            cached = self._actions[event_type] = (action, ',"data_stream":' + data_stream + '}')
+        return cached
+
+    def write(self, event_type, line):
+        """Queue one serialized record (without trailing newline)"""
+        self.write_many(event_type, (line,))
+
+    def write_many(self, event_type, lines):
+        """Queue several serialized records for one event type"""
+        with self._lock:
+            self._buffer.extend((event_type, line) for line in lines)
+            overflow = len(self._buffer) - self.max_buffer
+            if overflow > 0:
+                spill, self._buffer = self._buffer[:overflow], self._buffer[overflow:]
+            full = len(self._buffer) >= self.batch_size
+        if overflow > 0:
+            self._spill(spill)
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Ask the shipper thread to ship buffered records now, without waiting for it"""
+        self._wake.set()
+
+    def drain(self):
+        """Ship every buffered record on this thread (spilling them while the circuit is open)"""
+        with self._ship_lock:
+            while True:
+                with self._lock:
+                    batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+                if not batch:
+                    return
+                if self._circuit_open():
+                    self._spill(batch)
+                else:
+                    self._ship(batch)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                print(f"⚠️  Elasticsearch shipper error: {e}")
+
+    def _circuit_open(self):
+        return self._open_until is not None and time.monotonic() < self._open_until
+
+    def _body(self, batch):
+        out = []
+        for event_type, line in batch:
+            action, data_stream = self._action(event_type)
+            out.append(action)
+            out.append(line[:-1] + data_stream if line.endswith('}') else line)
+        return ('\n'.join(out) + '\n').encode()
+
+    def _ship(self, batch):
+        # Half-open after a cooldown: a single attempt decides whether ES is back
+        max_retries = 0 if self._open_until is not None else self.max_retries
+        attempt = 0
+        while batch:
+            try:
+                status, payload = self._post(self._body(batch))
+            except (OSError, http.client.HTTPException) as e:
+                status, payload = None, str(e)
+            if status == 200:
+                try:
+                    batch = self._failed_items(batch, payload)
+                except ValueError:
+                    print("⚠️  Elasticsearch _bulk returned an unreadable response")
+                else:
+                    if not batch:
+                        self._open_until = None
+                        return
+            elif status is not None and status not in self.RETRYABLE:
+                print(f"⚠️  Elasticsearch _bulk rejected batch (HTTP {status})")
+                break
+            attempt += 1
+            if attempt > max_retries:
+                if self._open_until is None:
+                    self.circuit_trips += 1
+                    print(f"⚠️  Elasticsearch unavailable - spilling to log files for {self.cooldown:g}s")
+                self._open_until = time.monotonic() + self.cooldown
+                break
+            self.retried += len(batch)
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+        self._spill(batch)
+
+    def _failed_items(self, batch, payload):
+        """Count accepted items and return the ones worth retrying (ValueError if unreadable)"""
+        result = json.loads(payload)
+        if not isinstance(result, dict):
+            raise ValueError("bulk response is not an object")
+        if not result.get("errors"):
+            self.sent += len(batch)
+            return []
+        retry = []
+        rejected = []
+        for item, record in zip(result.get("items", []), batch):
+            status = next(iter(item.values())).get("status", 500)
+            if status < 300:
+                self.sent += 1
+            elif status in self.RETRYABLE:
+                retry.append(record)
+            else:
+                rejected.append(record)
+        if rejected:
+            print(f"⚠️  Elasticsearch rejected {len(rejected)} record(s)")
+            self._spill(rejected)
+        return retry
+
+    def _spill(self, batch):
+        if not batch:
+            return
+        self.spilled += len(batch)
+        if self.fallback is None:
+            print(f"⚠️  Dropped {len(batch)} record(s) - Elasticsearch unavailable and no spill writer")
+            return
+        by_event = {}
+        for event_type, line in batch:
+            by_event.setdefault(event_type, []).append(line)
+        for event_type, lines in by_event.items():
+            self.fallback.write_many(event_type, lines)
+        self.fallback.flush()
+
+    def _connect(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                               context=self.ssl_context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, body):
+        """POST one bulk body on a pooled keep-alive connection"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            conn.request("POST", self.bulk_path, body=body, headers=self.headers)
+            response = conn.getresponse()
+            payload = response.read()
+        except Exception:
+            conn.close()
+            raise
+        self.bulk_requests += 1
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return response.status, payload
+
+    def stats(self):
+        return {"sent": self.sent, "retried": self.retried, "spilled": self.spilled,
+                "bulk_requests": self.bulk_requests, "buffered": len(self._buffer),
+                "circuit_open": self._circuit_open(), "circuit_trips": self.circuit_trips}
+
+    def close(self):
+        """Stop the shipper thread, ship buffered records, close connections and the spill writer"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.drain()
+        atexit.unregister(self.close)
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.fallback is not None:
+            self.fallback.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
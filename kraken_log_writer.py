@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Log Writer
+Persistent buffered NDJSON writers - one open handle per event type and day
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def day_stamp():
+    """Return today's YYYYMMDD stamp and the epoch time of the next local midnight"""
+    now = datetime.now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return now.strftime('%Y%m%d'), midnight.timestamp()
+
+
+class KrakenLogWriter:
+    """Pool of append handles for kraken-<event>-YYYYMMDD.json files
+
+    Records are buffered in memory and written with a single write() per
+    flush. A flush happens when the buffered size reaches flush_bytes or
+    when flush_interval seconds have passed since the last flush - checked
+    on every write and by a background timer, so records never wait longer
+    than about flush_interval once writes stop. Handles roll over to a new
+    file at local midnight.
+    """
+
+    def __init__(self, log_dir, prefix="kraken", flush_bytes=64 * 1024, flush_interval=1.0):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._handles = {}        # event_type -> open file object
+        self._buffers = {}        # event_type -> list of pending lines
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._closed = False
+        self.flush_errors = 0
+        self._set_day()
+        self._stop = threading.Event()
+        self._timer = None
+        if flush_interval and flush_interval > 0:
+            self._timer = threading.Thread(target=self._flush_loop, name="kraken-log-flush", daemon=True)
+            self._timer.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        """Timer thread: flush buffered records once they are flush_interval old"""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush_if_due()
+            except OSError:
+                # Disk full etc. - the records stay buffered and the next write reports the error
+                self.flush_errors += 1
+
+    def _set_day(self):
+        """Cache today's date stamp and the time of the next rollover"""
+        self._day, self._rollover_at = day_stamp()
+
+    def path_for(self, event_type, day=None):
+        """Return the log file path for an event type (today by default)"""
+        return os.path.join(self.log_dir, f"{self.prefix}-{event_type}-{day or self._day}.json")
+
+    def write(self, event_type, line):
+        """Queue one serialized record (without trailing newline)"""
+        self.write_many(event_type, (line,))
+
+    def write_many(self, event_type, lines):
+        """Queue several serialized records for one event type"""
+        with self._lock:
+            if self._closed:
+                raise ValueError("write to closed KrakenLogWriter")
+            if time.time() >= self._rollover_at:
+                self._rollover()
+            buf = self._buffers.setdefault(event_type, [])
+            for line in lines:
+                buf.append(line)
+                buf.append('\n')
+                self._buffered_bytes += len(line) + 1
+            if (self._buffered_bytes >= self.flush_bytes or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _handle(self, event_type):
+        f = self._handles.get(event_type)
+        if f is None:
+            f = open(self.path_for(event_type), 'a', encoding='utf-8')
+            self._handles[event_type] = f
+        return f
+
+    def _flush_locked(self):
+        for event_type, buf in self._buffers.items():
+            if buf:
+                f = self._handle(event_type)
+                f.write(''.join(buf))
+                f.flush()
+                buf.clear()
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+
+    def _rollover(self):
+        """Flush pending records into yesterday's files and start new ones"""
+        self._flush_locked()
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+        self._set_day()
+
+    def flush_if_due(self):
+        """Flush if records are buffered and flush_interval has passed since the last flush"""
+        with self._lock:
+            if (not self._closed and self._buffered_bytes and
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        """Write all buffered records to disk"""
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self):
+        """Flush and close every open handle"""
+        self._stop.set()
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            for f in self._handles.values():
+                f.close()
+            self._handles.clear()
+            self._closed = True
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def benchmark(records=20000, log_dir=None):
+    """Compare records/sec of open/append/close per record against the writer pool"""
+    line = '{"event_type": "direction_finding", "bearing_degrees": 123.4, "confidence": 77.1}'
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = log_dir or tmp
+
+        start = time.perf_counter()
+        for _ in range(records):
+            log_file = os.path.join(log_dir, f"legacy-doa-{datetime.now().strftime('%Y%m%d')}.json")
+            with open(log_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        legacy = records / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with KrakenLogWriter(log_dir, prefix="pooled") as writer:
+            for _ in range(records):
+                writer.write("doa", line)
+        pooled = records / (time.perf_counter() - start)
+
+    print(f"open/append/close per record: {legacy:12,.0f} records/sec")
+    print(f"persistent writer pool:       {pooled:12,.0f} records/sec ({pooled / legacy:.1f}x)")
+    return {"legacy_records_per_sec": legacy, "pooled_records_per_sec": pooled}
+
+
+def main():
+    """Run the writer benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR Log Writer benchmark')
+    parser.add_argument('--records', type=int, default=20000,
+                       help='Number of records to write per variant (default: 20000)')
+    parser.add_argument('--log-dir', default=None,
+                       help='Directory to benchmark in (default: temporary directory)')
+    args = parser.parse_args()
+    benchmark(args.records, args.log_dir)
+
+
+if __name__ == "__main__":
+    main()
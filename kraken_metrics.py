@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Logger Metrics
+Per-stage timing histograms and record counters with a Prometheus-style text endpoint
+"""
+
+import bisect
+import http.server
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds (1 µs .. 10 s)
+DEFAULT_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+STAGES = ("capture", "synthesis", "detection", "radar", "tdoa", "doa", "serialization", "write", "flush")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Approximate quantile as the upper bound of the bucket holding it"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99)
+        }
+
+
+class LoggerMetrics:
+    """Counters and stage histograms for KrakenDataLogger's hot paths"""
+
+    def __init__(self):
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.records = {}
+        self.bytes = {}
+        self.capture_failures = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+
+    def count_records(self, event_type, records, nbytes):
+        with self._lock:
+            self.records[event_type] = self.records.get(event_type, 0) + records
+            self.bytes[event_type] = self.bytes.get(event_type, 0) + nbytes
+
+    def count_capture_failure(self, device_index, reason="no data"):
+        key = (str(device_index), reason)
+        with self._lock:
+            self.capture_failures[key] = self.capture_failures.get(key, 0) + 1
+
+    def snapshot(self):
+        """Plain-dict view, used for kraken-metrics-*.json records"""
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "records_total": dict(self.records),
+            "bytes_total": dict(self.bytes),
+            "capture_failures_total": sum(self.capture_failures.values()),
+            "capture_failures": [{"device_index": d, "reason": r, "count": n}
+                                 for (d, r), n in self.capture_failures.items()],
+            "stages": {stage: hist.as_dict() for stage, hist in self.stages.items()}
+        }
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        out = [
+            "# HELP kraken_logger_uptime_seconds Seconds since the logger started",
+            "# TYPE kraken_logger_uptime_seconds gauge",
+            f"kraken_logger_uptime_seconds {time.time() - self.started:.3f}",
+            "# HELP kraken_logger_records_total Records written per event type",
+            "# TYPE kraken_logger_records_total counter"
+        ]
+        out += [f'kraken_logger_records_total{{event_type="{e}"}} {n}' for e, n in sorted(self.records.items())]
+        out += ["# HELP kraken_logger_bytes_total Serialized bytes written per event type",
+                "# TYPE kraken_logger_bytes_total counter"]
+        out += [f'kraken_logger_bytes_total{{event_type="{e}"}} {n}' for e, n in sorted(self.bytes.items())]
+        out += ["# HELP kraken_logger_capture_failures_total Failed hardware captures",
+                "# TYPE kraken_logger_capture_failures_total counter"]
+        out += [f'kraken_logger_capture_failures_total{{device_index="{d}",reason="{r}"}} {n}'
+                for (d, r), n in sorted(self.capture_failures.items())]
+        out += ["# HELP kraken_logger_stage_seconds Time spent per hot-path stage",
+                "# TYPE kraken_logger_stage_seconds histogram"]
+        for stage, hist in self.stages.items():
+            running = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                running += n
+                out.append(f'kraken_logger_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {running}')
+            out.append(f'kraken_logger_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+            out.append(f'kraken_logger_stage_seconds_sum{{stage="{stage}"}} {hist.sum:.9f}')
+            out.append(f'kraken_logger_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+        return "\n".join(out) + "\n"
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetricsServer:
+    """Serve /metrics from a daemon thread"""
+
+    def __init__(self, metrics, port=9108, host="127.0.0.1"):
+        self.httpd = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.metrics = metrics
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="kraken-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Logging Pipeline
+Bounded producer/consumer queue moving log_* work onto a background writer thread
+"""
+
+import collections
+import inspect
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+POLICIES = ("block", "drop", "sample")
+
+_STOP = object()
+
+
+class LoggingPipeline:
+    """Run logging calls on a background thread fed by a bounded queue
+
+    Producers only timestamp and enqueue the call; the worker performs
+    capture, synthesis, serialization and the write, then flushes the sink
+    once per drained batch. When the queue is full the policy decides:
+
+    block  - the producer waits for room
+    drop   - the new record is discarded and counted
+    sample - above the high-water mark only sample_rate of records are kept,
+             and records are dropped outright when the queue is full
+    """
+
+    def __init__(self, flush, maxsize=10000, policy="block", sample_rate=0.1,
+                 high_water=0.5, batch_size=256, idle_flush=0.5):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown pipeline policy: {policy}")
+        self.flush_sink = flush
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.high_water = int(maxsize * high_water)
+        self.batch_size = batch_size
+        self.idle_flush = idle_flush
+        self.queue = queue.Queue(maxsize)
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.errors = 0
+        self.flush_errors = 0
+        self.max_depth = 0
+        self.latencies_ms = collections.deque(maxlen=4096)
+        self._thread = threading.Thread(target=self._worker, name="kraken-pipeline", daemon=True)
+        self._thread.start()
+
+    def wrap(self, method):
+        """Return a drop-in replacement for a log_* method that enqueues the call"""
+        params = list(inspect.signature(method).parameters)
+        # Single-record methods take an ISO 'timestamp', batch methods epoch 'timestamps'
+        ts_name = 'timestamp' if 'timestamp' in params else 'timestamps' if 'timestamps' in params else None
+        ts_index = params.index(ts_name) if ts_name else None
+
+        def enqueue(*args, **kwargs):
+            # Pin the record time to the call, not to when the worker gets to it
+            if ts_index is not None and len(args) <= ts_index and kwargs.get(ts_name) is None:
+                if ts_name == 'timestamp':
+                    kwargs[ts_name] = datetime.now(timezone.utc).isoformat()
+                else:
+                    kwargs[ts_name] = time.time()
+            return self.submit(method, args, kwargs)
+
+        enqueue.__name__ = method.__name__
+        enqueue.__doc__ = method.__doc__
+        return enqueue
+
+    def submit(self, fn, args=(), kwargs=None):
+        """Enqueue one call according to the policy; returns False if it was discarded"""
+        item = (time.monotonic(), fn, args, kwargs or {})
+        self.submitted += 1
+        if self.policy == "block":
+            self.queue.put(item)
+        else:
+            if (self.policy == "sample" and self.queue.qsize() >= self.high_water
+                    and random.random() >= self.sample_rate):
+                self.sampled_out += 1
+                return False
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _worker(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.idle_flush)]
+            except queue.Empty:
+                self._flush()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            done = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                enqueued, fn, args, kwargs = item
+                try:
+                    fn(*args, **kwargs)
+                    done.append(enqueued)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"⚠️  Pipeline record failed in {getattr(fn, '__name__', fn)}: {e}")
+            self._flush()
+            now = time.monotonic()
+            self.latencies_ms.extend((now - t) * 1000.0 for t in done)
+            self.written += len(done)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _flush(self):
+        # A failing sink must not kill the worker, or drain/close and blocked producers hang
+        try:
+            self.flush_sink()
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"⚠️  Pipeline flush failed: {e}")
+
+    def drain(self):
+        """Block until every queued record has been written"""
+        self.queue.join()
+
+    def close(self):
+        """Drain the queue and stop the worker thread"""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+
+    def stats(self):
+        """Counters for queue depth, drops and end-to-end latency"""
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else None
+        return {
+            "policy": self.policy,
+            "queue_depth": self.queue.qsize(),
+            "queue_max_depth": self.max_depth,
+            "queue_capacity": self.queue.maxsize,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "errors": self.errors,
+            "flush_errors": self.flush_errors,
+            "latency_ms_p50": float(np.percentile(latencies, 50)) if latencies is not None else None,
+            "latency_ms_p99": float(np.percentile(latencies, 99)) if latencies is not None else None,
+            "latency_ms_max": float(latencies.max()) if latencies is not None else None
+        }
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Capture Replay
+Memory-mapped replay of recorded rtl_power CSV and raw IQ files at adjustable speed
+"""
+
+import mmap
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from kraken_radar import iq_blocks
+from kraken_sweep import rtl_power_rows
+
+TIMESTAMP_MODES = ("wall", "shifted", "original")
+
+# rtl_power stamps are per second and shared by every row of a sweep
+_STAMP_CACHE = {}
+
+
+def parse_speed(text):
+    """Parse '1x', '10', '0.5x' or 'max' into a speed factor (0 = as fast as possible)"""
+    text = str(text).strip().lower()
+    if text in ("max", "0", "0x"):
+        return 0.0
+    speed = float(text[:-1] if text.endswith("x") else text)
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive or 'max': {text}")
+    return speed
+
+
+def parse_start_time(text):
+    """Parse epoch seconds or an ISO 8601 time (local time unless it carries an offset)"""
+    text = str(text).strip()
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+class ReplayClock:
+    """Pace recorded time against the wall clock and rewrite record timestamps
+
+    The first pace() call anchors recorded time to now; each later call
+    sleeps until recorded offset / speed has elapsed (speed 0 never sleeps).
+    Timestamps are rewritten per mode:
+
+    - wall:     the moment the record is replayed
+    - shifted:  replay start plus the recorded offset (original spacing)
+    - original: the recorded time itself
+    """
+
+    def __init__(self, speed=1.0, timestamps="wall"):
+        if timestamps not in TIMESTAMP_MODES:
+            raise ValueError(f"Unknown timestamp mode: {timestamps} (expected one of {', '.join(TIMESTAMP_MODES)})")
+        self.speed = speed
+        self.timestamps = timestamps
+        self.max_lag_s = 0.0
+        self._recorded0 = None
+
+    def pace(self, recorded):
+        """Wait for the recorded instant (seconds) and return its rewritten epoch time"""
+        if self._recorded0 is None:
+            self._recorded0, self._wall0, self._mono0 = recorded, time.time(), time.monotonic()
+        offset = recorded - self._recorded0
+        if self.speed > 0:
+            delay = self._mono0 + offset / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.max_lag_s = max(self.max_lag_s, -delay)
+        if self.timestamps == "wall":
+            return time.time()
+        if self.timestamps == "shifted":
+            return self._wall0 + offset
+        return recorded
+
+    def spread(self, stamp, offsets):
+        """Epoch times for records at recorded offsets (seconds) after a paced instant"""
+        offsets = np.asarray(offsets, dtype=float)
+        if self.timestamps == "wall":
+            return stamp + (offsets / self.speed if self.speed > 0 else np.zeros_like(offsets))
+        return stamp + offsets
+
+    @staticmethod
+    def isoformat(epoch):
+        return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def mapped_lines(path):
+    """Lines of a text file read through mmap, so large recordings are never loaded whole"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for line in iter(mapped.readline, b""):
+            yield line.decode("ascii", errors="replace")
+
+
+def stamp_seconds(stamp):
+    """rtl_power 'YYYY-MM-DD HH:MM:SS' stamp as epoch seconds
+
+    rtl_power writes the capturing machine's local time, so the stamp is
+    read in this machine's local time zone.
+    """
+    seconds = _STAMP_CACHE.get(stamp)
+    if seconds is None:
+        if len(_STAMP_CACHE) > 4096:
+            _STAMP_CACHE.clear()
+        seconds = _STAMP_CACHE[stamp] = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp()
+    return seconds
+
+
+def replay_rows(path, clock):
+    """Paced (epoch, rtl_power row) pairs from a recorded CSV"""
+    for row in rtl_power_rows(mapped_lines(path)):
+        yield clock.pace(stamp_seconds(row[0])), row
+
+
+def replay_iq_blocks(paths, clock, iq_format="cu8", sample_rate=2.4e6, block_samples=2_400_000, start=0.0):
+    """Paced (epoch, (channels, block_samples) complex64) blocks from aligned per-channel IQ files
+
+    Raw IQ carries no time of its own: block times are start (epoch
+    seconds of the first sample) plus the sample offset.
+    """
+    readers = [iq_blocks(path, iq_format, block_samples) for path in paths]
+    for index, blocks in enumerate(zip(*readers)):
+        yield clock.pace(start + index * block_samples / sample_rate), np.stack(blocks)
+
+
+def _write_fixtures(directory, sweeps=20, iq_seconds=2.0, sample_rate=2.4e6, seed=0):
+    """Synthetic rtl_power CSV and five cs16 IQ channels for benchmarking"""
+    from kraken_doa import DoaEstimator
+    from kraken_sweep import synthetic_rows
+
+    csv_path = os.path.join(directory, "scan.csv")
+    with open(csv_path, "w") as f:
+        for stamp, low, high, step, powers in synthetic_rows(88e6, 108e6, 10e3, sweeps=sweeps, seed=seed):
+            date, clock = stamp.split(" ")
+            f.write(f"{date}, {clock}, {int(low)}, {int(high)}, {step:g}, 1, "
+                    + ", ".join(f"{p:.2f}" for p in powers) + "\n")
+
+    estimator = DoaEstimator()
+    rng = np.random.default_rng(seed)
+    samples = int(iq_seconds * sample_rate)
+    iq = estimator.synthetic_snapshots(rng.uniform(0, 360), 146.52e6, "UCA", samples=samples, rng=rng)[0]
+    iq *= 0.1 / np.abs(iq).std()
+    iq_paths = []
+    for channel, samples_c in enumerate(iq):
+        path = os.path.join(directory, f"ch{channel}.cs16")
+        pairs = np.empty(2 * len(samples_c), dtype=np.int16)
+        pairs[0::2] = np.clip(samples_c.real * 32767, -32768, 32767)
+        pairs[1::2] = np.clip(samples_c.imag * 32767, -32768, 32767)
+        pairs.tofile(path)
+        iq_paths.append(path)
+    return csv_path, iq_paths
+
+
+def benchmark(sweeps=20, iq_seconds=2.0):
+    """Replay synthetic recordings through the logger as fast as possible"""
+    from kraken_data_logger import KrakenDataLogger
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, iq_paths = _write_fixtures(tmp, sweeps, iq_seconds)
+        with KrakenDataLogger(os.path.join(tmp, "logs"), quiet=True) as logger:
+            logger.rtl_sdr_count = 0
+            for name, replay, size in (
+                    ("rtl_power", lambda: logger.replay_rtl_power(csv_path, speed=0.0),
+                     os.path.getsize(csv_path)),
+                    ("iq_doa", lambda: logger.replay_iq(iq_paths, iq_format="cs16", speed=0.0),
+                     sum(os.path.getsize(p) for p in iq_paths))):
+                stats = replay()
+                results[name] = stats
+                print(f"{name:>10}: {stats['inputs']:6d} inputs -> {stats['records']:6d} records in "
+                      f"{stats['elapsed_s']:6.2f} s  ({stats['records'] / stats['elapsed_s']:9.0f} rec/s, "
+                      f"{size / stats['elapsed_s'] / 1e6:7.1f} MB/s read)")
+    return results
+
+
+def main():
+    """Run the replay benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR capture replay benchmark')
+    parser.add_argument('--sweeps', type=int, default=20,
+                       help='Synthetic FM-band rtl_power sweeps to replay (default: 20)')
+    parser.add_argument('--iq-seconds', type=float, default=2.0,
+                       help='Seconds of synthetic 5-channel IQ to replay (default: 2)')
+    args = parser.parse_args()
+    benchmark(args.sweeps, args.iq_seconds)
+
+
+if __name__ == "__main__":
+    main()
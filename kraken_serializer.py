@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Record Serializer
+NDJSON encoding with pre-encoded constant fragments and native NumPy support
+"""
+
+import json
+import math
+import time
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional fast backend (installed by build_all.sh)
+    orjson = None
+
+
+def _numpy_default(obj):
+    """json.dumps / orjson fallback for NumPy arrays and scalars"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f" and obj.dtype.itemsize < 8:
+            # Shortest digits at the array's own precision, as orjson writes float32
+            obj = obj.astype(str).astype(float)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        if isinstance(obj, np.floating) and obj.dtype.itemsize < 8:
+            return float(str(obj))
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _plain(obj):
+    """Copy of obj with NumPy keys/values as Python ones and NaN/inf as None
+
+    Slow path for records the fast encoders reject (NumPy dict keys,
+    non-finite floats in the stdlib backend).
+    """
+    if isinstance(obj, dict):
+        return {(k.item() if isinstance(k, np.generic) else k): _plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(v) for v in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _plain(_numpy_default(obj))
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+_SEPARATOR = ","
+_encoder = json.JSONEncoder(default=_numpy_default, separators=(",", ":"), ensure_ascii=False,
+                            allow_nan=False)
+
+
+def _json_dumps(obj):
+    """Stdlib encoding matching the orjson output (compact, UTF-8, NaN/inf as null)"""
+    try:
+        return _encoder.encode(obj)
+    except (TypeError, ValueError):
+        return _encoder.encode(_plain(obj))
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Serialize to a JSON string, NumPy values included"""
+        try:
+            # default= takes what OPT_SERIALIZE_NUMPY can't (non-contiguous arrays, float16 ...)
+            return orjson.dumps(obj, default=_numpy_default, option=_ORJSON_OPTS).decode()
+        except orjson.JSONEncodeError:
+            return orjson.dumps(_plain(obj), default=_numpy_default, option=_ORJSON_OPTS).decode()
+else:
+    BACKEND = "json"
+    dumps = _json_dumps
+
+
+class RecordSerializer:
+    """Encode records as variable fields spliced in front of a cached constant fragment
+
+    register() encodes an event type's constant fields once; encode() then
+    only serializes what changes per record and joins the two JSON bodies.
+    """
+
+    def __init__(self, constants=None):
+        self._fragments = {}
+        for event_type, fields in (constants or {}).items():
+            self.register(event_type, fields)
+
+    def register(self, event_type, fields):
+        """Pre-encode the constant fields for one event type"""
+        self._fragments[event_type] = dumps(fields)[1:-1] if fields else ""
+
+    def encode(self, event_type, record):
+        """Return one NDJSON line (without newline) for a record"""
+        body = dumps(record)
+        fragment = self._fragments.get(event_type)
+        if not fragment:
+            return body
+        if body == "{}":
+            return "{" + fragment + "}"
+        return body[:-1] + _SEPARATOR + fragment + "}"
+
+
+def benchmark(records=5000):
+    """Compare stdlib json.dumps on full records against the template serializer, per event type"""
+    from kraken_data_logger import RECORD_CONSTANTS
+
+    rng = np.random.default_rng(0)
+    variable = {
+        "doa": {"@timestamp": "2026-01-01T00:00:00+00:00", "bearing_degrees": rng.uniform(0, 360),
+                "confidence": rng.uniform(50, 80), "rssi_db": rng.uniform(-80, -20),
+                "doa_spectrum_360": rng.normal(0, 0.1, 360)},
+        "spectrum": {"@timestamp": "2026-01-01T00:00:00+00:00",
+                     "power_stats": {"max_dbm": -20.0, "min_dbm": -90.0, "mean_dbm": np.float64(-70.0)},
+                     "fft_size": 1000},
+        "radar": {"@timestamp": "2026-01-01T00:00:00+00:00",
+                  "target": {"range_meters": rng.uniform(1000, 50000), "snr_db": rng.uniform(10, 30)}},
+        "beamforming": {"@timestamp": "2026-01-01T00:00:00+00:00",
+                        "beam_pattern": {"main_lobe_direction": 12.0, "main_lobe_gain_db": 10.0}},
+        "tdoa": {"@timestamp": "2026-01-01T00:00:00+00:00", "tdoa_measurements": rng.uniform(-1e-6, 1e-6, 10)},
+        "status": {"@timestamp": "2026-01-01T00:00:00+00:00", "processes": {"status": "error"}}
+    }
+    serializer = RecordSerializer(RECORD_CONSTANTS)
+    results = {}
+    print(f"backend: {BACKEND}")
+    for event_type, fields in variable.items():
+        start = time.perf_counter()
+        for _ in range(records):
+            full = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in fields.items()}
+            full.update(RECORD_CONSTANTS[event_type])
+            json.dumps(full)
+        legacy = records / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(records):
+            serializer.encode(event_type, dict(fields))
+        fast = records / (time.perf_counter() - start)
+
+        results[event_type] = {"json_records_per_sec": legacy, "serializer_records_per_sec": fast}
+        print(f"{event_type:>12}: json.dumps {legacy:10,.0f}/s  serializer {fast:10,.0f}/s ({fast / legacy:.1f}x)")
+    return results
+
+
+def main():
+    """Run the serializer benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR record serializer benchmark')
+    parser.add_argument('--records', type=int, default=5000,
+                       help='Records to encode per event type (default: 5000)')
+    args = parser.parse_args()
+    benchmark(args.records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+
+"""
+KrakenSDR Wide-band Sweep
+Row-by-row rtl_power aggregation into compact per-segment records with bounded memory
+"""
+
+import shlex
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from kraken_capture import parse_rtl_power_line
+
+SUFFIXES = {"k": 1e3, "M": 1e6, "G": 1e9}
+
+
+def parse_frequency(text):
+    """Parse '24M', '1.7G', '10k' or plain Hz into a float"""
+    text = str(text).strip()
+    if text and text[-1] in SUFFIXES:
+        return float(text[:-1]) * SUFFIXES[text[-1]]
+    return float(text)
+
+
+def rtl_power_lines(freq_start, freq_end, bin_size=10e3, interval=1, device_index=0,
+                    command='rtl_power', single=False):
+    """Yield stdout lines from an rtl_power scan of the whole range; the process stops when closed"""
+    cmd = shlex.split(command) + [
+        '-d', str(device_index),
+        '-f', f'{int(freq_start)}:{int(freq_end)}:{int(bin_size)}',
+        '-i', str(interval)
+    ] + (['-1'] if single else []) + ['-']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    try:
+        yield from proc.stdout
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        proc.stdout.close()
+
+
+def rtl_power_rows(lines):
+    """Parse rtl_power CSV lines, skipping junk, as (stamp, low, high, step, powers ndarray)"""
+    for line in lines:
+        row = parse_rtl_power_line(line)
+        if row is not None:
+            yield row[0], row[1], row[2], row[3], np.asarray(row[4], dtype=float)
+
+
+class RunningStats:
+    """Welford mean/variance with min/max, updated a whole array at a time (Chan's merge)"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        """Fold another RunningStats into this one"""
+        total = self.count + other.count
+        if other.count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return (self.m2 / self.count) ** 0.5 if self.count else None
+
+    def as_dict(self):
+        return {
+            "max_dbm": self.max if self.count else None,
+            "min_dbm": self.min if self.count else None,
+            "mean_dbm": self.mean if self.count else None,
+            "std_dbm": self.std
+        }
+
+
+class SegmentState:
+    """One fixed frequency segment: current-pass stats plus per-bin history across sweeps"""
+
+    def __init__(self, index, freq_start, freq_end, display_bins):
+        self.index = index
+        self.freq_start = freq_start
+        self.freq_end = freq_end
+        self.display_bins = display_bins
+        self.sweeps = 0
+        self.history = RunningStats()
+        # Per display bin: running average across sweeps and max-hold
+        self.bin_count = np.zeros(display_bins)
+        self.bin_mean = np.zeros(display_bins)
+        self.max_hold = np.full(display_bins, -np.inf)
+        self._reset_pass()
+
+    def _reset_pass(self):
+        self.stats = RunningStats()
+        self.pass_sum = np.zeros(self.display_bins)
+        self.pass_hits = np.zeros(self.display_bins)
+        self.pass_max = np.full(self.display_bins, -np.inf)
+        self.peak_hz = None
+        self.bin_size_hz = None
+        self.stamp = None
+
+    def _fit_display_bins(self, step):
+        """Shrink display_bins to the real bins the segment holds (e.g. --bin-size 1M)
+
+        Only before any data is folded in; otherwise most display bins would
+        never be hit and stay NaN in max_hold_db/average_db.
+        """
+        real_bins = max(int((self.freq_end - self.freq_start) // step), 1)
+        if real_bins < self.display_bins and self.sweeps == 0 and self.stats.count == 0:
+            self.display_bins = real_bins
+            self.bin_count = np.zeros(real_bins)
+            self.bin_mean = np.zeros(real_bins)
+            self.max_hold = np.full(real_bins, -np.inf)
+            self._reset_pass()
+
+    def add(self, stamp, step, freqs, powers):
+        """Fold one row slice (sorted by frequency) into the current pass"""
+        if step > 0 and self.bin_size_hz is None:
+            self._fit_display_bins(step)
+        self.stamp = self.stamp or stamp
+        self.bin_size_hz = step
+        peak = int(powers.argmax())
+        if powers[peak] > self.stats.max:
+            self.peak_hz = float(freqs[peak])
+        self.stats.update(powers)
+        width = self.freq_end - self.freq_start
+        idx = ((freqs - self.freq_start) * (self.display_bins / width)).astype(int)
+        np.clip(idx, 0, self.display_bins - 1, out=idx)
+        self.pass_sum += np.bincount(idx, powers, minlength=self.display_bins)
+        self.pass_hits += np.bincount(idx, minlength=self.display_bins)
+        starts = np.concatenate(([0], np.flatnonzero(idx[1:] != idx[:-1]) + 1))
+        np.maximum.at(self.pass_max, idx[starts], np.maximum.reduceat(powers, starts))
+
+    def finish(self, sweep_index):
+        """Close the current pass and return its segment dict"""
+        self.sweeps += 1
+        seen = self.pass_hits > 0
+        pass_mean = np.divide(self.pass_sum, self.pass_hits, out=np.full(self.display_bins, np.nan),
+                              where=seen)
+        # Incremental per-bin mean of this pass's bin means
+        self.bin_count[seen] += 1
+        delta = pass_mean[seen] - self.bin_mean[seen]
+        self.bin_mean[seen] += delta / self.bin_count[seen]
+        np.maximum(self.max_hold, self.pass_max, out=self.max_hold)
+        self.history.merge(self.stats)
+
+        has_history = self.bin_count > 0
+        segment = {
+            "segment_index": self.index,
+            "sweep_index": sweep_index,
+            "rtl_power_stamp": self.stamp,
+            "freq_start": self.freq_start,
+            "freq_end": self.freq_end,
+            "bin_size_hz": self.bin_size_hz,
+            "bins": self.stats.count,
+            "power_stats": self.stats.as_dict(),
+            "peak": {"frequency_hz": self.peak_hz, "power_dbm": self.stats.max},
+            "running_stats": {"sweeps": self.sweeps, "samples": self.history.count,
+                              **self.history.as_dict()},
+            "max_hold_db": np.where(has_history, self.max_hold, np.nan),
+            "average_db": np.where(has_history, self.bin_mean, np.nan)
+        }
+        self._reset_pass()
+        return segment
+
+
+class SweepAggregator:
+    """Split rtl_power rows into fixed-width segments and emit each as soon as the scan passes it
+
+    Only the open segments of the current pass hold row data; everything
+    kept across sweeps is O(segments x display_bins), independent of the
+    number of bins rtl_power produces. A new sweep is detected when a row
+    starts at or below the previous row's start frequency.
+    """
+
+    def __init__(self, freq_start, freq_end, segment_hz=10e6, display_bins=64):
+        self.freq_start = float(freq_start)
+        self.freq_end = float(freq_end)
+        self.segment_hz = float(segment_hz)
+        self.display_bins = display_bins
+        self.sweep_index = 0
+        self.segments = {}
+        self._open = {}
+        self._last_low = None
+
+    def _segment(self, index):
+        state = self.segments.get(index)
+        if state is None:
+            start = self.freq_start + index * self.segment_hz
+            state = self.segments[index] = SegmentState(
+                index, start, min(start + self.segment_hz, self.freq_end), self.display_bins)
+        return state
+
+    def _close(self, before=None):
+        for index in sorted(self._open):
+            if before is not None and index >= before:
+                break
+            yield self._open.pop(index).finish(self.sweep_index)
+
+    def feed(self, row):
+        """Fold one row in; yields every segment the scan has moved past"""
+        stamp, low, high, step, powers = row
+        if self._last_low is not None and low <= self._last_low:
+            yield from self._close()
+            self.sweep_index += 1
+        self._last_low = low
+        freqs = low + step * np.arange(len(powers))
+        lo, hi = np.searchsorted(freqs, (self.freq_start, self.freq_end))
+        if lo >= hi:
+            return
+        freqs, powers = freqs[lo:hi], powers[lo:hi]
+        seg_idx = ((freqs - self.freq_start) // self.segment_hz).astype(int)
+        first, last = int(seg_idx[0]), int(seg_idx[-1])
+        yield from self._close(before=first)
+        if first == last:
+            cuts = [(0, len(seg_idx))]
+        else:
+            bounds = (np.flatnonzero(seg_idx[1:] != seg_idx[:-1]) + 1).tolist()
+            cuts = zip([0] + bounds, bounds + [len(seg_idx)])
+        for a, b in cuts:
+            index = int(seg_idx[a])
+            state = self._open.get(index)
+            if state is None:
+                state = self._open[index] = self._segment(index)
+            state.add(stamp, step, freqs[a:b], powers[a:b])
+
+    def flush(self):
+        """Emit the segments still open at the end of input, completing the sweep"""
+        if self._open:
+            yield from self._close()
+            self.sweep_index += 1
+
+
+def sweep_segments(rows, aggregator, max_sweeps=None):
+    """Generator pipeline: rows -> segment dicts, stopping after max_sweeps complete sweeps"""
+    for row in rows:
+        for segment in aggregator.feed(row):
+            yield segment
+        if max_sweeps and aggregator.sweep_index >= max_sweeps:
+            return
+    yield from aggregator.flush()
+
+
+def synthetic_rows(freq_start=24e6, freq_end=1.7e9, bin_size=10e3, hop_hz=2e6, sweeps=1, seed=0):
+    """rtl_power-style rows with a noise floor and a few carriers, for benchmarking"""
+    rng = np.random.default_rng(seed)
+    bins = int(hop_hz / bin_size)
+    carriers = rng.uniform(freq_start, freq_end, 50)
+    for sweep in range(sweeps):
+        stamp = f"2024-01-01 00:{sweep // 60:02d}:{sweep % 60:02d}"
+        for low in np.arange(freq_start, freq_end, hop_hz):
+            powers = -95 + 3 * rng.standard_normal(bins)
+            hit = (carriers >= low) & (carriers < low + hop_hz)
+            for f in carriers[hit]:
+                powers[int((f - low) / bin_size)] += 50
+            yield stamp, float(low), float(low + hop_hz), bin_size, powers
+
+
+def benchmark(freq_start=24e6, freq_end=1.7e9, bin_size=10e3, sweeps=3, segment_hz=10e6):
+    """Aggregate synthetic full-band sweeps; reports bins/sec and peak traced memory"""
+    rows = list(synthetic_rows(freq_start, freq_end, bin_size, sweeps=sweeps))
+    total_bins = sum(len(r[4]) for r in rows)
+    start = time.perf_counter()
+    segments = sum(1 for _ in sweep_segments(iter(rows), SweepAggregator(freq_start, freq_end, segment_hz)))
+    elapsed = time.perf_counter() - start
+    # Second pass under tracemalloc (slower) for the memory high-water mark
+    tracemalloc.start()
+    for _ in sweep_segments(iter(rows), SweepAggregator(freq_start, freq_end, segment_hz)):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sweep_mb = total_bins / sweeps * 8 / 1e6
+    print(f"{sweeps} sweeps x {total_bins // sweeps} bins -> {segments} segment records")
+    print(f"aggregation: {total_bins / elapsed / 1e6:8.2f} M bins/s, peak {peak / 1e6:6.2f} MB "
+          f"(one full sweep as float64: {sweep_mb:6.2f} MB)")
+    return {"bins_per_sec": total_bins / elapsed, "segments": segments, "peak_bytes": peak}
+
+
+def main():
+    """Run the wide-band aggregation benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='KrakenSDR wide-band sweep aggregation benchmark')
+    parser.add_argument('--sweeps', type=int, default=3,
+                       help='Synthetic sweeps to aggregate (default: 3)')
+    parser.add_argument('--bin-size', default='10k',
+                       help='Bin size (default: 10k)')
+    args = parser.parse_args()
+    benchmark(bin_size=parse_frequency(args.bin_size), sweeps=args.sweeps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Modules live at the repository root (run with: python -m pytest tests)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kraken_data_logger import KrakenDataLogger  # noqa: E402
+from kraken_discovery import HardwareDiscoveryCache  # noqa: E402
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    """Build quiet loggers under tmp_path with a private discovery cache; all are closed after the test"""
+    loggers = []
+
+    def make(name="logs", **kwargs):
+        kwargs.setdefault("discovery_cache", HardwareDiscoveryCache(str(tmp_path / "hw.json")))
+        logger = KrakenDataLogger(str(tmp_path / name), quiet=True, **kwargs)
+        loggers.append(logger)
+        return logger
+
+    yield make
+    for logger in loggers:
+        logger.close()
+
+
+@pytest.fixture
+def logger(make_logger):
+    return make_logger()
+
+
+@pytest.fixture
+def records():
+    """Flush a logger and read back the records it wrote for one event type"""
+    def read(logger, event):
+        logger.flush()
+        with open(logger.writer.path_for(event)) as f:
+            return [json.loads(line) for line in f]
+
+    return read
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+Fake rtl_power for tests: emits canned CSV sweeps for the requested range
+
+Understands -d, -f start:stop:bin, -i, -1 and the trailing '-'. Every
+invocation is appended to $FAKE_RTL_POWER_LOG, one argument list per
+line, so tests can count process starts. A carrier sits at
+$FAKE_RTL_POWER_CARRIER Hz (default 100 MHz); $FAKE_RTL_POWER_PERIOD sets
+the seconds between sweeps (default 0.02, instead of -i). A device listed
+in $FAKE_RTL_POWER_HANG (comma separated) never produces output.
+"""
+
+import os
+import sys
+import time
+
+HOP_HZ = 2e6
+
+
+def parse_args(argv):
+    opts = {"-d": "0", "-i": "1"}
+    single = False
+    it = iter(argv)
+    for arg in it:
+        if arg == "-1":
+            single = True
+        elif arg in ("-d", "-f", "-i"):
+            opts[arg] = next(it)
+    start, stop, bin_size = opts["-f"].split(":")
+    return int(opts["-d"]), float(start), float(stop), float(bin_size.rstrip("kK")) * (
+        1e3 if bin_size[-1] in "kK" else 1.0), single
+
+
+def sweep_lines(stamp, start, stop, bin_size, carrier):
+    low = start
+    while low < stop:
+        high = min(low + HOP_HZ, stop)
+        bins = max(int(round((high - low) / bin_size)), 1)
+        powers = []
+        for i in range(bins):
+            freq = low + i * bin_size
+            powers.append(-10.0 if abs(freq - carrier) < bin_size else -60.0 + (i % 5) * 0.5)
+        date, clock = stamp.split(" ")
+        yield (f"{date}, {clock}, {int(low)}, {int(high)}, {bin_size:.2f}, 16, "
+               + ", ".join(f"{p:.2f}" for p in powers))
+        low = high
+
+
+def main():
+    argv = sys.argv[1:]
+    log = os.environ.get("FAKE_RTL_POWER_LOG")
+    if log:
+        with open(log, "a") as f:
+            f.write(" ".join(argv) + "\n")
+    device, start, stop, bin_size, single = parse_args(argv)
+    if str(device) in os.environ.get("FAKE_RTL_POWER_HANG", "").split(","):
+        time.sleep(3600)
+        return
+    carrier = float(os.environ.get("FAKE_RTL_POWER_CARRIER", "100e6"))
+    period = float(os.environ.get("FAKE_RTL_POWER_PERIOD", "0.02"))
+    second = 0
+    while True:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(1_700_000_000 + second))
+        for line in sweep_lines(stamp, start, stop, bin_size, carrier):
+            print(line, flush=True)
+        if single:
+            return
+        second += 1
+        time.sleep(period)
+
+
+if __name__ == "__main__":
+    main()
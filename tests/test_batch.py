@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from kraken_data_logger import ILLUMINATOR_SOURCES
+
+
+@pytest.fixture
+def pair(make_logger):
+    """A logger for single-record calls and one for the matching batch call"""
+    return make_logger("single", seed=1), make_logger("batch", seed=1)
+
+
+def _rounded(value):
+    """Floats rounded to 9 significant digits, recursively (batch columns go through float64 arrays)"""
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rounded(item) for item in value]
+    return float(f"{value:.9g}") if isinstance(value, float) else value
+
+
+def _same(single, batch, volatile=()):
+    """Compare records field by field, ignoring timestamps and the listed (randomly drawn) fields"""
+    assert len(single) == len(batch)
+    for one, many in zip(single, batch):
+        for record in (one, many):
+            del record["@timestamp"], record["unix_epoch_time"]
+            for field in volatile:
+                block, _, key = field.rpartition(".")
+                container = record[block] if block else record
+                assert key in container
+                del container[key]
+        assert _rounded(one) == _rounded(many)
+
+
+def test_doa_batch_matches_single_records(pair, records):
+    single, batch = pair
+    for bearing, frequency in ((30.0, 146.52e6), (250.0, 433.92e6)):
+        single.log_doa_data(bearing, 60.0, frequency, -50.0, 100.0, use_real_data=False)
+    batch.log_doa_batch([30.0, 250.0], 60.0, [146.52e6, 433.92e6], -50.0, 100.0)
+    _same(records(single, "doa"), records(batch, "doa"))
+
+
+def test_doa_batch_defaults_match_single_records(pair, records):
+    single, batch = pair
+    single.log_doa_data(30.0, use_real_data=False)
+    batch.log_doa_batch([30.0, 60.0])
+    defaults = ("confidence", "rssi_db", "latency_ms")
+    _same(records(single, "doa")[:1], records(batch, "doa")[:1], defaults)
+    for record in records(batch, "doa"):
+        assert 50 <= record["confidence"] <= 80
+        assert -80 <= record["rssi_db"] <= -20
+        assert 50 <= record["latency_ms"] <= 200
+
+
+def test_spectrum_batch_matches_single_records(pair, records):
+    single, batch = pair
+    frequencies = np.linspace(88e6, 108e6, 200)
+    power = -95 + np.random.default_rng(0).normal(0, 1, (2, 200))
+    power[:, 50] += 30
+    for row in power:
+        single.log_spectrum_data(frequencies, row, use_real_data=False)
+    batch.log_spectrum_batch(frequencies, power)
+    _same(records(single, "spectrum"), records(batch, "spectrum"))
+    assert records(batch, "spectrum")[0]["signals_detected"] == 1
+
+
+def test_radar_batch_matches_single_records(pair, records):
+    single, batch = pair
+    single.log_passive_radar(3000.0, 45.0, 10.0, illuminator_freq=98.5e6, target_snr=20.0)
+    single.log_passive_radar(8000.0, None, -5.0, illuminator_freq=98.5e6, target_snr=15.0, doppler_hz=3.0)
+    batch.log_radar_batch([3000.0, 8000.0], [45.0, np.nan], [10.0, -5.0], illuminator_freq=98.5e6,
+                          target_snrs=[20.0, 15.0], doppler_hz=[10.0 * 98.5e6 / 3e8, 3.0])
+    # A NaN bearing column entry is logged as null, like a missing single-record bearing
+    _same(records(single, "radar"), records(batch, "radar"), ("bistatic_geometry",))
+
+
+def test_radar_batch_defaults_match_single_records(pair, records):
+    single, batch = pair
+    single.log_passive_radar(3000.0, None, 10.0)
+    batch.log_radar_batch([3000.0, 9000.0], None, [10.0, 30.0])
+    volatile = ("bistatic_geometry", "illuminator", "target.snr_db", "target.doppler_shift_hz")
+    _same(records(single, "radar"), records(batch, "radar")[:1], volatile)
+    for record in records(batch, "radar"):
+        target = record["target"]
+        assert target["bearing_degrees"] is None
+        assert 10 <= target["snr_db"] <= 30
+        assert record["illuminator"] in ILLUMINATOR_SOURCES
+        assert target["doppler_shift_hz"] == pytest.approx(
+            target["velocity_ms"] * record["illuminator"]["frequency"] / 3e8)
+
+
+def test_beamforming_batch_matches_single_records(pair, records):
+    single, batch = pair
+    snapshots = single.doa_estimator.synthetic_snapshots([[40.0, 200.0], [120.0, 300.0]], 146.52e6, "UCA",
+                                                         snr_db=[10.0, 20.0], samples=64,
+                                                         rng=np.random.default_rng(0))
+    for direction, iq in zip((40.0, 120.0), snapshots):
+        single.log_beamforming_data(direction, iq_snapshots=iq)
+    single.log_beamforming_data(75.0)
+    batch.log_beamforming_batch([40.0, 120.0], iq_snapshots=snapshots)
+    batch.log_beamforming_batch([75.0])
+    _same(records(single, "beamforming"), records(batch, "beamforming"))
+
+
+def test_tdoa_batch_matches_single_records(pair, records):
+    single, batch = pair
+    measurements = single.tdoa_solver.simulate([[40.7128, -74.0060], [40.75, -73.95]], 0.0,
+                                               rng=np.random.default_rng(0))
+    for row in measurements:
+        single.log_tdoa_data(None, row.tolist())
+    single.log_tdoa_data([40.7, -74.0], measurements[0].tolist())
+    batch.log_tdoa_batch(None, measurements)
+    batch.log_tdoa_batch([[40.7, -74.0]], measurements[:1])
+    _same(records(single, "tdoa"), records(batch, "tdoa"))
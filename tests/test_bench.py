@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import kraken_bench
+from kraken_bench import bench, compare, main
+
+
+def _result(records_per_sec=1000.0, p50_ms=1.0, p99_ms=2.0, bytes_per_record=500.0):
+    return {"records_per_sec": records_per_sec, "p50_ms": p50_ms, "p99_ms": p99_ms,
+            "bytes_per_record": bytes_per_record, "peak_rss_kb": 1024}
+
+
+def test_changes_beyond_the_threshold_are_regressions():
+    baseline = {"results": {"doa": _result(), "tdoa": _result()}}
+    results = {"doa": _result(records_per_sec=850.0, p99_ms=2.1),
+               "tdoa": _result(bytes_per_record=400.0, p50_ms=1.5),
+               "radar": _result()}
+    comparison, regressions = compare(results, baseline, threshold=0.10)
+    # Throughput falling, and latency or size growing, are the bad directions
+    assert sorted(regressions) == ["doa.records_per_sec", "tdoa.p50_ms"]
+    assert comparison["doa"]["records_per_sec"]["change"] == pytest.approx(-0.15)
+    assert not comparison["doa"]["p99_ms"]["regression"]
+    assert not comparison["tdoa"]["bytes_per_record"]["regression"]
+    # Scenarios missing from the baseline are not compared
+    assert "radar" not in comparison
+
+
+def test_metrics_without_a_value_are_skipped():
+    baseline = {"results": {"doa": _result(bytes_per_record=None)}}
+    comparison, regressions = compare({"doa": _result(bytes_per_record=None)}, baseline)
+    assert regressions == []
+    assert "bytes_per_record" not in comparison["doa"]
+
+
+def test_scenario_without_records_is_reported(capsys):
+    document = bench(["doa_batch"], count=2, batch_size=0)
+    result = document["results"]["doa_batch"]
+    assert (result["records"], result["bytes_per_record"]) == (0, None)
+    assert "- B/rec" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("factor, status", [(0.5, 0), (1e6, 1)])
+def test_exit_status_reports_regressions(tmp_path, monkeypatch, factor, status):
+    monkeypatch.setattr(kraken_bench, "run_scenario",
+                        lambda name, *args, **kwargs: _result(records_per_sec=1000.0))
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"status": _result(records_per_sec=1000.0 * factor)}}))
+    output = tmp_path / "current.json"
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--scenarios", "status", "--compare", str(baseline), "--output", str(output)])
+    assert exit_info.value.code == status
+    document = json.loads(output.read_text())
+    assert document["comparison"]["status"]["records_per_sec"]["regression"] == bool(status)
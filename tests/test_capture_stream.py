@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from kraken_capture import RtlPowerStream, SweepAssembler, sweep_to_capture
+from kraken_data_logger import KrakenDataLogger
+from kraken_discovery import HardwareDiscoveryCache
+
+FAKE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rtl_power.py")
+FAKE_CMD = f"{sys.executable} {FAKE}"
+
+
+@pytest.fixture
+def fake_env(tmp_path, monkeypatch):
+    log = tmp_path / "invocations.log"
+    monkeypatch.setenv("FAKE_RTL_POWER_LOG", str(log))
+    monkeypatch.setenv("FAKE_RTL_POWER_CARRIER", "100e6")
+    return log
+
+
+def _invocations(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def _wait(fn, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = fn()
+        if value is not None:
+            return value
+        time.sleep(0.01)
+    return fn()
+
+
+def _logger(tmp_path, **kwargs):
+    logger = KrakenDataLogger(str(tmp_path / "logs"), quiet=True, rtl_power_cmd=FAKE_CMD,
+                              discovery_cache=HardwareDiscoveryCache(str(tmp_path / "hw.json")), **kwargs)
+    logger.rtl_sdr_count = 1
+    return logger
+
+
+def test_assembler_joins_hops_into_one_sweep():
+    assembler = SweepAssembler()
+    rows = ["2024-01-01, 00:00:00, 100000000, 102000000, 1000000.00, 1, -50, -40",
+            "2024-01-01, 00:00:00, 102000000, 104000000, 1000000.00, 1, -30, -20",
+            "2024-01-01, 00:00:01, 100000000, 102000000, 1000000.00, 1, -51, -41"]
+    assert assembler.feed(rows[0]) is None
+    assert assembler.feed(rows[1]) is None
+    sweep = assembler.feed(rows[2])
+    assert (sweep["freq_start"], sweep["freq_end"]) == (100e6, 104e6)
+    assert sweep["power_spectrum"].tolist() == [-50, -40, -30, -20]
+
+
+def test_stream_serves_canned_sweeps(fake_env):
+    stream = RtlPowerStream(frequency=100e6, span=2e6, command=FAKE_CMD)
+    try:
+        assert stream.start()
+        sweep = _wait(stream.latest)
+        assert sweep is not None
+        capture = sweep_to_capture(sweep)
+        assert capture["max_power_db"] == pytest.approx(-10.0)
+        assert capture["freq_start"] == pytest.approx(99e6)
+    finally:
+        stream.stop()
+    assert not stream.running
+
+
+def test_one_shot_capture_without_streaming(tmp_path, fake_env):
+    with _logger(tmp_path) as logger:
+        capture = logger.collect_real_rtl_sdr_data(frequency=100e6)
+    assert capture is not None
+    assert capture["max_power_db"] == pytest.approx(-10.0)
+    assert len(_invocations(fake_env)) == 1
+
+
+def test_band_wide_requests_share_one_stream(tmp_path, fake_env):
+    """Random FM-band tunings widen one session instead of restarting rtl_power each time"""
+    rng = np.random.default_rng(0)
+    with _logger(tmp_path, streaming=True) as logger:
+        answered = 0
+        for frequency in rng.uniform(88e6, 108e6, 40):
+            capture = _wait(lambda: logger.read_rtl_sdr_stream(0, frequency))
+            if capture is not None:
+                answered += 1
+                # Only the requested +/- 1 MHz window comes back from the widened stream
+                assert frequency - 1e6 <= capture["freq_start"] <= capture["freq_end"] <= frequency + 1e6
+        starts = len(_invocations(fake_env))
+    assert answered == 40
+    assert starts <= 6
@@ -0,0 +1,63 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from kraken_daemon import RateScheduler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_idle_hook_runs_and_request_stop_ends_the_loop():
+    idle = []
+    scheduler = RateScheduler({"doa": lambda: None}, {"doa": 0.01}, idle=lambda: idle.append(1),
+                              idle_interval=0.02)
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    time.sleep(0.15)
+    scheduler.request_stop()
+    thread.join(1.0)
+    assert not thread.is_alive()
+    assert len(idle) >= 3
+
+
+def test_sigterm_flushes_and_closes_the_logger(tmp_path):
+    log_dir = tmp_path / "logs"
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {ROOT!r})
+        from kraken_daemon import LoggerDaemon
+        from kraken_data_logger import KrakenDataLogger
+        from kraken_discovery import HardwareDiscoveryCache
+
+        # Writer timer and size bound both out of reach: only the daemon flushes
+        logger = KrakenDataLogger({str(log_dir)!r}, quiet=True, flush_bytes=1 << 30, flush_interval=3600,
+                                  discovery_cache=HardwareDiscoveryCache({str(tmp_path / "hw.json")!r}))
+        logger.rtl_sdr_count = 0
+        LoggerDaemon(logger, rates={{"doa": 50.0, "status": 0.001}}, socket_path={str(tmp_path / "ctl.sock")!r},
+                     flush_interval=0.05).run()
+        print("exited cleanly")
+    """)
+    proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True)
+    try:
+        deadline = time.monotonic() + 10
+        doa_files = []
+        while time.monotonic() < deadline and not doa_files:
+            doa_files = [f for f in (os.listdir(log_dir) if log_dir.exists() else [])
+                         if f.startswith("kraken-doa-") and os.path.getsize(log_dir / f) > 0]
+            time.sleep(0.05)
+        # Records reach disk while the daemon is running
+        assert doa_files
+        proc.send_signal(signal.SIGTERM)
+        output, _ = proc.communicate(timeout=10)
+    finally:
+        proc.kill()
+    assert proc.returncode == 0, output
+    assert "exited cleanly" in output
+    with open(log_dir / doa_files[0]) as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.startswith("{") and line.endswith("}") for line in lines)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from kraken_detect import SignalDetector
+
+
+def _spectrum(snrs, bins=2048, noise_db=-95.0, seed=0):
+    rng = np.random.default_rng(seed)
+    freqs = np.linspace(88e6, 108e6, bins)
+    power = noise_db + 0.5 * rng.standard_normal(bins)
+    centres = np.linspace(200, bins - 200, len(snrs)).astype(int)
+    for centre, snr in zip(centres, snrs):
+        power[centre - 2:centre + 3] = noise_db + snr
+    return freqs, power
+
+
+def test_squelch_separates_weak_detections():
+    detector = SignalDetector()
+    freqs, power = _spectrum([9.5, 30.0])
+    signals, floor_db = detector.detect(freqs, power)
+    channels = detector.vfo_channels(signals, floor_db)
+    assert len(channels) == 2
+    assert [c["signal_detected"] for c in channels] == [False, True]
+    assert channels[0]["squelch_db"] == round(floor_db + 10.0, 1)
+
+
+def test_squelch_never_below_detection_level():
+    detector = SignalDetector(min_snr_db=12.0, squelch_margin_db=3.0)
+    channels = detector.vfo_channels([{"center_frequency_hz": 1e8, "bandwidth_hz": 1e3, "peak_power_db": -80.0,
+                                       "snr_db": 15.0}], -95.0)
+    assert channels[0]["squelch_db"] == -83.0
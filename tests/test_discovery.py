@@ -0,0 +1,43 @@
+import subprocess
+import time
+
+import pytest
+
+import kraken_data_logger
+from kraken_data_logger import KrakenDataLogger
+from kraken_discovery import HardwareDiscoveryCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # An empty sysfs directory gives a stable (empty) USB topology key
+    (tmp_path / "sysfs").mkdir()
+    return HardwareDiscoveryCache(str(tmp_path / "hw.json"), sysfs=str(tmp_path / "sysfs"))
+
+
+def test_zero_devices_expire_after_the_negative_ttl(cache):
+    cache.store(5)
+    assert cache.load() == 5
+    cache.negative_ttl = 0.01
+    cache.store(0)
+    time.sleep(0.02)
+    assert cache.load() is None
+
+
+def test_failed_probe_is_not_cached(make_logger, cache, monkeypatch):
+    def hung_rtl_test(cmd, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+
+    monkeypatch.setattr(kraken_data_logger.subprocess, "run", hung_rtl_test)
+    with make_logger(discovery_cache=cache) as logger:
+        assert logger.rtl_sdr_count == 0
+    assert cache.load() is None
+
+
+def test_simulated_records_do_not_probe(make_logger, cache, monkeypatch):
+    probes = []
+    monkeypatch.setattr(KrakenDataLogger, "check_rtl_sdr_hardware", lambda self: probes.append(1))
+    with make_logger(discovery_cache=cache) as logger:
+        logger.log_doa_data(bearing=10.0, confidence=70.0, rssi_db=-50.0, use_real_data=False)
+        logger.log_spectrum_data(use_real_data=False)
+        assert probes == []
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from kraken_doa import DoaEstimator
+
+
+def _climb(row, start, step):
+    """Value of the local maximum reached by walking uphill from start in one direction"""
+    index = start
+    while row[(index + step) % len(row)] > row[index % len(row)]:
+        index += step
+    return row[index % len(row)]
+
+
+def test_side_lobe_excludes_an_offset_main_lobe():
+    estimator = DoaEstimator()
+    rng = np.random.default_rng(1)
+    wanted = rng.uniform(0, 360, 100)
+    interferer = (wanted + rng.uniform(60, 300, 100)) % 360
+    snapshots = estimator.synthetic_snapshots(np.stack([wanted, interferer], axis=1), 146.52e6, "UCA",
+                                              snr_db=[10.0, 20.0], samples=64, rng=rng)
+    weights = estimator.weights(estimator.covariance(snapshots), 146.52e6, "UCA", wanted)
+    patterns = estimator.beam_patterns(weights, 146.52e6, "UCA", wanted)
+
+    offset = 0
+    for row, direction, side_lobe in zip(patterns["pattern_db"], wanted, patterns["side_lobe_level_db"]):
+        steered = int(np.rint(direction / estimator.resolution_deg)) % len(row)
+        peaks = _climb(row, steered, 1), _climb(row, steered, -1)
+        offset += max(peaks) > row[steered]
+        # The lobe the beam was steered into is never reported as its own side lobe
+        assert np.abs(side_lobe - np.array(peaks)).min() > 1e-9
+    assert offset > 0
+
+
+def test_batch_estimates_each_frequency_with_its_own_steering(logger, records):
+    frequencies = np.repeat([146.52e6, 433.92e6], 20)
+    truth = np.random.default_rng(0).uniform(0, 360, 40)
+    snapshots = np.concatenate([
+        logger.doa_estimator.synthetic_snapshots(truth[:20], 146.52e6, "UCA", snr_db=20.0, samples=128,
+                                                 rng=np.random.default_rng(1)),
+        logger.doa_estimator.synthetic_snapshots(truth[20:], 433.92e6, "UCA", snr_db=20.0, samples=128,
+                                                 rng=np.random.default_rng(2))])
+    logger.log_doa_batch(None, frequencies=frequencies, iq_snapshots=snapshots)
+
+    records = records(logger, "doa")
+    bearings = np.array([record["bearing_degrees"] for record in records])
+    error = np.abs((bearings - truth + 180.0) % 360.0 - 180.0)
+    assert error.max() < 3.0
+    assert [record["frequency_hz"] for record in records] == frequencies.tolist()
+
+
+def test_simulated_spectra_follow_the_logger_seed(make_logger, records):
+    spectra = []
+    for run in range(2):
+        logger = make_logger(f"logs{run}", seed=7)
+        logger.log_doa_batch([10.0, 200.0], frequencies=[146.52e6, 446.0e6], confidences=60.0,
+                             rssi_db=-50.0, latency_ms=100.0)
+        spectra.append([record["doa_spectrum_360"] for record in records(logger, "doa")])
+    assert spectra[0] == spectra[1]
+
+
+def test_simulated_doa_uses_the_spectrum_generator(logger, records, monkeypatch):
+    def no_estimates(*args, **kwargs):
+        raise AssertionError("simulated records must not run the DoA estimator")
+
+    monkeypatch.setattr(logger.doa_estimator, "estimate", no_estimates)
+    logger.log_doa_data(bearing=40.0, use_real_data=False)
+    logger.log_doa_batch([10.0, 200.0], frequencies=[146.52e6, 446.0e6])
+    records = records(logger, "doa")
+    assert [record["bearing_degrees"] for record in records] == [40.0, 10.0, 200.0]
+    assert all("doa_method" not in record and len(record["doa_spectrum_360"]) == 360 for record in records)
+
+
+def test_beamforming_needs_directions_or_snapshots(logger):
+    with pytest.raises(ValueError, match="directions or iq_snapshots"):
+        logger.log_beamforming_data()
+    with pytest.raises(ValueError, match="directions or iq_snapshots"):
+        logger.log_beamforming_batch(None)
+    with pytest.raises(ValueError, match="bearings or iq_snapshots"):
+        logger.log_doa_batch(None)
@@ -0,0 +1,165 @@
+import base64
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from kraken_es_shipper import ElasticsearchShipper
+from kraken_log_writer import KrakenLogWriter
+
+
+class StubElasticsearch(ThreadingHTTPServer):
+    """_bulk endpoint answering with a canned status and body"""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        self.body = None          # None: accept every item
+        super().__init__(("127.0.0.1", 0), _BulkHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _BulkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        self.server.requests.append((self.path, dict(self.headers), body))
+        lines = body.splitlines()
+        payload = self.server.body
+        if payload is None:
+            payload = json.dumps({"errors": False,
+                                  "items": [{"create": {"status": 201}} for _ in lines[::2]]})
+        data = payload.encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def es():
+    server = StubElasticsearch()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _spilled_lines(tmp_path, event_type="doa"):
+    writer = KrakenLogWriter(str(tmp_path))
+    path = writer.path_for(event_type)
+    writer.close()
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_bulk_request_routes_records_to_data_streams(es, tmp_path):
+    with ElasticsearchShipper(es.url, username="kraken", password="secret",
+                              fallback=KrakenLogWriter(str(tmp_path))) as shipper:
+        shipper.write_many("doa", ['{"bearing":1}', '{"bearing":2}'])
+        shipper.drain()
+        assert shipper.stats()["sent"] == 2
+    path, headers, body = es.requests[0]
+    assert path == "/_bulk"
+    assert headers["Authorization"] == "Basic " + base64.b64encode(b"kraken:secret").decode()
+    action, doc = body.splitlines()[:2]
+    assert json.loads(action) == {"create": {"_index": "kraken-sdr-doa-default"}}
+    assert json.loads(doc)["data_stream"]["dataset"] == "kraken-sdr-doa"
+
+
+def test_background_thread_ships_without_flush(es, tmp_path):
+    with ElasticsearchShipper(es.url, flush_interval=0.05, fallback=KrakenLogWriter(str(tmp_path))) as shipper:
+        shipper.write("doa", '{"bearing":1}')
+        deadline = time.monotonic() + 2
+        while shipper.stats()["sent"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert shipper.stats()["sent"] == 1
+
+
+def test_unreachable_cluster_opens_the_circuit(tmp_path):
+    shipper = ElasticsearchShipper(f"http://127.0.0.1:{_closed_port()}", backoff=0.05, max_retries=3,
+                                   flush_interval=60, fallback=KrakenLogWriter(str(tmp_path)))
+    try:
+        start = time.monotonic()
+        for i in range(50):
+            shipper.write("doa", f'{{"n":{i}}}')
+        # Logging calls only buffer, whatever the cluster is doing
+        assert time.monotonic() - start < 0.1
+        shipper.drain()
+        assert shipper.stats()["circuit_open"]
+        start = time.monotonic()
+        shipper.write("doa", '{"n":50}')
+        shipper.drain()
+        # While open, batches are spilled without retrying against the dead cluster
+        assert time.monotonic() - start < 0.1
+        assert shipper.stats()["spilled"] == 51
+    finally:
+        shipper.close()
+    assert len(_spilled_lines(tmp_path)) == 51
+
+
+def test_flush_returns_while_the_cluster_is_unreachable(tmp_path):
+    shipper = ElasticsearchShipper(f"http://127.0.0.1:{_closed_port()}", backoff=0.2, max_retries=3,
+                                   flush_interval=60, fallback=KrakenLogWriter(str(tmp_path)))
+    try:
+        shipper.write("doa", '{"n":0}')
+        start = time.monotonic()
+        shipper.flush()
+        # Retries and backoff run on the shipper thread, not the caller's
+        assert time.monotonic() - start < 0.1
+        deadline = time.monotonic() + 10
+        while not shipper.stats()["circuit_open"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert shipper.stats()["circuit_open"]
+    finally:
+        shipper.close()
+    assert _spilled_lines(tmp_path) == ['{"n":0}']
+
+
+def test_malformed_bulk_response_is_spilled(es, tmp_path):
+    es.body = "<html>proxy error</html>"
+    shipper = ElasticsearchShipper(es.url, backoff=0.01, max_retries=1, flush_interval=60,
+                                   fallback=KrakenLogWriter(str(tmp_path)))
+    try:
+        shipper.write("doa", '{"bearing":1}')
+        shipper.drain()
+        assert shipper.stats()["sent"] == 0
+    finally:
+        shipper.close()
+    assert _spilled_lines(tmp_path) == ['{"bearing":1}']
+    assert len(es.requests) == 2
+
+
+def test_circuit_closes_once_the_cluster_answers(es, tmp_path):
+    es.status = 503
+    shipper = ElasticsearchShipper(es.url, backoff=0.01, max_retries=1, cooldown=0.05, flush_interval=60,
+                                   fallback=KrakenLogWriter(str(tmp_path)))
+    try:
+        shipper.write("doa", '{"bearing":1}')
+        shipper.drain()
+        assert shipper.stats()["circuit_open"]
+        es.status = 200
+        time.sleep(0.06)
+        shipper.write("doa", '{"bearing":2}')
+        shipper.drain()
+        stats = shipper.stats()
+        assert (stats["sent"], stats["spilled"], stats["circuit_open"]) == (1, 1, False)
+    finally:
+        shipper.close()
@@ -0,0 +1,38 @@
+import os
+import time
+
+from kraken_log_writer import KrakenLogWriter
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_size_bound_flushes_without_waiting(tmp_path):
+    with KrakenLogWriter(str(tmp_path), flush_bytes=10, flush_interval=60) as writer:
+        writer.write("doa", '{"a": 1}')
+        writer.write("doa", '{"a": 2}')
+        with open(writer.path_for("doa")) as f:
+            assert f.read().splitlines() == ['{"a": 1}', '{"a": 2}']
+
+
+def test_idle_records_are_flushed_by_the_timer(tmp_path):
+    with KrakenLogWriter(str(tmp_path), flush_bytes=1 << 20, flush_interval=0.05) as writer:
+        writer.write("doa", '{"a": 1}')
+        path = writer.path_for("doa")
+        # No further writes and no explicit flush: the timer must write the record out
+        assert _wait_for(lambda: os.path.exists(path) and os.path.getsize(path) > 0)
+
+
+def test_close_flushes_and_stops_the_timer(tmp_path):
+    writer = KrakenLogWriter(str(tmp_path), flush_bytes=1 << 20, flush_interval=30)
+    writer.write("status", '{"ok": true}')
+    writer.close()
+    assert not writer._timer.is_alive()
+    with open(writer.path_for("status")) as f:
+        assert f.read() == '{"ok": true}\n'
@@ -0,0 +1,91 @@
+import os
+import re
+import urllib.request
+
+import pytest
+
+from kraken_metrics import STAGES, Histogram, LoggerMetrics
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def _samples(text):
+    """{(name, ((label, value), ...)): float} from Prometheus text exposition"""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        key = tuple(re.findall(r'(\w+)="([^"]*)"', labels or ""))
+        samples[(name, key)] = float(value)
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(0.001, 0.01, 0.1))
+    for seconds in (0.0005, 0.001, 0.005, 0.05, 2.0):
+        hist.observe(seconds)
+    assert hist.counts == [2, 1, 1, 1]
+    assert hist.quantile(0.5) == 0.01
+    assert hist.quantile(0.99) == float("inf")
+    assert Histogram().quantile(0.5) is None
+
+
+def test_exposition_lists_counters_and_histograms():
+    metrics = LoggerMetrics()
+    metrics.count_records("doa", 3, 300)
+    metrics.count_records("doa", 1, 100)
+    metrics.count_capture_failure(2, "timeout")
+    metrics.observe("write", 0.002)
+    metrics.observe("write", 0.2)
+    text = metrics.render_prometheus()
+    samples = _samples(text)
+
+    assert "# TYPE kraken_logger_records_total counter" in text
+    assert "# TYPE kraken_logger_stage_seconds histogram" in text
+    assert samples[("kraken_logger_records_total", (("event_type", "doa"),))] == 4
+    assert samples[("kraken_logger_bytes_total", (("event_type", "doa"),))] == 400
+    assert samples[("kraken_logger_capture_failures_total",
+                    (("device_index", "2"), ("reason", "timeout")))] == 1
+
+    def bucket(le):
+        return samples[("kraken_logger_stage_seconds_bucket", (("stage", "write"), ("le", le)))]
+
+    assert (bucket("0.001"), bucket("0.005"), bucket("0.5"), bucket("+Inf")) == (0, 1, 2, 2)
+    assert samples[("kraken_logger_stage_seconds_count", (("stage", "write"),))] == 2
+    assert samples[("kraken_logger_stage_seconds_sum", (("stage", "write"),))] == pytest.approx(0.202)
+    # Every stage is exported, observed or not
+    assert {dict(key)["stage"] for name, key in samples if name == "kraken_logger_stage_seconds_count"} == set(STAGES)
+
+
+def test_logger_counts_what_it_writes(logger):
+    logger.log_doa_batch([10.0, 20.0, 30.0])
+    logger.log_passive_radar(3000.0, 45.0, 10.0)
+    logger.flush()
+    metrics = logger.metrics
+    assert metrics.records == {"doa": 3, "radar": 1}
+    for event in ("doa", "radar"):
+        assert metrics.bytes[event] == os.path.getsize(logger.writer.path_for(event))
+    assert metrics.stages["serialization"].count == 4
+    assert metrics.stages["synthesis"].count == 1
+    assert metrics.stages["write"].count == 2
+    assert metrics.stages["flush"].count >= 1
+
+
+def test_metrics_endpoint_serves_the_logger_counters(make_logger):
+    logger = make_logger(metrics_port=0)
+    logger.log_passive_radar(3000.0, 45.0, 10.0)
+    url = f"http://127.0.0.1:{logger.metrics_server.port}/metrics"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/plain")
+        samples = _samples(response.read().decode())
+    assert samples[("kraken_logger_records_total", (("event_type", "radar"),))] == 1
+
+
+def test_metrics_record_carries_the_snapshot(logger, records):
+    logger.log_passive_radar(3000.0, 45.0, 10.0)
+    logger.log_metrics()
+    record = records(logger, "metrics")[0]
+    assert record["event_type"] == "logger_metrics"
+    assert record["records_total"] == {"radar": 1}
+    assert set(record["stages"]) == set(STAGES)
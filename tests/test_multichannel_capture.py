@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from kraken_capture import MultiChannelCapture
+from kraken_data_logger import KrakenDataLogger
+from kraken_discovery import HardwareDiscoveryCache
+
+FAKE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rtl_power.py")
+
+
+def _stub_capture(hung, release):
+    def capture(device_index, frequency, duration):
+        if device_index in hung:
+            release.wait(10)
+            return None
+        return {'avg_power_db': -50.0, 'max_power_db': -40.0 - device_index,
+                'power_spectrum': [-50.0, -40.0], 'device_index': device_index}
+    return capture
+
+
+def test_hung_device_does_not_starve_later_sweeps():
+    release = threading.Event()
+    aborted = []
+    scheduler = MultiChannelCapture(_stub_capture({1}, release), range(3), timeout=0.1,
+                                    on_timeout=aborted.append)
+    try:
+        first = scheduler.capture(100e6, 0)
+        assert first['failures'] == {1: 'timeout'}
+        assert aborted == [1]
+        for _ in range(5):
+            start = time.monotonic()
+            record = scheduler.capture(100e6, 0)
+            # The hung device is skipped, not given another thread, so the rest answer at once
+            assert record['failures'] == {1: 'busy'}
+            assert record['channels_ok'] == 2
+            assert time.monotonic() - start < 0.1
+        assert scheduler.failure_counts == {0: 0, 1: 6, 2: 0}
+        # Once the stuck capture returns the device is captured again
+        release.set()
+        scheduler._inflight[1].result(timeout=1)
+        assert scheduler.capture(100e6, 0)['failures'] == {1: 'no data'}
+    finally:
+        release.set()
+        scheduler.close()
+
+
+def test_logger_kills_hung_rtl_power(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_RTL_POWER_HANG", "1")
+    monkeypatch.delenv("FAKE_RTL_POWER_LOG", raising=False)
+    with KrakenDataLogger(str(tmp_path / "logs"), quiet=True, rtl_power_cmd=f"{sys.executable} {FAKE}",
+                          discovery_cache=HardwareDiscoveryCache(str(tmp_path / "hw.json"))) as logger:
+        logger.rtl_sdr_count = 2
+        logger.capture_scheduler = MultiChannelCapture(
+            lambda idx, freq, dur: logger.collect_real_rtl_sdr_data(device_index=idx, frequency=freq, duration=dur),
+            range(2), timeout=0.5, on_timeout=logger.kill_rtl_sdr_capture)
+        record = logger.collect_multichannel_data(100e6, duration=30)
+        assert record['failures'] == {1: 'timeout'}
+        assert record['channels'][0]['max_power_db'] == pytest.approx(-10.0)
+        # The kill lets the hung capture return promptly instead of after duration + 2 s
+        future = logger.capture_scheduler._inflight[1]
+        future.result(timeout=2)
+        assert not logger.capture_procs
@@ -0,0 +1,32 @@
+import threading
+
+from kraken_pipeline import LoggingPipeline
+
+
+class FailingSink:
+    def __init__(self):
+        self.calls = 0
+        self.idle = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls > 1:
+            self.idle.set()
+        raise OSError("disk full")
+
+
+def test_failing_idle_flush_keeps_the_worker_alive():
+    sink = FailingSink()
+    pipeline = LoggingPipeline(sink, maxsize=2, policy="block", idle_flush=0.01)
+    try:
+        # Several idle flushes fail before any record arrives
+        assert sink.idle.wait(2.0)
+        written = []
+        for i in range(5):
+            pipeline.submit(written.append, (i,))
+        pipeline.drain()
+        assert written == [0, 1, 2, 3, 4]
+        assert pipeline.stats()["flush_errors"] >= 2
+    finally:
+        pipeline.close()
+    assert not pipeline._thread.is_alive()
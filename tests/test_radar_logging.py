@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from kraken_data_logger import RADAR_PROCESSING
+from kraken_radar import synthetic_scene
+
+
+def test_engine_follows_the_advertised_processing(logger, records):
+    # 0.2 s block with one target at 3000 m bistatic range and +40 Hz Doppler
+    reference, surveillance = synthetic_scene(480_000, 2.4e6, ((3000.0, 40.0, -20.0),),
+                                              rng=np.random.default_rng(0))
+    result = logger.process_radar_block(reference, surveillance)
+    assert (logger.radar.range_gates, logger.radar.doppler_bins) == (RADAR_PROCESSING["range_gates"],
+                                                                     RADAR_PROCESSING["doppler_bins"])
+    assert logger.radar.cfar_threshold_db == RADAR_PROCESSING["cfar_threshold"]
+    logged = records(logger, "radar")
+    assert len(logged) == len(result["detections"]) > 0
+    for record, detection in zip(logged, result["detections"]):
+        # Measured records carry engine values only, nothing invented
+        assert record["data_source"] == "PASSIVE_RADAR_ENGINE"
+        assert record["bistatic_geometry"] is None
+        assert record["target"]["snr_db"] == pytest.approx(detection["snr_db"])
+        assert record["target"]["doppler_shift_hz"] == pytest.approx(detection["doppler_hz"])
+        assert record["processing"]["integration_time_ms"] == pytest.approx(200.0)
+
+    # The strongest detection is the injected target, within one range gate and Doppler bin
+    target = logged[0]["target"]
+    assert target["range_meters"] == pytest.approx(3000.0, abs=result["range_resolution_m"])
+    assert target["doppler_shift_hz"] == pytest.approx(40.0, abs=result["doppler_resolution_hz"])
+    assert target["range_bin"] == round(3000.0 / result["range_resolution_m"])
+
+
+def test_zero_doppler_and_snr_are_kept(logger, records):
+    logger.log_passive_radar(3000.0, None, 10.0, illuminator_freq=98.5e6, target_snr=0.0, doppler_hz=0.0,
+                             data_source="PASSIVE_RADAR_ENGINE")
+    target = records(logger, "radar")[0]["target"]
+    assert (target["doppler_shift_hz"], target["snr_db"]) == (0.0, 0.0)
+
+
+def test_simulated_records_still_fill_in_geometry(logger, records):
+    logger.log_passive_radar(3000.0, 45.0, 10.0)
+    record = records(logger, "radar")[0]
+    assert record["data_source"] == "SIMULATED_SAMPLE_DATA"
+    assert 1000 <= record["bistatic_geometry"]["baseline_meters"] <= 10000
+    assert 10 <= record["target"]["snr_db"] <= 30
+    assert record["processing"] == RADAR_PROCESSING
@@ -0,0 +1,48 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from kraken_replay import parse_start_time, stamp_seconds
+
+
+@pytest.fixture
+def iq_paths(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for channel in range(5):
+        path = tmp_path / f"ch{channel}.cu8"
+        rng.integers(0, 256, 2 * 2 * 32768, dtype=np.uint8).tofile(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_rtl_power_stamps_are_local_time(local_zone):
+    # rtl_power writes localtime(); 12:00 in New York (EST) is 17:00 UTC
+    assert stamp_seconds("2024-01-15 12:00:00") == datetime.fromisoformat("2024-01-15T17:00:00+00:00").timestamp()
+    assert parse_start_time("2024-01-15 12:00:00") == stamp_seconds("2024-01-15 12:00:00")
+    assert parse_start_time("1705338000") == 1705338000.0
+
+
+def test_original_iq_timestamps_need_a_start_time(logger, iq_paths):
+    with pytest.raises(ValueError, match="start_time"):
+        logger.replay_iq(iq_paths, sample_rate=32768, speed=0.0, timestamps="original")
+
+
+def test_original_iq_timestamps_count_from_the_start_time(logger, records, iq_paths):
+    start = 1_705_338_000.0
+    stats = logger.replay_iq(iq_paths, sample_rate=32768, speed=0.0, timestamps="original", start_time=start)
+    assert stats["inputs"] == 2
+    epochs = [record["unix_epoch_time"] for record in records(logger, "doa")]
+    # Two one-second blocks of two 0.5 s CPIs each
+    assert epochs == [int((start + offset) * 1000) for offset in (0.0, 0.5, 1.0, 1.5)]
@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+import pytest
+
+from kraken_serializer import RecordSerializer, _json_dumps, dumps
+
+RECORD = {
+    "@timestamp": "2026-01-01T00:00:00+00:00",
+    "transposed": np.arange(6.0).reshape(2, 3).T,
+    "strided": np.arange(10.0)[::3],
+    "by_device": {np.int64(3): np.float32(0.1), 4: np.float64(-70.5)},
+    "non_finite": [float("nan"), np.inf, np.float64("nan"), -np.inf],
+    "spectrum32": np.array([0.1, np.nan, -3.25], dtype=np.float32),
+    "half": np.float16(0.5),
+    "flags": [np.bool_(True), np.int16(4), None],
+    "station": "KrakenSDR 📡",
+}
+
+
+def test_backends_produce_identical_output():
+    assert dumps(RECORD) == _json_dumps(RECORD)
+
+
+def test_non_finite_values_become_null():
+    decoded = json.loads(_json_dumps(RECORD))
+    assert decoded["non_finite"] == [None, None, None, None]
+    assert decoded["spectrum32"] == [0.1, None, -3.25]
+    assert decoded["by_device"] == {"3": 0.1, "4": -70.5}
+    assert decoded["transposed"] == [[0.0, 3.0], [1.0, 4.0], [2.0, 5.0]]
+
+
+def test_fragments_splice_into_valid_json():
+    serializer = RecordSerializer({"doa": {"event_type": "doa", "band": float("nan")}})
+    line = serializer.encode("doa", {"bearing": np.float64(12.5)})
+    assert json.loads(line) == {"bearing": 12.5, "event_type": "doa", "band": None}
+
+
+def test_unserializable_objects_still_raise():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
@@ -0,0 +1,114 @@
+import pytest
+
+import kraken_status
+from kraken_status import CLK_TCK, PAGE_KB, ProcStatusCollector, read_stat
+
+TARGETS = {"rtl_daq": "rtl_daq.out", "sync": "sync.out"}
+
+
+class FakeProc:
+    """A /proc tree of cmdline and stat files"""
+
+    def __init__(self, root):
+        self.root = root
+        root.mkdir()
+
+    def spawn(self, pid, cmdline, comm="proc", ticks=0, start=1000, rss_pages=256):
+        directory = self.root / str(pid)
+        directory.mkdir(exist_ok=True)
+        (directory / "cmdline").write_bytes(cmdline.replace(" ", "\0").encode() + b"\0")
+        self.stat(pid, comm, ticks, start, rss_pages)
+
+    def stat(self, pid, comm="proc", ticks=0, start=1000, rss_pages=256):
+        # Fields 3.. of proc(5): utime is 14, stime 15, starttime 22, rss 24
+        fields = ["S"] + ["0"] * 21
+        fields[11], fields[12] = str(ticks - ticks // 2), str(ticks // 2)
+        fields[19], fields[21] = str(start), str(rss_pages)
+        (self.root / str(pid) / "stat").write_text(f"{pid} ({comm}) " + " ".join(fields) + "\n")
+
+    def kill(self, pid):
+        for name in ("cmdline", "stat"):
+            (self.root / str(pid) / name).unlink()
+        (self.root / str(pid)).rmdir()
+
+
+@pytest.fixture
+def proc(tmp_path):
+    return FakeProc(tmp_path / "proc")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the collector"""
+    now = [100.0]
+    monkeypatch.setattr(kraken_status.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("comm", ["rtl_daq.out", "kraken daq", "weird) (name", "a) S 1 2 (b"])
+def test_stat_fields_follow_the_last_paren(proc, comm):
+    proc.spawn(42, "./rtl_daq.out", comm=comm, ticks=150, start=777, rss_pages=10)
+    assert read_stat(42, str(proc.root)) == (150, 777, 10 * PAGE_KB)
+
+
+def test_missing_process_has_no_stat(proc):
+    assert read_stat(42, str(proc.root)) is None
+
+
+def test_cpu_percent_is_the_tick_delta_between_samples(proc, clock):
+    proc.spawn(42, "./rtl_daq.out -c 5", ticks=100)
+    collector = ProcStatusCollector(TARGETS, proc=str(proc.root))
+    first = collector.sample()["rtl_daq"]
+    assert (first["pid"], first["status"], first["cpu_percent"]) == (42, "running", None)
+    assert first["rss_kb"] == 256 * PAGE_KB
+
+    proc.stat(42, ticks=100 + CLK_TCK // 2)
+    clock[0] += 2.0
+    # Half a second of CPU over two seconds
+    assert collector.sample()["rtl_daq"]["cpu_percent"] == pytest.approx(25.0)
+
+
+def test_exited_and_reused_pids_are_detected_by_start_time(proc, clock):
+    proc.spawn(42, "./rtl_daq.out", ticks=100)
+    collector = ProcStatusCollector(TARGETS, rescan_interval=60.0, proc=str(proc.root))
+    collector.sample()
+
+    # Same PID, different process: re-resolved, and its CPU history starts over
+    proc.kill(42)
+    proc.spawn(42, "./rtl_daq.out", ticks=5, start=2000)
+    clock[0] += 1.0
+    restarted = collector.sample()["rtl_daq"]
+    assert (restarted["pid"], restarted["cpu_percent"]) == (42, None)
+
+    # Exited: looked up again at once even inside the rescan interval, and found under its new PID
+    proc.kill(42)
+    proc.spawn(77, "./rtl_daq.out", start=3000)
+    clock[0] += 1.0
+    assert collector.sample()["rtl_daq"]["pid"] == 77
+
+    proc.kill(77)
+    clock[0] += 1.0
+    assert collector.sample()["rtl_daq"] == {"pid": None, "status": "not_running"}
+
+
+def test_missing_targets_are_rescanned_after_the_interval(proc, clock):
+    collector = ProcStatusCollector(TARGETS, rescan_interval=10.0, proc=str(proc.root))
+    assert collector.sample()["sync"]["status"] == "not_running"
+    proc.spawn(50, "python3 sync.out")
+    clock[0] += 5.0
+    assert collector.sample()["sync"]["status"] == "not_running"
+    clock[0] += 5.0
+    assert collector.sample()["sync"]["pid"] == 50
+
+
+@pytest.mark.parametrize("running, status", [((42, 50), "ok"), ((42,), "degraded"), ((), "down")])
+def test_status_record_summarises_the_processes(logger, records, proc, running, status):
+    commands = {42: "./rtl_daq.out", 50: "python3 sync.out"}
+    for pid in running:
+        proc.spawn(pid, commands[pid])
+    logger.status_collector = ProcStatusCollector(TARGETS, proc=str(proc.root))
+    logger.log_system_status()
+    record = records(logger, "status")[0]
+    assert record["status"] == status
+    assert record["processes_running"] == len(running)
+    assert record["memory_usage_kb"] == 256 * PAGE_KB * len(running)
@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+from kraken_array_codec import SidecarStore, decode_array, encode_array
+from kraken_sweep import SweepAggregator, sweep_segments, synthetic_rows
+
+
+def _segments(bin_size, sweeps=2, display_bins=64):
+    rows = synthetic_rows(88e6, 108e6, bin_size, sweeps=sweeps)
+    return list(sweep_segments(rows, SweepAggregator(88e6, 108e6, 10e6, display_bins)))
+
+
+def test_coarse_bins_shrink_display_bins_instead_of_nan():
+    segments = _segments(1e6)
+    assert len(segments) == 4
+    for segment in segments:
+        assert len(segment["max_hold_db"]) == 10
+        assert np.isfinite(segment["max_hold_db"]).all()
+        assert np.isfinite(segment["average_db"]).all()
+
+
+def test_fine_bins_keep_the_requested_display_bins():
+    assert all(len(s["average_db"]) == 64 for s in _segments(10e3, sweeps=1))
+
+
+@pytest.mark.parametrize("encoding", ["f16", "i8", "delta-db", "peaks"])
+def test_codecs_round_trip_missing_bins(encoding, tmp_path):
+    array = np.array([-90.0, np.nan, -40.0, -60.5, np.nan, -75.25])
+    sidecar = SidecarStore(str(tmp_path))
+    encoded = encode_array(array, encoding, sidecar, "sweep")
+    sidecar.close()
+    # Encoded records must stay strict JSON
+    json.dumps(encoded, allow_nan=False)
+    decoded = decode_array(encoded, str(tmp_path))
+    assert np.isnan(decoded[[1, 4]]).all()
+    if encoding == "peaks":
+        assert [i for i, _ in encoded["peaks"]] == [2, 3, 5, 0]
+    else:
+        assert decoded[[0, 2, 3, 5]] == pytest.approx(array[[0, 2, 3, 5]], abs=0.25)
+
+
+def test_i8_all_missing():
+    encoded = encode_array(np.full(4, np.nan), "i8")
+    json.dumps(encoded, allow_nan=False)
+    assert np.isnan(decode_array(encoded)).all()
+
+
+def test_sweep_records_are_strict_json(logger):
+    segment = _segments(1e6, sweeps=1)[0]
+    segment["average_db"][3] = np.nan
+    logger.log_sweep_segment(segment)
+    logger.flush()
+    with open(logger.writer.path_for("sweep")) as f:
+        record = json.loads(f.readline(), parse_constant=lambda c: pytest.fail(f"bare {c}"))
+    assert record["average_db"][3] is None
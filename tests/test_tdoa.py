@@ -0,0 +1,87 @@
+
+import numpy as np
+import pytest
+
+from kraken_tdoa import TdoaSolver
+
+LAT0, LON0 = 40.7, -74.0
+
+
+def _error_m(solver, fix, truth):
+    estimate = np.column_stack((fix["latitude"], fix["longitude"]))
+    return np.linalg.norm(solver.to_local(estimate) - solver.to_local(truth), axis=1)
+
+
+def _emitters(rng, n):
+    return np.column_stack((rng.uniform(40.62, 40.80, n), rng.uniform(-74.12, -73.89, n)))
+
+
+def test_noise_free_measurements_are_recovered_exactly():
+    solver = TdoaSolver()
+    truth = _emitters(np.random.default_rng(0), 500)
+    fix = solver.solve(solver.simulate(truth))
+    assert _error_m(solver, fix, truth).max() < 1e-3
+    assert fix["residual_rms_m"].max() < 1e-3
+
+
+def test_noisy_error_tracks_gdop():
+    rng = np.random.default_rng(1)
+    solver = TdoaSolver(timing_sigma_s=10e-9)
+    truth = _emitters(rng, 4000)
+    fix = solver.solve(solver.simulate(truth, 10e-9, rng))
+    error = _error_m(solver, fix, truth)
+    # Predicted accuracy is a 1-sigma figure: nearly every fix falls within a few of it
+    assert np.mean(error <= 5 * fix["estimated_accuracy_meters"]) > 0.95
+    # Worse geometry, worse fixes
+    good = fix["gdop"] <= np.percentile(fix["gdop"], 25)
+    poor = fix["gdop"] >= np.percentile(fix["gdop"], 75)
+    assert np.median(error[poor]) > 2 * np.median(error[good])
+
+
+@pytest.mark.parametrize("offsets", [[0.0] * 5, [0.0, 4e-5, -3e-5, 2e-5, -1e-5]])
+def test_collinear_stations_report_the_mirror_ambiguity(offsets):
+    rng = np.random.default_rng(2)
+    solver = TdoaSolver([(LAT0 + o, LON0 + 0.03 * k) for k, o in enumerate(offsets)], timing_sigma_s=10e-9)
+    assert solver.collinear
+    # About 1.1 km off the station line
+    truth = np.tile([[LAT0 + 0.01, LON0 + 0.05]], (200, 1))
+    fix = solver.solve(solver.simulate(truth, 10e-9, rng))
+    error = _error_m(solver, fix, truth)
+    # Whichever mirror was picked, the reported accuracy covers the real error
+    assert np.mean(error <= fix["estimated_accuracy_meters"]) > 0.95
+    assert np.all(error <= 2 * fix["estimated_accuracy_meters"])
+    assert fix["ambiguous"].all()
+    assert np.all(fix["estimated_accuracy_meters"] > 2000)
+
+
+def test_unobservable_position_has_infinite_gdop():
+    solver = TdoaSolver([(LAT0, LON0 + 0.03 * k) for k in range(5)])
+    on_line = solver.to_local(np.array([[LAT0, LON0 + 0.05]]))
+    assert np.isinf(solver.gdop(on_line)).all()
+
+
+def test_partial_source_position_logs_null(logger, records):
+    logger.log_tdoa_data([40.7], np.zeros(10))
+    location = records(logger, "tdoa")[0]["source_location"]
+    assert location == {"latitude": 40.7, "longitude": None, "estimated_accuracy_meters": None,
+                        "ambiguous": None}
+
+
+def test_solver_is_only_named_when_a_position_was_solved(logger, records):
+    logger.log_tdoa_data(None, np.zeros(6))
+    logger.log_tdoa_batch(None, np.zeros((2, 6)))
+    for record in records(logger, "tdoa"):
+        assert record["processing"]["solver"] is None
+        assert record["source_location"]["latitude"] is None
+
+
+def test_logged_fixes_carry_the_mirror_ambiguity(make_logger, records):
+    logger = make_logger(tdoa_stations=[(LAT0, LON0 + 0.03 * k) for k in range(5)])
+    measurements = logger.tdoa_solver.simulate([[LAT0 + 0.01, LON0 + 0.05]] * 2)
+    logger.log_tdoa_data(None, measurements[0].tolist())
+    logger.log_tdoa_batch(None, measurements)
+    logger.log_tdoa_batch([[LAT0 + 0.01, LON0 + 0.05]], measurements[:1])
+    solved, given = records(logger, "tdoa")[:3], records(logger, "tdoa")[3]
+    assert [record["source_location"]["ambiguous"] for record in solved] == [True] * 3
+    assert [record["processing"]["solver"] for record in solved] == ["closed_form_gauss_newton"] * 3
+    assert (given["source_location"]["ambiguous"], given["processing"]["solver"]) == (None, None)